@@ -1,7 +1,7 @@
 // Admin Course Approvals - Enhanced with proper database connections
 let allCourses = [];
 let allFaculty = {};
-let courseRefreshInterval = null;
+let courseLiveUpdates = null;
 let currentFilter = '';
 
 // Utility: Fetch JSON with fallback handling
@@ -214,19 +214,26 @@ async function rejectCourse(courseId) {
   }
 }
 
-// Auto-refresh functionality
+// Live updates (polls every 30 seconds if the event stream is unavailable)
 function startCourseRefresh(intervalMs = 30000) {
-  if (courseRefreshInterval) clearInterval(courseRefreshInterval);
-  courseRefreshInterval = setInterval(() => {
-    console.log('Auto-refreshing courses...');
-    loadCourses();
-  }, intervalMs);
+  if (courseLiveUpdates) courseLiveUpdates.close();
+  courseLiveUpdates = subscribeLiveUpdates({
+    entities: ['course'],
+    onChange: (change) => {
+      // Keep the list consistent with the status filter it was loaded with
+      applyLiveChange(allCourses, change, 'course_id', c => !currentFilter || c.course_status === currentFilter);
+      renderCourseTable();
+      updateStatistics();
+    },
+    onResync: debounceLive(() => loadCourses()),
+    fallback: { load: () => loadCourses(), intervalMs }
+  });
 }
 
 function stopCourseRefresh() {
-  if (courseRefreshInterval) {
-    clearInterval(courseRefreshInterval);
-    courseRefreshInterval = null;
+  if (courseLiveUpdates) {
+    courseLiveUpdates.close();
+    courseLiveUpdates = null;
   }
 }
 
@@ -246,7 +253,7 @@ window.addEventListener('DOMContentLoaded', () => {
     });
   }
   
-  // Start auto-refresh
+  // Follow live changes
   startCourseRefresh(30000);
 
   // Handle visibility changes (pause refresh when tab is hidden)
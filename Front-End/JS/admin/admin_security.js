@@ -1,11 +1,19 @@
 let allUsers = [];
 let filteredUsers = [];
-let securityRefreshInterval = null;
 let currentPasswordResetUser = null;
 
 // API Configuration
 const API_BASE = 'http://127.0.0.1:8000';
 
+// Session token issued by /auth/login (sent as a Bearer token)
+function getSessionToken() {
+  try {
+    return JSON.parse(localStorage.getItem('loggedInUser') || '{}').token || '';
+  } catch (e) {
+    return '';
+  }
+}
+
 // Fetch utility function
 async function fetchJson(path, opts = {}){
   try{
@@ -16,7 +24,7 @@ async function fetchJson(path, opts = {}){
       ...opts,
       headers: {
         'Content-Type': 'application/json',
-        'x-user-role': 'admin',
+        'Authorization': `Bearer ${getSessionToken()}`,
         ...opts.headers
       }
     });
@@ -32,6 +40,21 @@ async function fetchJson(path, opts = {}){
   }
 }
 
+const USER_KEYS = { student: 'student_id', faculty: 'faculty_id', admin: 'admin_id' };
+
+// Give student, faculty and admin rows the common fields the table uses
+function normalizeUser(row, role){
+  return {
+    ...row,
+    user_id: row[USER_KEYS[role]],
+    role,
+    name: row.full_name || row.name || row.faculty_name || 'Unknown',
+    email: row.email || '',
+    account_status: row.account_status || 'Active',
+    twofa_enabled: row.twofa_enabled || false
+  };
+}
+
 // Load all security data
 async function loadSecurityData(){
   try {
@@ -45,33 +68,9 @@ async function loadSecurityData(){
 
     // Combine all users with role and normalized fields
     allUsers = [
-      ...(studentsRes || []).map(s => ({
-        ...s,
-        user_id: s.student_id,
-        role: 'student',
-        name: s.full_name || s.name || 'Unknown',
-        email: s.email || '',
-        account_status: s.account_status || 'Active',
-        twofa_enabled: s.twofa_enabled || false
-      })),
-      ...(facultyRes || []).map(f => ({
-        ...f,
-        user_id: f.faculty_id,
-        role: 'faculty',
-        name: f.name || f.full_name || f.faculty_name || 'Unknown',
-        email: f.email || '',
-        account_status: f.account_status || 'Active',
-        twofa_enabled: f.twofa_enabled || false
-      })),
-      ...(adminsRes || []).map(a => ({
-        ...a,
-        user_id: a.admin_id,
-        role: 'admin',
-        name: a.name || a.full_name || 'Unknown',
-        email: a.email || '',
-        account_status: a.account_status || 'Active',
-        twofa_enabled: a.twofa_enabled || false
-      }))
+      ...(studentsRes || []).map(s => normalizeUser(s, 'student')),
+      ...(facultyRes || []).map(f => normalizeUser(f, 'faculty')),
+      ...(adminsRes || []).map(a => normalizeUser(a, 'admin'))
     ];
 
     filteredUsers = [...allUsers];
@@ -243,7 +242,7 @@ async function toggle2FA(userId, role, checkbox){
       method: 'PATCH',
       headers: {
         'Content-Type': 'application/json',
-        'x-user-role': 'admin'
+        'Authorization': `Bearer ${getSessionToken()}`
       },
       body: JSON.stringify({ twofa_enabled: enabled })
     });
@@ -319,7 +318,7 @@ async function submitPasswordReset(){
       method: 'POST',
       headers: {
         'Content-Type': 'application/json',
-        'x-user-role': 'admin'
+        'Authorization': `Bearer ${getSessionToken()}`
       },
       body: JSON.stringify({ new_password: newPassword })
     });
@@ -346,7 +345,7 @@ async function lockUser(userId, role){
       method: 'PATCH',
       headers: {
         'Content-Type': 'application/json',
-        'x-user-role': 'admin'
+        'Authorization': `Bearer ${getSessionToken()}`
       },
       body: JSON.stringify({ account_status: 'Locked' })
     });
@@ -379,7 +378,7 @@ async function unlockUser(userId, role){
       method: 'PATCH',
       headers: {
         'Content-Type': 'application/json',
-        'x-user-role': 'admin'
+        'Authorization': `Bearer ${getSessionToken()}`
       },
       body: JSON.stringify({ account_status: 'Active' })
     });
@@ -409,15 +408,37 @@ async function refreshLogs(){
   await loadSecurityLogs();
 }
 
-// Auto-refresh functionality
+// Apply a streamed student/faculty/admin change to the user list
+function applyUserChange(change){
+  const role = change.entity;
+  const index = allUsers.findIndex(u => u.role === role && u.user_id === change.key);
+  if (change.op === 'deleted'){
+    if (index >= 0) allUsers.splice(index, 1);
+  } else {
+    const user = normalizeUser(Object.assign({}, index >= 0 ? allUsers[index] : {}, change.data), role);
+    if (index >= 0) allUsers[index] = user;
+    else allUsers.push(user);
+  }
+  updateStatistics();
+  filterUsers();
+}
+
+// Live updates (polls every 30 seconds if the event stream is unavailable)
+let securityLiveUpdates = null;
+
 function startSecurityRefresh(intervalMs = 30000){
-  if (securityRefreshInterval) clearInterval(securityRefreshInterval);
-  securityRefreshInterval = setInterval(() => loadSecurityData(), intervalMs);
+  if (securityLiveUpdates) securityLiveUpdates.close();
+  securityLiveUpdates = subscribeLiveUpdates({
+    entities: ['student', 'faculty', 'admin'],
+    onChange: applyUserChange,
+    onResync: debounceLive(() => loadSecurityData()),
+    fallback: { load: () => loadSecurityData(), intervalMs }
+  });
 }
 
 function stopSecurityRefresh(){
-  if (securityRefreshInterval) clearInterval(securityRefreshInterval);
-  securityRefreshInterval = null;
+  if (securityLiveUpdates) securityLiveUpdates.close();
+  securityLiveUpdates = null;
 }
 
 // Utility functions
@@ -479,6 +500,7 @@ window.addEventListener('DOMContentLoaded', () => {
     if (document.hidden) {
       stopSecurityRefresh();
     } else {
+      loadSecurityData();
       startSecurityRefresh(30000);
     }
   });
@@ -36,6 +36,22 @@ async function addNotification(){
   const category = document.getElementById('categoryInput').value;
   const target = document.getElementById('targetInput').value;
   if(!message || !category || !target){ showAlert('Please fill required fields', 'warning'); return; }
+  if(target === 'Students'){
+    // One notification per student, expanded and written server-side in the background
+    const user = JSON.parse(localStorage.getItem('loggedInUser') || '{}');
+    const r = await fetch('/notifications/broadcasts/',{
+      method:'POST',
+      headers:{'Content-Type':'application/json', 'Authorization': `Bearer ${user.token}`},
+      body: JSON.stringify({ title: title || 'Notification', message, type: category, target: 'all' })
+    });
+    if(r.ok){
+      const broadcast = await r.json();
+      showAlert(`Sending to ${broadcast.total_recipients} students`,'success');
+      populateNotifications();
+    }
+    else showAlert('Failed to add','error');
+    return;
+  }
   const payload = { message, type: category, recipient_id: target === 'All' ? null : (target === 'Students' ? 0 : -1) };
   const r = await fetch('/notifications',{ method:'POST', headers:{'Content-Type':'application/json'}, body: JSON.stringify(payload) });
   if(r.ok){ showAlert('Added','success'); populateNotifications(); }
@@ -255,19 +255,32 @@ function exportToPDF() {
   // TODO: Implement PDF export using a library like jsPDF
 }
 
-// Auto-refresh every 15 seconds
-let refreshInterval = null;
+// Live updates (polls every 15 seconds if the event stream is unavailable)
+let salaryLiveUpdates = null;
 function startAutoRefresh() {
-  refreshInterval = setInterval(() => {
-    if (document.hidden) return;
-    loadSalaryPayments();
-  }, 15000);
+  if (salaryLiveUpdates) salaryLiveUpdates.close();
+  salaryLiveUpdates = subscribeLiveUpdates({
+    entities: ['salary', 'faculty'],
+    onChange: (change) => {
+      if (change.entity === 'salary') applyLiveChange(allSalaries, change, 'salary_id');
+      else {
+        applyLiveChange(allFaculty, change, 'faculty_id');
+        populateDepartmentFilter();
+      }
+      applyFiltersAndRender();
+    },
+    onResync: debounceLive(() => loadSalaryPayments()),
+    fallback: {
+      load: () => { if (!document.hidden) loadSalaryPayments(); },
+      intervalMs: 15000
+    }
+  });
 }
 
 function stopAutoRefresh() {
-  if (refreshInterval) {
-    clearInterval(refreshInterval);
-    refreshInterval = null;
+  if (salaryLiveUpdates) {
+    salaryLiveUpdates.close();
+    salaryLiveUpdates = null;
   }
 }
 
@@ -318,7 +331,7 @@ document.addEventListener('DOMContentLoaded', () => {
 
 document.addEventListener('visibilitychange', () => {
   if (document.hidden) stopAutoRefresh();
-  else startAutoRefresh();
+  else { loadSalaryPayments(); startAutoRefresh(); }
 });
 
 // Expose functions to global scope
@@ -55,14 +55,13 @@ async function fetchJson(path, opts = {}){
 
 async function loadAdminDashboard(){
   const user = JSON.parse(localStorage.getItem('loggedInUser') || '{}');
-  const role = user.role || '';
   if (user && user.name){
     const nameEl = document.getElementById('adminName');
     if (nameEl) nameEl.textContent = user.name;
   }
 
   const adminHeaders = { 'Content-Type': 'application/json' };
-  if (role) adminHeaders['x-user-role'] = role;
+  if (user.token) adminHeaders['Authorization'] = `Bearer ${user.token}`;
 
   try {
     const statsData = await fetchJson('/admins/dashboard/stats', { headers: adminHeaders });
@@ -129,7 +128,7 @@ async function loadAdminDashboard(){
           e.target.disabled = true; e.target.textContent = 'Verifying…';
           try{
             const body = { status: 'Paid', amount_paid: amount };
-            const res = await fetch(`/fees/${feeId}`, { method: 'PUT', headers: {'Content-Type':'application/json', 'x-user-role': role }, body: JSON.stringify(body) });
+            const res = await fetch(`/fees/${feeId}`, { method: 'PUT', headers: adminHeaders, body: JSON.stringify(body) });
             if (res && res.ok){
               e.target.textContent = 'Verified';
               if (window.showToast) window.showToast('Fee verified', 'success');
@@ -149,18 +148,24 @@ async function loadAdminDashboard(){
   }
 }
 
-let dashboardRefreshInterval = null;
+let dashboardLiveUpdates = null;
 
-// Auto-refresh dashboard every 10 seconds
+// Reload the dashboard when users, courses, fees or salaries change (polls every 10 seconds if the event stream is unavailable)
 function startDashboardRefresh(intervalMs = 10000){
-  if (dashboardRefreshInterval) clearInterval(dashboardRefreshInterval);
-  dashboardRefreshInterval = setInterval(() => loadAdminDashboard(), intervalMs);
+  if (dashboardLiveUpdates) dashboardLiveUpdates.close();
+  const reload = debounceLive(() => loadAdminDashboard(), 800);
+  dashboardLiveUpdates = subscribeLiveUpdates({
+    entities: ['student', 'faculty', 'course', 'fee', 'salary'],
+    onChange: reload,
+    onResync: reload,
+    fallback: { load: () => loadAdminDashboard(), intervalMs }
+  });
 }
 
 // Stop the refresh
 function stopDashboardRefresh(){
-  if (dashboardRefreshInterval) clearInterval(dashboardRefreshInterval);
-  dashboardRefreshInterval = null;
+  if (dashboardLiveUpdates) dashboardLiveUpdates.close();
+  dashboardLiveUpdates = null;
 }
 
 window.addEventListener('load', function(){
@@ -169,17 +174,17 @@ window.addEventListener('load', function(){
     protectDashboard && protectDashboard('admin');
   } catch(e){ /* ignore */ }
   loadAdminDashboard();
-  // Start auto-refresh every 10 seconds
+  // Follow live changes
   startDashboardRefresh(10000);
 });
 
 // Stop refresh when tab is closed
 window.addEventListener('beforeunload', stopDashboardRefresh);
 
-// Pause refresh when tab is hidden; resume when visible
+// Pause refresh when tab is hidden; catch up and resume when visible
 document.addEventListener('visibilitychange', function(){
   if (document.hidden) stopDashboardRefresh();
-  else startDashboardRefresh(10000);
+  else { loadAdminDashboard(); startDashboardRefresh(10000); }
 });
 
 window.loadAdminDashboard = loadAdminDashboard;
@@ -9,6 +9,15 @@ let pendingDeleteAction = null;
 // ============================================
 // UTILITY FUNCTIONS
 // ============================================
+// Session token issued by /auth/login (sent as a Bearer token)
+function getSessionToken() {
+  try {
+    return JSON.parse(localStorage.getItem('loggedInUser') || '{}').token || '';
+  } catch (e) {
+    return '';
+  }
+}
+
 function log(message, data) {
   console.log(`[UserManagement] ${message}`, data || '');
 }
@@ -148,19 +157,11 @@ async function apiCall(url, options = {}) {
 // ============================================
 // LOAD DATA
 // ============================================
-async function loadAllUsers() {
-  log('Loading all users...');
-  
-  try {
-    // Fetch all user types
-    const [students, faculty, admins] = await Promise.all([
-      apiCall('/students').catch(() => []),
-      apiCall('/faculties').catch(() => []),
-      apiCall('/admins').catch(() => [])
-    ]);
-    
-    // Process students
-    allUsers.students = (students || []).map(s => ({
+// Table rows for each user type, keyed by the entity names of the live update stream
+const USER_ROWS = {
+  student: {
+    list: 'students',
+    toRow: s => ({
       id: s.student_id,
       name: s.full_name,
       email: s.email,
@@ -169,10 +170,11 @@ async function loadAllUsers() {
       verification_status: s.verification_status || 'unverified',
       department: s.department,
       original: s
-    }));
-    
-    // Process faculty
-    allUsers.faculty = (faculty || []).map(f => ({
+    })
+  },
+  faculty: {
+    list: 'faculty',
+    toRow: f => ({
       id: f.faculty_id,
       name: f.name,
       email: f.email,
@@ -180,16 +182,34 @@ async function loadAllUsers() {
       department: f.department,
       contact: f.contact,
       original: f
-    }));
-    
-    // Process admins
-    allUsers.admin = (admins || []).map(a => ({
+    })
+  },
+  admin: {
+    list: 'admin',
+    toRow: a => ({
       id: a.admin_id,
       name: a.name,
       email: a.email,
       role: 'Admin',
       original: a
-    }));
+    })
+  }
+};
+
+async function loadAllUsers() {
+  log('Loading all users...');
+  
+  try {
+    // Fetch all user types
+    const [students, faculty, admins] = await Promise.all([
+      apiCall('/students').catch(() => []),
+      apiCall('/faculties').catch(() => []),
+      apiCall('/admins').catch(() => [])
+    ]);
+    
+    allUsers.students = (students || []).map(USER_ROWS.student.toRow);
+    allUsers.faculty = (faculty || []).map(USER_ROWS.faculty.toRow);
+    allUsers.admin = (admins || []).map(USER_ROWS.admin.toRow);
     
     log('Loaded users:', {
       students: allUsers.students.length,
@@ -206,6 +226,22 @@ async function loadAllUsers() {
   }
 }
 
+// Apply a streamed student/faculty/admin change to the loaded users
+function applyUserChange(change) {
+  const type = USER_ROWS[change.entity];
+  const rows = allUsers[type.list];
+  const index = rows.findIndex(u => u.id === change.key);
+  if (change.op === 'deleted') {
+    if (index >= 0) rows.splice(index, 1);
+  } else {
+    const row = type.toRow(Object.assign({}, index >= 0 ? rows[index].original : {}, change.data));
+    if (index >= 0) rows[index] = row;
+    else rows.push(row);
+  }
+  log(`Live ${change.op}: ${change.entity} #${change.key}`);
+  renderTable();
+}
+
 // ============================================
 // RENDER TABLE
 // ============================================
@@ -441,26 +477,25 @@ async function saveEdit() {
       payload = {
         ...user.original,
         full_name: name,
-        email: email,
-        password: password || user.original.password
+        email: email
       };
     } else if (filter === 'faculty') {
       endpoint = `/faculties/${id}`;
       payload = {
         ...user.original,
         name: name,
-        email: email,
-        password: password || user.original.password
+        email: email
       };
     } else if (filter === 'admin') {
       endpoint = `/admins/${id}`;
       payload = {
         name: name,
         email: email,
-        password: password || user.original.password,
         role: 'admin'
       };
     }
+    // Password hashes are not returned by the API; only send a password when it is being changed
+    if (password) payload.password = password;
     
     await apiCall(endpoint, {
       method: 'PUT',
@@ -499,7 +534,7 @@ async function verifyStudent(studentId) {
         method: 'POST',
         headers: { 
           'Content-Type': 'application/json',
-          'x-user-role': 'admin'
+          'Authorization': `Bearer ${getSessionToken()}`
         },
         body: JSON.stringify({ approve: true })
       });
@@ -759,11 +794,22 @@ document.addEventListener('DOMContentLoaded', function() {
   log('📡 Starting initial data load...');
   loadAllUsers();
   
-  // Auto-refresh every 30 seconds
-  setInterval(() => {
-    log('🔄 Auto-refreshing user data...');
-    loadAllUsers();
-  }, 30000);
+  // Follow live changes (polls every 30 seconds if the event stream is unavailable)
+  subscribeLiveUpdates({
+    entities: ['student', 'faculty', 'admin'],
+    onChange: applyUserChange,
+    onResync: debounceLive(() => {
+      log('🔄 Reloading user data...');
+      loadAllUsers();
+    }),
+    fallback: {
+      load: () => {
+        log('🔄 Auto-refreshing user data...');
+        loadAllUsers();
+      },
+      intervalMs: 30000
+    }
+  });
   
   log('═══════════════════════════════════════');
   log('✅ Initialization Complete!');
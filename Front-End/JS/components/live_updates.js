@@ -0,0 +1,112 @@
+// Live updates over server-sent events (GET /events/)
+//
+// subscribeLiveUpdates({ entities, onChange, onResync, fallback }) returns { close() }
+//   entities  entity names to follow, e.g. ['fee', 'student']
+//   onChange  called with each row change: { op: 'created'|'updated'|'deleted', entity, key, data }
+//   onResync  called when the page must refetch (missed events, bulk changes, stream restored)
+//   fallback  { load, intervalMs }: polled instead while the stream is unavailable
+//
+// applyLiveChange(list, change, keyField, keep) merges a row change into a cached list in
+// place; rows failing keep(row) (e.g. the page's status filter) are dropped from it.
+(function(){
+  const MAX_FAILURES = 3;
+
+  function sessionToken(){
+    try {
+      return JSON.parse(localStorage.getItem('loggedInUser') || '{}').token || '';
+    } catch (e) {
+      return '';
+    }
+  }
+
+  function subscribeLiveUpdates(options){
+    const entities = options.entities || [];
+    const onChange = options.onChange || function(){};
+    const onResync = options.onResync || function(){};
+    const fallback = options.fallback || null;
+    let pollTimer = null;
+    let failures = 0;
+    let source = null;
+
+    function startPolling(){
+      if (pollTimer || !fallback) return;
+      pollTimer = setInterval(fallback.load, fallback.intervalMs || 10000);
+    }
+
+    function stopPolling(){
+      if (pollTimer) clearInterval(pollTimer);
+      pollTimer = null;
+    }
+
+    const token = sessionToken();
+    if (window.EventSource && token){
+      const params = new URLSearchParams({ token });
+      if (entities.length) params.set('entities', entities.join(','));
+      source = new EventSource(`${window.API_BASE || ''}/events/?${params}`);
+
+      source.onopen = () => {
+        failures = 0;
+        if (pollTimer){
+          // Back from polling: whatever changed meanwhile was not streamed
+          stopPolling();
+          onResync();
+        }
+      };
+      source.onerror = () => {
+        failures += 1;
+        // CLOSED means the server refused the stream (e.g. expired session); the browser will not retry
+        if (source.readyState === EventSource.CLOSED || failures >= MAX_FAILURES) startPolling();
+      };
+      source.addEventListener('resync', () => onResync());
+      entities.forEach(entity => {
+        source.addEventListener(entity, (e) => {
+          let change;
+          try { change = JSON.parse(e.data); } catch (err) { return; }
+          // Bulk statements carry no row: refetch
+          if (change.op === 'changed') onResync();
+          else onChange(change);
+        });
+      });
+    } else {
+      startPolling();
+    }
+
+    return {
+      close(){
+        stopPolling();
+        if (source) source.close();
+        source = null;
+      }
+    };
+  }
+
+  function applyLiveChange(list, change, keyField, keep){
+    const index = list.findIndex(row => row[keyField] === change.key);
+    if (change.op === 'deleted'){
+      if (index >= 0) list.splice(index, 1);
+      return list;
+    }
+    const row = index >= 0 ? Object.assign({}, list[index], change.data) : change.data;
+    const wanted = !keep || keep(row);
+    if (index >= 0){
+      if (wanted) list[index] = row;
+      else list.splice(index, 1);
+    } else if (wanted){
+      list.push(row);
+    }
+    return list;
+  }
+
+  // Coalesce a burst of changes into one call
+  function debounceLive(fn, waitMs = 500){
+    let timer = null;
+    return function(){
+      clearTimeout(timer);
+      timer = setTimeout(fn, waitMs);
+    };
+  }
+
+  window.subscribeLiveUpdates = subscribeLiveUpdates;
+  window.applyLiveChange = applyLiveChange;
+  window.debounceLive = debounceLive;
+})();
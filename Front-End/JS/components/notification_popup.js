@@ -4,13 +4,15 @@ document.addEventListener("DOMContentLoaded", () => {
   const closeBtn = document.getElementById("closeNotif");
   const list = document.getElementById("popupList");
 
+  const logged = JSON.parse(localStorage.getItem('loggedInUser') || 'null');
+  const isStudent = logged && logged.role === 'student';
+  const countBadge = document.getElementById("notifCount");
+
   async function loadNotifications() {
     try {
-      const res = await fetch('/notifications');
-      const data = await res.json();
-      const logged = JSON.parse(localStorage.getItem('loggedInUser') || 'null');
-      let rows = data;
-      if (logged && logged.role === 'student') rows = data.filter(n => n.recipient_id === logged.id);
+      // Students get their own (paged) history rather than everyone's notifications
+      const res = await fetch(isStudent ? `/notifications/student/${logged.id}?limit=20` : '/notifications');
+      const rows = await res.json();
       if (list) {
         list.innerHTML = rows.map(n => `<li>${new Date(n.date_sent).toLocaleString()} — ${n.message}</li>`).join('');
       }
@@ -23,6 +25,12 @@ document.addEventListener("DOMContentLoaded", () => {
     popup.style.display = show ? 'flex' : 'none';
   }
 
+  function showUnreadCount(count) {
+    if (!countBadge) return;
+    countBadge.textContent = count > 99 ? '99+' : String(count);
+    countBadge.style.display = count > 0 ? '' : 'none';
+  }
+
   function showToast(message, kind = 'info') {
     const toast = document.createElement('div');
     toast.className = `edu-toast edu-toast-${kind}`;
@@ -61,6 +69,19 @@ document.addEventListener("DOMContentLoaded", () => {
 
   closeBtn?.addEventListener('click', () => togglePopup(false));
 
+  // New notifications and unread count changes are pushed to students
+  if (isStudent && window.connectNotificationSocket) {
+    const reloadIfOpen = () => { if (popup.style.display === 'flex') loadNotifications(); };
+    connectNotificationSocket({
+      onUnread: showUnreadCount,
+      onChange: (change) => {
+        if (change.op === 'created') showToast(change.data.title ? `${change.data.title}: ${change.data.message}` : change.data.message, 'info');
+        reloadIfOpen();
+      },
+      onResync: reloadIfOpen
+    });
+  }
+
   window.addEventListener('click', (e) => {
     if (!popup.contains(e.target) && e.target !== openBtn) {
       togglePopup(false);
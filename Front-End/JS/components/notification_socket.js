@@ -0,0 +1,65 @@
+// Pushed notifications for the signed-in student (WebSocket /notifications/ws)
+//
+// connectNotificationSocket({ onUnread, onChange, onResync }) returns { close() }, or null
+// when there is no student session or no WebSocket support (callers keep polling then)
+//   onUnread  called with the unread count on connect and whenever it changes
+//   onChange  called with each notification change: { op: 'created'|'updated'|'deleted', key, data }
+//   onResync  called when the page must refetch (bulk changes, missed events, reconnects)
+(function(){
+  const MAX_RETRY_MS = 30000;
+  const MAX_FAILED_ATTEMPTS = 5;
+
+  function connectNotificationSocket(handlers){
+    const onUnread = handlers.onUnread || function(){};
+    const onChange = handlers.onChange || function(){};
+    const onResync = handlers.onResync || function(){};
+
+    let logged = {};
+    try { logged = JSON.parse(localStorage.getItem('loggedInUser') || '{}'); } catch (e) { /* ignore */ }
+    if (!window.WebSocket || logged.role !== 'student' || !logged.token) return null;
+
+    const base = (window.API_BASE || window.location.origin).replace(/^http/, 'ws');
+    const url = `${base}/notifications/ws?token=${encodeURIComponent(logged.token)}`;
+    let socket = null;
+    let closed = false;
+    let connected = false;
+    let failedAttempts = 0;
+    let retryMs = 1000;
+
+    function open(){
+      socket = new WebSocket(url);
+      socket.onopen = () => {
+        // Anything pushed while we were disconnected is lost: refetch after a reconnect
+        if (connected) onResync();
+        connected = true;
+        failedAttempts = 0;
+        retryMs = 1000;
+      };
+      socket.onmessage = (e) => {
+        let message;
+        try { message = JSON.parse(e.data); } catch (err) { return; }
+        if (message.type === 'unread') onUnread(message.count);
+        else if (message.type === 'resync' || message.change?.op === 'changed') onResync();
+        else if (message.type === 'change') onChange(message.change);
+      };
+      socket.onclose = () => {
+        if (closed) return;
+        // A rejected session fails every handshake; give up after a few attempts
+        failedAttempts += 1;
+        if (failedAttempts > MAX_FAILED_ATTEMPTS) return;
+        setTimeout(open, retryMs);
+        retryMs = Math.min(retryMs * 2, MAX_RETRY_MS);
+      };
+    }
+
+    open();
+    return {
+      close(){
+        closed = true;
+        if (socket) socket.close();
+      }
+    };
+  }
+
+  window.connectNotificationSocket = connectNotificationSocket;
+})();
@@ -192,7 +192,10 @@ function initAdminUserManagement() {
   const container = document.getElementById('userManagementList') || document.getElementById('userList');
   if (!container) return;
 
-  Promise.all([fetch('/students').then(r=>r.json()), fetch('/faculties').then(r=>r.json())])
+  Promise.all([
+    fetch('/students?fields=student_id,full_name,email').then(r=>r.json()),
+    fetch('/faculties?fields=faculty_id,name,email').then(r=>r.json())
+  ])
     .then(([students, faculties]) => {
       container.innerHTML = '<h3>Students</h3>';
       const sTable = document.createElement('table');
@@ -239,19 +242,18 @@ function initFacultyManageAttendance() {
     if (!date) return;
 
     // Map course name to course_id by fetching courses
-    fetch('/courses').then(r=>r.json()).then(courses => {
+    fetch('/courses?fields=course_id,course_name,course_code').then(r=>r.json()).then(courses => {
       const course = courses.find(c=> courseName.includes(c.course_name) || courseName.includes(c.course_code));
       if (!course) return; const courseId = course.course_id;
 
-      // get enrollments and students
-      fetch('/enrollments').then(r=>r.json()).then(enrolls => {
-        const studentIds = enrolls.filter(e=>e.course_id===courseId).map(e=>e.student_id);
-        Promise.all(studentIds.map(id => fetch(`/students/${id}`).then(r=>r.json())))
+      // enrolled students with their status for this date
+      fetch(`/courses/${courseId}/roster?include=attendance&date=${date}`).then(r=>r.json())
           .then(students => {
             tbody.innerHTML = '';
             students.forEach((s, idx) => {
+              const status = s.attendance_status || 'Absent';
               const tr = document.createElement('tr');
-              tr.innerHTML = `<td>${s.student_id}</td><td>${s.full_name}</td><td><button class="toggle" data-idx="${idx}">Absent</button></td>`;
+              tr.innerHTML = `<td>${s.student_id}</td><td>${s.full_name}</td><td><button class="toggle" data-idx="${idx}"${status === 'Present' ? ' style="background:#27ae60"' : ''}>${status}</button></td>`;
               tbody.appendChild(tr);
               tr.querySelector('.toggle').addEventListener('click', (e)=>{
                 const btn = e.target; btn.textContent = btn.textContent === 'Present' ? 'Absent' : 'Present';
@@ -265,25 +267,23 @@ function initFacultyManageAttendance() {
               save.addEventListener('click', saveAttendance);
             }
           });
-      });
     });
   }
 
   function saveAttendance(){
   const date = dateInput.value; if(!date) return showAlert('Select date','warning');
     const courseName = courseSelect.value;
-    fetch('/courses').then(r=>r.json()).then(courses => {
+    fetch('/courses?fields=course_id,course_name,course_code').then(r=>r.json()).then(courses => {
       const course = courses.find(c=> courseName.includes(c.course_name) || courseName.includes(c.course_code));
       if (!course) return showAlert('Course not found','warning');
       const courseId = course.course_id;
-      const rows = Array.from(tbody.querySelectorAll('tr'));
-      const promises = rows.map(r=>{
-        const studentId = Number(r.cells[0].textContent);
-        const status = r.querySelector('.toggle').textContent;
-        const payload = { student_id: studentId, course_id: courseId, date: date, status: status };
-        return fetch('/attendance', { method:'POST', headers:{'Content-Type':'application/json'}, body: JSON.stringify(payload)});
+      const statuses = {};
+      Array.from(tbody.querySelectorAll('tr')).forEach(r=>{
+        statuses[Number(r.cells[0].textContent)] = r.querySelector('.toggle').textContent;
       });
-      Promise.all(promises).then(()=> showAlert('Attendance saved','success'));
+      const payload = { course_id: courseId, date: date, statuses: statuses };
+      fetch('/attendance/bulk', { method:'POST', headers:{'Content-Type':'application/json'}, body: JSON.stringify(payload)})
+        .then(r=>{ if(r.ok) showAlert('Attendance saved','success'); else showAlert('Save failed','error'); });
     });
   }
 
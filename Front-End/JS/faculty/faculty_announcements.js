@@ -12,22 +12,17 @@ async function loadAnnouncements() {
   console.log('Loading announcements for faculty ID:', facultyId);
 
   try {
-    const url = 'http://127.0.0.1:8000/notifications/';
-    const response = await fetch(url);
-    
+    // Every announcement is a broadcast; faculty are listed their own
+    const response = await fetch('http://127.0.0.1:8000/notifications/broadcasts/', {
+      headers: { 'Authorization': `Bearer ${session.token}` }
+    });
+
     if (!response.ok) {
-      console.error('Failed to fetch notifications:', response.status);
+      console.error('Failed to fetch announcements:', response.status);
       return;
     }
 
-    const allNotifications = await response.json();
-    console.log('All notifications:', allNotifications);
-    
-    // Filter announcements created by this faculty
-    const announcements = (allNotifications || [])
-      .filter(n => n.sender_id === facultyId && n.type === 'announcement')
-      .sort((a, b) => new Date(b.created_at) - new Date(a.created_at));
-
+    const announcements = await response.json();
     console.log('Faculty announcements:', announcements);
 
     const container = document.getElementById('announcementList');
@@ -36,7 +31,7 @@ async function loadAnnouncements() {
       return;
     }
 
-    if (announcements.length === 0) {
+    if (!announcements || announcements.length === 0) {
       container.innerHTML = '<div class="empty-state">No announcements posted yet. Create your first announcement above!</div>';
       return;
     }
@@ -45,9 +40,7 @@ async function loadAnnouncements() {
       <div class="announcement-card">
         <div class="announcement-header">
           <h3>${a.title}</h3>
-          <button class="btn-delete" onclick="deleteAnnouncement(${a.notification_id})">
-            <span>🗑️</span> Delete
-          </button>
+          <small>${a.target === 'course' ? `Course ${a.target_value}` : 'All students'}</small>
         </div>
         <p class="announcement-message">${a.message}</p>
         <div class="announcement-footer">
@@ -84,79 +77,88 @@ async function addAnnouncement() {
 
   console.log('Creating announcement with faculty ID:', facultyId);
 
+  // "All students" is stored once and seen at once; a course is expanded to its
+  // enrolled students in the background
+  const courseId = document.getElementById('announcementAudience')?.value;
+  await postBroadcast(session, courseId ? 'course' : 'all', courseId || null, title, message);
+}
+
+// Announcements go through the broadcast API; a course broadcast is written in the
+// background, so poll its progress
+async function postBroadcast(session, target, targetValue, title, message) {
+  const headers = {
+    'Content-Type': 'application/json',
+    'Authorization': `Bearer ${session.token}`
+  };
   try {
-    const newAnnouncement = {
-      sender_id: facultyId,
-      recipient_id: null,
-      student_id: null,
-      title: title,
-      message: message,
-      type: 'announcement',
-      is_read: false
-    };
-
-    console.log('Sending announcement data:', newAnnouncement);
-
-    const url = 'http://127.0.0.1:8000/notifications/';
-    const response = await fetch(url, {
+    const response = await fetch('http://127.0.0.1:8000/notifications/broadcasts/', {
       method: 'POST',
-      headers: { 
-        'Content-Type': 'application/json',
-        'Accept': 'application/json'
-      },
-      body: JSON.stringify(newAnnouncement)
+      headers,
+      body: JSON.stringify({ title, message, type: 'announcement', target, target_value: targetValue })
     });
-
-    console.log('Response status:', response.status);
-
     if (!response.ok) {
       const errorText = await response.text();
-      console.error('Error response:', errorText);
+      console.error('Broadcast failed:', errorText);
       alert('Failed to post announcement: ' + errorText);
       return;
     }
-
-    const result = await response.json();
-    console.log('Success! Result:', result);
-
-    alert('Announcement posted successfully!');
-    
-    // Clear form
+    const broadcast = await response.json();
     document.getElementById('announcementTitle').value = '';
     document.getElementById('announcementMessage').value = '';
-    
-    // Reload announcements
+    showBroadcastProgress(broadcast);
     loadAnnouncements();
-
+    if (broadcast.status !== 'completed') watchBroadcast(broadcast.broadcast_id, headers);
   } catch (error) {
     console.error('Error posting announcement:', error);
     alert('Error posting announcement: ' + error.message);
   }
 }
 
-async function deleteAnnouncement(notificationId) {
-  if (!confirm('Are you sure you want to delete this announcement?')) {
-    return;
+function showBroadcastProgress(broadcast) {
+  const el = document.getElementById('broadcastProgress');
+  if (!el) return;
+  el.hidden = false;
+  if (broadcast.status === 'failed') {
+    el.textContent = `Delivery failed after ${broadcast.delivered} of ${broadcast.total_recipients} students: ${broadcast.error || ''}`;
+  } else if (broadcast.status === 'completed') {
+    el.textContent = `Delivered to ${broadcast.delivered} students.`;
+  } else {
+    el.textContent = `Delivering... ${broadcast.delivered} of ${broadcast.total_recipients} students (${broadcast.percent_complete}%)`;
   }
+}
 
-  try {
-    const url = `http://127.0.0.1:8000/notifications/${notificationId}`;
-    const response = await fetch(url, {
-      method: 'DELETE'
-    });
-
-    if (!response.ok) {
-      const errorText = await response.text();
-      console.error('Delete failed:', errorText);
-      alert('Failed to delete announcement');
+async function watchBroadcast(broadcastId, headers) {
+  const url = `http://127.0.0.1:8000/notifications/broadcasts/${broadcastId}`;
+  while (true) {
+    await new Promise(resolve => setTimeout(resolve, 1000));
+    let broadcast;
+    try {
+      const response = await fetch(url, { headers });
+      if (!response.ok) return;
+      broadcast = await response.json();
+    } catch (error) {
       return;
     }
+    showBroadcastProgress(broadcast);
+    if (broadcast.status === 'completed' || broadcast.status === 'failed') return;
+  }
+}
 
-    alert('Announcement deleted successfully!');
-    loadAnnouncements();
+async function loadAudienceOptions(facultyId) {
+  const select = document.getElementById('announcementAudience');
+  if (!select) return;
+  try {
+    const response = await fetch(`http://127.0.0.1:8000/courses/?faculty_id=${facultyId}`);
+    if (!response.ok) return;
+    const courses = await response.json();
+    (courses || []).forEach(c => {
+      const option = document.createElement('option');
+      option.value = c.course_id;
+      option.textContent = `${c.course_code || ''} ${c.course_name}`.trim();
+      select.appendChild(option);
+    });
   } catch (error) {
-    console.error('Error deleting announcement:', error);
-    alert('Error deleting announcement: ' + error.message);
+    console.error('Error loading courses:', error);
   }
 }
 
@@ -172,4 +174,6 @@ document.addEventListener('DOMContentLoaded', () => {
   }
   
   loadAnnouncements();
+  const session = JSON.parse(localStorage.getItem('loggedInUser') || '{}');
+  if (session.id) loadAudienceOptions(session.id);
 });
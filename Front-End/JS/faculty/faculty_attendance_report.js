@@ -33,35 +33,39 @@ async function loadAttendanceReport() {
   const params = new URLSearchParams(window.location.search);
   const courseId = params.get('course_id');
 
-  const [attendanceRes, enrollmentsRes, studentsRes, coursesRes] = await Promise.all([
-    fetchJson('/attendance'),
-    fetchJson('/enrollments'),
-    fetchJson('/students'),
-    fetchJson('/courses')
-  ]);
+  const courses = (await fetchJson(`/courses/?faculty_id=${facultyId}`) || [])
+    .filter(c => !courseId || c.course_id === parseInt(courseId));
 
-  const courses = (coursesRes || []).filter(c => c.faculty_id === facultyId);
-  const enrollments = (enrollmentsRes || []).filter(e => courseId ? e.course_id === parseInt(courseId) : courses.find(c => c.course_id === e.course_id));
-  const attendance = attendanceRes || [];
-  const students = studentsRes || [];
+  // Percentages come precomputed from the attendance rollup, one request per course
+  const summaries = await Promise.all(courses.map(c => fetchJson(`/attendance/summary/course/${c.course_id}`)));
 
-  const container = document.getElementById('attendanceReportContainer');
-  if (!container) return;
+  const tbody = document.querySelector('#attendanceTable tbody');
+  const filter = document.getElementById('courseFilter');
+  if (!tbody) return;
 
-  if (attendance.length === 0) {
-    container.innerHTML = '<p class="empty-state">No attendance records</p>';
-    return;
+  const rows = [];
+  courses.forEach((course, i) => {
+    (summaries[i]?.students || []).forEach(s => rows.push({ course, ...s }));
+  });
+
+  if (filter) {
+    filter.innerHTML = '<option value="">All Courses</option>' + courses.map((c, i) => {
+      const pct = summaries[i] ? ` (${summaries[i].attendance_percentage}%)` : '';
+      return `<option value="${c.course_id}">${c.course_name}${pct}</option>`;
+    }).join('');
+    filter.onchange = () => render(filter.value);
+  }
+
+  function render(selected) {
+    const shown = rows.filter(r => !selected || r.course.course_id === parseInt(selected));
+    if (shown.length === 0) {
+      tbody.innerHTML = '<tr><td colspan="5" class="empty-state">No attendance records</td></tr>';
+      return;
+    }
+    tbody.innerHTML = shown.map(r => `<tr><td>${r.student_id}</td><td>${r.full_name || 'N/A'}</td><td>${r.course.course_name}</td><td>${r.total_count}</td><td>${r.attendance_percentage}%</td></tr>`).join('');
   }
 
-  const table = document.createElement('table');
-  table.className = 'data-table';
-  table.innerHTML = `<thead><tr><th>Student</th><th>Date</th><th>Status</th></tr></thead><tbody>
-    ${attendance.map(a => {
-      const st = students.find(s => s.student_id === a.student_id);
-      return `<tr><td>${st?.student_name || 'N/A'}</td><td>${new Date(a.date).toLocaleDateString()}</td><td><span class="badge ${a.status.toLowerCase() === 'present' ? 'present' : 'absent'}">${a.status}</span></td></tr>`;
-    }).join('')}
-  </tbody>`;
-  container.appendChild(table);
+  render(courseId || '');
 }
 
 document.addEventListener('DOMContentLoaded', () => {
@@ -79,36 +79,27 @@ async function loadStudentsList() {
   document.getElementById('selectedCourseName').textContent = `${courseCode} - ${courseName}`;
   currentCourseData = { course_id: courseId, course_code: courseCode, course_name: courseName };
 
-  // Fetch enrollments, marks, students, and grades
-  const [enrollments, allMarks, students, grades] = await Promise.all([
-    fetchJson(`/enrollments/course/${courseId}`),
-    fetchJson('/marks'),
-    fetchJson('/students'),
-    fetchJson('/grades')
-  ]);
+  // Enrolled students with their marks, in one request
+  const roster = await fetchJson(`/courses/${courseId}/roster?include=marks`);
 
-  if (!enrollments || enrollments.length === 0) {
+  if (!roster || roster.length === 0) {
     document.getElementById('studentsGrid').innerHTML = '<div class="empty-state">No students enrolled in this course</div>';
     document.getElementById('studentsListSection').style.display = 'block';
     return;
   }
 
   // Build student cards
-  const studentsHTML = enrollments.map(enrollment => {
-    const student = students.find(s => s.student_id === enrollment.student_id);
-    const marks = allMarks.find(m => m.student_id === enrollment.student_id && m.course_id == courseId);
-    const grade = grades.find(g => g.student_id === enrollment.student_id && g.course_id == courseId);
-    
-    const totalMarks = marks?.total_marks || 0;
-    const letterGrade = grade?.grade || 'Not Graded';
-    const hasMarks = marks !== undefined;
+  const studentsHTML = roster.map(student => {
+    const totalMarks = student.total_marks || 0;
+    const letterGrade = student.grade_letter || 'Not Graded';
+    const hasMarks = student.total_marks !== null && student.total_marks !== undefined;
 
     return `
-      <div class="student-card" onclick="openStudentMarks(${enrollment.student_id}, ${courseId}, '${student?.full_name || 'Unknown'}', '${courseCode}', '${courseName}')">
+      <div class="student-card" onclick="openStudentMarks(${student.student_id}, ${courseId}, '${student.full_name || 'Unknown'}', '${courseCode}', '${courseName}')">
         <div class="student-info">
-          <h3>${student?.full_name || 'Unknown'}</h3>
-          <p class="student-id">ID: ${enrollment.student_id}</p>
-          <p class="student-email">${student?.email || '-'}</p>
+          <h3>${student.full_name || 'Unknown'}</h3>
+          <p class="student-id">ID: ${student.student_id}</p>
+          <p class="student-email">${student.email || '-'}</p>
         </div>
         <div class="student-grade-info">
           <div class="marks-display">
@@ -81,44 +81,22 @@ async function loadAttendance() {
     return;
   }
 
-  // Fetch enrollments for this course
-  const enrollments = await fetchJson(`/enrollments/course/${courseId}`);
+  // Enrolled students with their status for this date, in one request
+  const roster = await fetchJson(`/courses/${courseId}/roster?include=attendance&date=${date}`);
   
-  if (!enrollments || enrollments.length === 0) {
+  if (!roster || roster.length === 0) {
     container.innerHTML = '<p class="empty-state">No students enrolled in this course</p>';
     document.getElementById('saveBtn').disabled = true;
     return;
   }
 
-  // Fetch existing attendance for this course and date
-  const existingAttendance = await fetchJson(`/attendance/course/${courseId}`);
-  const attendanceMap = {};
-  
-  if (existingAttendance) {
-    existingAttendance
-      .filter(a => a.date === date)
-      .forEach(a => {
-        attendanceMap[a.student_id] = a.status;
-      });
-  }
-
-  // Fetch student details
-  const students = await fetchJson('/students');
-  const studentMap = {};
-  if (students) {
-    students.forEach(s => studentMap[s.student_id] = s);
-  }
-
   // Build attendance data
-  currentStudents = enrollments.map(e => {
-    const student = studentMap[e.student_id] || {};
-    return {
-      student_id: e.student_id,
-      full_name: student.full_name || 'Unknown',
-      email: student.email || '',
-      status: attendanceMap[e.student_id] || 'Absent'
-    };
-  });
+  currentStudents = roster.map(s => ({
+    student_id: s.student_id,
+    full_name: s.full_name || 'Unknown',
+    email: s.email || '',
+    status: s.attendance_status || 'Absent'
+  }));
 
   // Render table
   container.innerHTML = `
@@ -186,22 +164,15 @@ async function saveAttendance() {
   saveBtn.textContent = 'Saving...';
 
   try {
-    // Save each attendance record
-    const promises = currentStudents.map(s => {
-      const payload = {
-        student_id: s.student_id,
-        course_id: parseInt(courseId),
-        date: date,
-        status: s.status
-      };
-      return fetch('http://127.0.0.1:8000/attendance/', {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify(payload)
-      });
+    // The whole session in one request; saving again overwrites it rather than duplicating it
+    const statuses = {};
+    currentStudents.forEach(s => { statuses[s.student_id] = s.status; });
+    const response = await fetch('http://127.0.0.1:8000/attendance/bulk', {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify({ course_id: parseInt(courseId), date: date, statuses: statuses })
     });
-
-    await Promise.all(promises);
+    if (!response.ok) throw new Error(`HTTP ${response.status}`);
     
     if (window.showToast) window.showToast('Attendance saved successfully', 'success');
   } catch (error) {
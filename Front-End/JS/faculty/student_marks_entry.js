@@ -66,10 +66,8 @@ async function loadStudentMarks() {
   document.getElementById('courseName').textContent = `${entryData.course_code} - ${entryData.course_name}`;
 
   // Fetch existing marks
-  const allMarks = await fetchJson('/marks');
-  currentMarks = allMarks?.find(m => 
-    m.student_id === entryData.student_id && m.course_id === entryData.course_id
-  );
+  const studentMarks = await fetchJson(`/marks/student/${entryData.student_id}/course/${entryData.course_id}`);
+  currentMarks = studentMarks?.[0];
 
   // Populate fields
   if (currentMarks) {
@@ -193,36 +191,25 @@ async function saveMarks() {
   else if (grandTotal >= 45) grade = 'D';
 
   try {
-    // Save/Update Marks
-    const marksData = {
-      student_id: entryData.student_id,
-      course_id: entryData.course_id,
-      semester: 1, // Default semester, could be fetched from course data
-      quiz1, quiz2, quiz3,
-      quiz_total: quizTotal,
-      assignment1, assignment2, assignment3,
-      assignment_total: assignmentTotal,
-      midterm1, midterm2,
-      final_exam: finalExam,
-      total_marks: grandTotal,
-      grade_letter: grade
+    // Save/Update Marks through the course gradebook endpoint (upsert, totals computed server-side)
+    const marksSheet = {
+      semester: currentMarks?.semester || 1, // Default semester, could be fetched from course data
+      rows: [{
+        student_id: entryData.student_id,
+        quiz1, quiz2, quiz3,
+        assignment1, assignment2, assignment3,
+        midterm1, midterm2,
+        final_exam: finalExam
+      }]
     };
 
-    let marksResult;
-    if (marksId) {
-      marksResult = await fetchJson(`/marks/${marksId}`, {
-        method: 'PUT',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify(marksData)
-      });
-    } else {
-      marksResult = await fetchJson('/marks/', {
-        method: 'POST',
-        headers: { 'Content-Type': 'application/json' },
-        body: JSON.stringify(marksData)
-      });
-      if (marksResult) marksId = marksResult.mark_id;
-    }
+    const marksResult = await fetchJson(`/marks/course/${entryData.course_id}/bulk`, {
+      method: 'PUT',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify(marksSheet)
+    });
+    const savedMarks = marksResult?.find(m => m.student_id === entryData.student_id);
+    if (savedMarks) marksId = savedMarks.mark_id;
 
     // Save/Update Grade
     const gradeData = {
@@ -234,10 +221,8 @@ async function saveMarks() {
     };
 
     // Check if grade exists
-    const existingGrades = await fetchJson('/grades/');
-    const existingGrade = existingGrades?.find(g => 
-      g.student_id === entryData.student_id && g.course_id === entryData.course_id
-    );
+    const existingGrades = await fetchJson(`/grades/student/${entryData.student_id}`);
+    const existingGrade = existingGrades?.find(g => g.course_id === entryData.course_id);
 
     if (existingGrade) {
       await fetchJson(`/grades/${existingGrade.grade_id}`, {
@@ -1,6 +1,6 @@
 let allFees = [];
 let allStudents = {};
-let feeRefreshInterval = null;
+let feeLiveUpdates = null;
 
 async function fetchJson(path, opts = {}){
   try{
@@ -43,7 +43,7 @@ async function fetchJson(path, opts = {}){
 async function loadFeeRecords(){
   const [feesRes, studentsRes] = await Promise.all([
     fetchJson('/fees'),
-    fetchJson('/students')
+    fetchJson('/students?fields=student_id,full_name')
   ]);
 
   allFees = feesRes || [];
@@ -89,14 +89,25 @@ function renderFeeTable(){
   }
 }
 
+// Live updates (polls every 12 seconds if the event stream is unavailable)
 function startFeeRefresh(intervalMs = 12000){
-  if (feeRefreshInterval) clearInterval(feeRefreshInterval);
-  feeRefreshInterval = setInterval(() => loadFeeRecords(), intervalMs);
+  if (feeLiveUpdates) feeLiveUpdates.close();
+  feeLiveUpdates = subscribeLiveUpdates({
+    entities: ['fee', 'student'],
+    onChange: (change) => {
+      if (change.entity === 'fee') applyLiveChange(allFees, change, 'fee_id');
+      else if (change.op === 'deleted') delete allStudents[change.key];
+      else allStudents[change.key] = { student_id: change.key, full_name: change.data.full_name ?? allStudents[change.key]?.full_name };
+      renderFeeTable();
+    },
+    onResync: debounceLive(() => loadFeeRecords()),
+    fallback: { load: () => loadFeeRecords(), intervalMs }
+  });
 }
 
 function stopFeeRefresh(){
-  if (feeRefreshInterval) clearInterval(feeRefreshInterval);
-  feeRefreshInterval = null;
+  if (feeLiveUpdates) feeLiveUpdates.close();
+  feeLiveUpdates = null;
 }
 
 function applyFilters() {
@@ -118,7 +129,7 @@ window.addEventListener('DOMContentLoaded', () => {
   // Pause on tab hidden
   document.addEventListener('visibilitychange', () => {
     if (document.hidden) stopFeeRefresh();
-    else startFeeRefresh(12000);
+    else { loadFeeRecords(); startFeeRefresh(12000); }
   });
 });
 
@@ -45,7 +45,7 @@ async function loadFeeSubmissions(){
 
   const [fees, students] = await Promise.all([
     fetchJson('/fees'),
-    fetchJson('/students')
+    fetchJson('/students?fields=student_id,full_name')
   ]);
 
   const studentsMap = Object.fromEntries((students||[]).map(s=>[s.student_id, s.full_name]));
@@ -1,6 +1,6 @@
 let allSalaries = [];
 let allFaculty = {};
-let salaryRefreshInterval = null;
+let salaryLiveUpdates = null;
 
 async function fetchJson(path, opts = {}){
   try{
@@ -121,14 +121,26 @@ async function approveSalary(salaryId){
   }
 }
 
+// Live updates (polls every 15 seconds if the event stream is unavailable)
 function startSalaryRefresh(intervalMs = 15000){
-  if (salaryRefreshInterval) clearInterval(salaryRefreshInterval);
-  salaryRefreshInterval = setInterval(() => loadSalaries(), intervalMs);
+  if (salaryLiveUpdates) salaryLiveUpdates.close();
+  salaryLiveUpdates = subscribeLiveUpdates({
+    entities: ['salary', 'faculty'],
+    onChange: (change) => {
+      if (change.entity === 'salary') applyLiveChange(allSalaries, change, 'salary_id');
+      else if (change.op === 'deleted') delete allFaculty[change.key];
+      else allFaculty[change.key] = Object.assign({}, allFaculty[change.key], change.data);
+      renderSalaryTable();
+      updateSalarySummary();
+    },
+    onResync: debounceLive(() => loadSalaries()),
+    fallback: { load: () => loadSalaries(), intervalMs }
+  });
 }
 
 function stopSalaryRefresh(){
-  if (salaryRefreshInterval) clearInterval(salaryRefreshInterval);
-  salaryRefreshInterval = null;
+  if (salaryLiveUpdates) salaryLiveUpdates.close();
+  salaryLiveUpdates = null;
 }
 
 document.addEventListener('DOMContentLoaded', () => {
@@ -152,7 +164,7 @@ document.addEventListener('DOMContentLoaded', () => {
   window.addEventListener('beforeunload', stopSalaryRefresh);
   document.addEventListener('visibilitychange', () => {
     if (document.hidden) stopSalaryRefresh();
-    else startSalaryRefresh(15000);
+    else { loadSalaries(); startSalaryRefresh(15000); }
   });
 });
 
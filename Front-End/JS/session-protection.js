@@ -63,6 +63,12 @@ function displayUserInfo(user) {
 // Logout function
 function logout() {
   if (confirm('Are you sure you want to logout?')) {
+    // Revoke the server-side session as well; the local copy is cleared regardless
+    const user = getCurrentUser();
+    if (user && user.token) {
+      fetch('/auth/logout', { method: 'POST', headers: { 'Authorization': `Bearer ${user.token}` } })
+        .catch(() => { /* ignore */ });
+    }
     localStorage.removeItem('loggedInUser');
     alert('Logged out successfully');
     window.location.href = '/pages/login.html';
@@ -55,7 +55,10 @@ async function loadAttendanceDetail() {
   // Fetch student's enrolled courses and their attendance records
   const [coursesRes, attendanceRes] = await Promise.all([
     fetchJson(`/courses/student/${studentId}`),
-    fetchJson(`/attendance/student/${studentId}`)
+    // One course's records come straight from the (student, course, date) index
+    fetchJson(courseId
+      ? `/attendance/?student_id=${studentId}&course_id=${courseId}&limit=1000`
+      : `/attendance/student/${studentId}`)
   ]);
 
   const courses = (coursesRes || []).filter(c => !courseId || c.course_id == courseId);
@@ -39,6 +39,8 @@ async function fetchJson(path, opts = {}) {
   return null;
 }
 
+let studentNotifications = [];
+
 async function loadNotifications() {
   const session = JSON.parse(localStorage.getItem('loggedInUser') || '{}');
   const studentId = session.id;
@@ -48,9 +50,14 @@ async function loadNotifications() {
     return;
   }
 
-  // Fetch all notifications
-  const notificationsRes = await fetchJson(`/notifications`);
-  const notifications = (notificationsRes || []).filter(n => n.student_id === studentId || !n.student_id).sort((a, b) => new Date(b.created_at) - new Date(a.created_at));
+  // The student's own history (and notifications sent to everyone), newest first
+  const notificationsRes = await fetchJson(`/notifications/student/${studentId}`);
+  studentNotifications = notificationsRes || [];
+  renderNotifications();
+}
+
+function renderNotifications() {
+  const notifications = studentNotifications;
 
   // Render notifications
   const container = document.getElementById('notificationsContainer');
@@ -79,12 +86,27 @@ async function loadNotifications() {
       <div class="notification-body">
         <p>${n.message || ''}</p>
       </div>
-      ${!n.is_read ? `<button class="btn-small" onclick="markAsRead(${n.notification_id})">Mark as Read</button>` : ''}
+      ${!n.is_read ? (n.notification_id != null
+        ? `<button class="btn-small" onclick="markAsRead(${n.notification_id})">Mark as Read</button>`
+        : `<button class="btn-small" onclick="markAnnouncementAsRead(${n.broadcast_id})">Mark as Read</button>`) : ''}
     </div>
     `;
   }).join('');
 }
 
+// Apply a pushed change without refetching the list
+function applyNotificationChange(change) {
+  const index = studentNotifications.findIndex(n => n.notification_id === change.key);
+  if (change.op === 'deleted') {
+    if (index >= 0) studentNotifications.splice(index, 1);
+  } else if (index >= 0) {
+    studentNotifications[index] = Object.assign({}, studentNotifications[index], change.data);
+  } else {
+    studentNotifications.unshift(change.data);
+  }
+  renderNotifications();
+}
+
 async function markAsRead(notificationId) {
   const result = await fetchJson(`/notifications/${notificationId}`, {
     method: 'PUT',
@@ -98,9 +120,29 @@ async function markAsRead(notificationId) {
   }
 }
 
-// Auto-refresh every 20 seconds
+// Announcements are stored once for their whole audience: their read state is per student
+async function markAnnouncementAsRead(broadcastId) {
+  const session = JSON.parse(localStorage.getItem('loggedInUser') || '{}');
+  const result = await fetchJson(`/notifications/student/${session.id}/announcements/${broadcastId}/read`, {
+    method: 'POST'
+  });
+
+  if (result) {
+    if (window.showToast) window.showToast('Notification marked as read', 'success');
+    loadNotifications();
+  }
+}
+
+// Changes are pushed over the notification socket; poll every 20 seconds only without it
+let notificationSocket = null;
 let refreshInterval = null;
 function startAutoRefresh() {
+  if (notificationSocket || refreshInterval) return;
+  notificationSocket = window.connectNotificationSocket ? connectNotificationSocket({
+    onChange: applyNotificationChange,
+    onResync: () => loadNotifications()
+  }) : null;
+  if (notificationSocket) return;
   refreshInterval = setInterval(() => {
     if (document.hidden) return;
     loadNotifications();
@@ -108,6 +150,10 @@ function startAutoRefresh() {
 }
 
 function stopAutoRefresh() {
+  if (notificationSocket) {
+    notificationSocket.close();
+    notificationSocket = null;
+  }
   if (refreshInterval) {
     clearInterval(refreshInterval);
     refreshInterval = null;
@@ -125,5 +171,5 @@ document.addEventListener('DOMContentLoaded', () => {
 
 document.addEventListener('visibilitychange', () => {
   if (document.hidden) stopAutoRefresh();
-  else startAutoRefresh();
+  else { loadNotifications(); startAutoRefresh(); }
 });
@@ -120,8 +120,9 @@ CREATE TABLE Attendance (
         ON DELETE CASCADE ON UPDATE CASCADE,
     FOREIGN KEY (course_id) REFERENCES Course(course_id)
         ON DELETE CASCADE ON UPDATE CASCADE,
+    UNIQUE KEY unique_student_course_date (student_id, course_id, date),
     INDEX idx_attendance_student_id (student_id),
-    INDEX idx_attendance_course_id (course_id),
+    INDEX idx_attendance_course_date (course_id, date),
     INDEX idx_attendance_date (date),
     INDEX idx_attendance_status (status)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
@@ -241,11 +242,15 @@ CREATE TABLE Notifications (
     created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
     type VARCHAR(20),
     is_read BOOLEAN DEFAULT FALSE,
+    broadcast_id INT NULL,
     INDEX idx_notifications_recipient_id (recipient_id),
     INDEX idx_notifications_student_id (student_id),
     INDEX idx_notifications_sender_id (sender_id),
     INDEX idx_notifications_date_sent (date_sent),
-    INDEX idx_notifications_is_read (is_read)
+    INDEX idx_notifications_is_read (is_read),
+    INDEX idx_notifications_student_created (student_id, created_at),
+    INDEX idx_notifications_student_read_created (student_id, is_read, created_at),
+    INDEX idx_notifications_broadcast (broadcast_id, student_id)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
 -- ----------------------------
@@ -287,6 +292,206 @@ CREATE TABLE Salary (
     INDEX idx_salary_payment_date (payment_date)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
 
+-- ----------------------------
+-- DASHBOARD COUNTERS TABLE (Materialized dashboard statistics)
+-- ----------------------------
+CREATE TABLE DashboardCounters (
+    scope VARCHAR(20) NOT NULL,
+    scope_id INT NOT NULL DEFAULT 0,
+    payload TEXT NOT NULL,
+    refreshed_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    generation INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (scope, scope_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- ----------------------------
+-- LOGIN IDENTITY TABLE (Identifier index for login, rebuilt by the API on startup when empty)
+-- ----------------------------
+CREATE TABLE LoginIdentity (
+    login_identity_id INT AUTO_INCREMENT PRIMARY KEY,
+    identifier VARCHAR(100) NOT NULL,
+    kind VARCHAR(20) NOT NULL,
+    role VARCHAR(20) NOT NULL,
+    user_id INT NOT NULL,
+    priority INT NOT NULL,
+    INDEX idx_login_identity_lookup (identifier, priority, user_id),
+    INDEX idx_login_identity_user (role, user_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- ----------------------------
+-- USER SESSIONS TABLE (Signed login sessions)
+-- ----------------------------
+CREATE TABLE UserSessions (
+    session_id VARCHAR(64) PRIMARY KEY,
+    role VARCHAR(20) NOT NULL,
+    user_id INT NOT NULL,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    expires_at DATETIME NOT NULL,
+    revoked BOOLEAN DEFAULT FALSE,
+    INDEX idx_user_sessions_user (role, user_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- ----------------------------
+-- TABLE VERSIONS TABLE (Change counters for conditional GETs)
+-- ----------------------------
+CREATE TABLE TableVersions (
+    table_name VARCHAR(50) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- ----------------------------
+-- NOTIFICATION BROADCASTS TABLE (Announcements to a course, department, semester or everyone)
+-- ----------------------------
+CREATE TABLE NotificationBroadcasts (
+    broadcast_id INT AUTO_INCREMENT PRIMARY KEY,
+    sender_id INT,
+    title VARCHAR(255) NOT NULL DEFAULT 'Notification',
+    message VARCHAR(500) NOT NULL,
+    type VARCHAR(20),
+    target VARCHAR(20) NOT NULL,
+    target_value VARCHAR(100),
+    delivery VARCHAR(10) NOT NULL DEFAULT 'write',
+    status VARCHAR(20) NOT NULL DEFAULT 'queued',
+    total_recipients INT NOT NULL DEFAULT 0,
+    delivered INT NOT NULL DEFAULT 0,
+    last_student_id INT NOT NULL DEFAULT 0,
+    attempts INT NOT NULL DEFAULT 0,
+    locked_until DATETIME NULL,
+    error VARCHAR(500),
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    started_at DATETIME NULL,
+    finished_at DATETIME NULL,
+    INDEX idx_notification_broadcasts_status (status),
+    INDEX idx_notification_broadcasts_audience (delivery, target, target_value, created_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- ----------------------------
+-- NOTIFICATION READ MARKERS TABLE (Announcements up to read_through are read by the student)
+-- ----------------------------
+CREATE TABLE NotificationReadMarkers (
+    student_id INT PRIMARY KEY,
+    read_through INT NOT NULL DEFAULT 0,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- ----------------------------
+-- NOTIFICATION READS TABLE (Single announcements read past the student's read marker)
+-- ----------------------------
+CREATE TABLE NotificationReads (
+    student_id INT NOT NULL,
+    broadcast_id INT NOT NULL,
+    read_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (student_id, broadcast_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- ----------------------------
+-- NOTIFICATIONS ARCHIVE TABLE (Read notifications past the retention age)
+-- ----------------------------
+CREATE TABLE NotificationsArchive (
+    notification_id INT PRIMARY KEY,
+    sender_id INT,
+    recipient_id INT,
+    student_id INT,
+    title VARCHAR(255) NOT NULL DEFAULT 'Notification',
+    message VARCHAR(500) NOT NULL,
+    date_sent DATETIME,
+    created_at DATETIME,
+    type VARCHAR(20),
+    is_read BOOLEAN DEFAULT TRUE,
+    broadcast_id INT NULL,
+    archived_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_notifications_archive_student_created (student_id, created_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- ----------------------------
+-- ATTENDANCE SUMMARY TABLE (Per-student, per-course attendance counts, rebuilt by the API on startup when empty)
+-- ----------------------------
+CREATE TABLE AttendanceSummary (
+    student_id INT NOT NULL,
+    course_id INT NOT NULL,
+    semester INT NOT NULL DEFAULT 0,
+    present_count INT NOT NULL DEFAULT 0,
+    absent_count INT NOT NULL DEFAULT 0,
+    late_count INT NOT NULL DEFAULT 0,
+    total_count INT NOT NULL DEFAULT 0,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (student_id, course_id, semester),
+    INDEX idx_attendance_summary_course (course_id, semester)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- ----------------------------
+-- ATTENDANCE COURSE SUMMARY TABLE (AttendanceSummary rolled up per course and semester)
+-- ----------------------------
+CREATE TABLE AttendanceCourseSummary (
+    course_id INT NOT NULL,
+    semester INT NOT NULL DEFAULT 0,
+    present_count INT NOT NULL DEFAULT 0,
+    absent_count INT NOT NULL DEFAULT 0,
+    late_count INT NOT NULL DEFAULT 0,
+    total_count INT NOT NULL DEFAULT 0,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (course_id, semester)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- ----------------------------
+-- ATTENDANCE DEPARTMENT SUMMARY TABLE (AttendanceSummary rolled up per student department, course and semester)
+-- ----------------------------
+CREATE TABLE AttendanceDepartmentSummary (
+    department VARCHAR(50) NOT NULL,
+    course_id INT NOT NULL,
+    semester INT NOT NULL DEFAULT 0,
+    present_count INT NOT NULL DEFAULT 0,
+    absent_count INT NOT NULL DEFAULT 0,
+    late_count INT NOT NULL DEFAULT 0,
+    total_count INT NOT NULL DEFAULT 0,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (department, course_id, semester),
+    INDEX idx_attendance_department_summary_course (course_id, semester)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- ----------------------------
+-- ATTENDANCE ARCHIVE TABLE (Attendance of past semesters, moved by rollover_semester.py)
+-- ----------------------------
+CREATE TABLE AttendanceArchive (
+    attendance_id INT PRIMARY KEY,
+    student_id INT NOT NULL,
+    course_id INT NOT NULL,
+    date DATE NOT NULL,
+    status VARCHAR(10) NOT NULL,
+    semester INT NOT NULL,
+    archived_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_attendance_archive_student_course_date (student_id, course_id, date),
+    INDEX idx_attendance_archive_course_date (course_id, date)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
+-- ----------------------------
+-- MARKS ARCHIVE TABLE (Marks of past semesters, moved by rollover_semester.py)
+-- ----------------------------
+CREATE TABLE MarksArchive (
+    mark_id INT PRIMARY KEY,
+    student_id INT NOT NULL,
+    course_id INT NOT NULL,
+    semester INT,
+    quiz1 DECIMAL(5,2),
+    quiz2 DECIMAL(5,2),
+    quiz3 DECIMAL(5,2),
+    quiz_total DECIMAL(5,2),
+    assignment1 DECIMAL(5,2),
+    assignment2 DECIMAL(5,2),
+    assignment3 DECIMAL(5,2),
+    assignment_total DECIMAL(5,2),
+    midterm1 DECIMAL(5,2),
+    midterm2 DECIMAL(5,2),
+    final_exam DECIMAL(5,2),
+    total_marks DECIMAL(5,2),
+    grade_letter VARCHAR(2),
+    created_at DATETIME,
+    updated_at DATETIME,
+    archived_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_marks_archive_student_course (student_id, course_id, semester),
+    INDEX idx_marks_archive_course_semester (course_id, semester)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci;
+
 -- ===========================================================
 -- COMPREHENSIVE TEST DATA
 -- Passwords are bcrypt-hashed for security
@@ -0,0 +1,69 @@
+"""
+Background delivery of notification broadcasts.
+
+POST /notifications/broadcasts/ only queues a broadcast; this worker writes its
+Notifications rows off the request path, one broadcast at a time, in a worker thread with
+its own session. Broadcasts left queued or running by a restart are resumed at startup.
+Each delivery claims its broadcast first (see crud.broadcasts), so several worker
+processes can share the queue; a failed attempt is queued again after
+BROADCAST_RETRY_DELAY seconds.
+"""
+import asyncio
+import logging
+from database import SessionLocal
+from crud import broadcasts as broadcasts_crud
+
+logger = logging.getLogger(__name__)
+
+_queue: asyncio.Queue | None = None
+_loop: asyncio.AbstractEventLoop | None = None
+
+
+def _deliver(broadcast_id: int) -> str:
+    db = SessionLocal()
+    try:
+        return broadcasts_crud.deliver(db, broadcast_id).status
+    finally:
+        db.close()
+
+
+def _pending() -> list:
+    db = SessionLocal()
+    try:
+        return broadcasts_crud.pending_broadcast_ids(db)
+    finally:
+        db.close()
+
+
+def enqueue(broadcast_id: int):
+    """Schedule delivery of a queued broadcast (callable from the request threadpool).
+
+    Without a running worker the broadcast stays queued and is picked up at the next start.
+    """
+    if _loop is None:
+        logger.warning(f"Broadcast worker is not running; broadcast {broadcast_id} stays queued")
+        return
+    _loop.call_soon_threadsafe(_queue.put_nowait, broadcast_id)
+
+
+async def run():
+    """Deliver queued broadcasts until cancelled"""
+    global _queue, _loop
+    _queue = asyncio.Queue()
+    _loop = asyncio.get_running_loop()
+    try:
+        for broadcast_id in await asyncio.to_thread(_pending):
+            _queue.put_nowait(broadcast_id)
+    except Exception as e:
+        logger.error(f"Could not load pending broadcasts: {e}")
+
+    while True:
+        broadcast_id = await _queue.get()
+        try:
+            status = await asyncio.to_thread(_deliver, broadcast_id)
+        except Exception as e:
+            logger.error(f"Broadcast {broadcast_id} delivery failed: {e}")
+            continue
+        if status == "queued":
+            # A failed attempt with retries left
+            _loop.call_later(broadcasts_crud.BROADCAST_RETRY_DELAY, _queue.put_nowait, broadcast_id)
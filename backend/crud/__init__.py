@@ -1,2 +1,5 @@
 # crud/__init__.py
 # empty init to make crud a package
+
+# Register the table version hooks for every session that writes through the ORM
+from crud import table_versions  # noqa: F401
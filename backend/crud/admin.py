@@ -1,14 +1,18 @@
 from sqlalchemy.orm import Session
+from sqlalchemy import func, select, case, or_, and_
 from fastapi import HTTPException
-from models import Admin
-from schemas import AdminCreate
-from security import hash_password
+from models import Admin, Student, Faculty, Fee
+from schemas import AdminCreate, AdminUpdate
+from crud import login_identity
+from crud import sessions
 
 def create_admin(db: Session, data: AdminCreate):
+    """`password` is already hashed: the router hashes it on the bcrypt worker pool"""
     admin_data = data.dict()
-    admin_data['password'] = hash_password(admin_data['password'])
     obj = Admin(**admin_data)
     db.add(obj)
+    db.flush()
+    login_identity.sync_user(db, login_identity.ADMIN, obj)
     db.commit()
     db.refresh(obj)
     return obj
@@ -19,25 +23,83 @@ def get_admins(db: Session):
 def get_admin(db: Session, admin_id: int):
     return db.query(Admin).filter(Admin.admin_id == admin_id).first()
 
-def update_admin(db: Session, admin_id: int, data: AdminCreate):
+def update_admin(db: Session, admin_id: int, data: AdminUpdate):
+    """A non-empty `password` is already hashed: the router hashes it on the bcrypt worker pool"""
     admin = get_admin(db, admin_id)
     if not admin:
         raise HTTPException(status_code=404, detail="Admin not found")
     
     update_data = data.dict()
-    if 'password' in update_data and update_data['password']:
-        update_data['password'] = hash_password(update_data['password'])
+    if not update_data.get('password'):
+        update_data.pop('password', None)
+    else:
+        # A new password signs the user out everywhere, as a reset does
+        sessions.revoke_user_sessions(db, login_identity.ADMIN, admin_id)
     
     for k, v in update_data.items():
         setattr(admin, k, v)
+    login_identity.sync_user(db, login_identity.ADMIN, admin)
     db.commit()
     db.refresh(admin)
     return admin
 
+def reset_password(db: Session, admin_id: int, password_hash: str):
+    """Set a new (hashed) password and sign the admin out everywhere"""
+    admin = get_admin(db, admin_id)
+    if not admin:
+        raise HTTPException(status_code=404, detail="Admin not found")
+    admin.password = password_hash
+    sessions.revoke_user_sessions(db, 'admin', admin_id)
+    db.commit()
+
 def delete_admin(db: Session, admin_id: int):
     admin = get_admin(db, admin_id)
     if not admin:
         raise HTTPException(status_code=404, detail="Admin not found")
     db.delete(admin)
+    login_identity.remove_user(db, login_identity.ADMIN, admin_id)
+    sessions.revoke_user_sessions(db, login_identity.ADMIN, admin_id)
     db.commit()
     return {"detail": "Admin deleted"}
+
+
+def get_dashboard_stats(db: Session):
+    """Compute the admin dashboard figures with one aggregate query (no ORM rows are loaded)"""
+    verified = and_(
+        Student.profile_verified == True,
+        Student.verification_status == 'verified'
+    )
+    pending = Student.verification_status == 'pending'
+    # Students missing required fields (address or department is NULL or empty)
+    incomplete = or_(
+        Student.address.is_(None), Student.address == '',
+        Student.department.is_(None), Student.department == ''
+    )
+
+    total_faculty = select(func.count(Faculty.faculty_id)).scalar_subquery()
+    total_amount = select(func.coalesce(func.sum(Fee.total_amount), 0)).scalar_subquery()
+    amount_paid = select(func.coalesce(func.sum(Fee.amount_paid), 0)).scalar_subquery()
+
+    row = db.query(
+        func.count(case((verified, 1))).label("total_students"),
+        func.count(case((pending, 1))).label("pending_verification"),
+        func.count(case((incomplete, 1))).label("incomplete_profiles"),
+        # A student can be both pending and incomplete; count each once
+        func.count(case((or_(pending, incomplete), 1))).label("pending_requests"),
+        total_faculty.label("total_faculty"),
+        total_amount.label("total_amount"),
+        amount_paid.label("amount_paid"),
+    ).select_from(Student).one()
+
+    total_amount = float(row.total_amount or 0)
+    amount_paid = float(row.amount_paid or 0)
+    fee_collection_percent = round((amount_paid / total_amount * 100), 2) if total_amount > 0 else 0
+
+    return {
+        "total_students": int(row.total_students or 0),
+        "total_faculty": int(row.total_faculty or 0),
+        "fee_collection_percent": fee_collection_percent,
+        "pending_requests": int(row.pending_requests or 0),
+        "pending_verification": int(row.pending_verification or 0),
+        "incomplete_profiles": int(row.incomplete_profiles or 0)
+    }
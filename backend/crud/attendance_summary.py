@@ -0,0 +1,341 @@
+"""
+Attendance rollups.
+
+AttendanceSummary holds one row of present/absent/late/total counts per (student_id,
+course_id, semester), so attendance percentages are read from a handful of pre-aggregated
+rows instead of counting every class day in Attendance. AttendanceCourseSummary (per
+course and semester) and AttendanceDepartmentSummary (per student department, course and
+semester) roll the same counts up further, so course and department percentages are a
+single-row or per-course read whatever the number of students.
+
+The attendance CRUD functions call apply_changes() inside their own transaction with the
+(old status, new status) of each row they write; the counts of all three tables are moved
+with INSERT ... ON DUPLICATE KEY UPDATE col = col + delta, so concurrent sessions for the
+same course add up instead of overwriting each other.
+
+The semester of a row is the semester of the student's enrollment in the course (the
+latest one if the course was retaken, 0 when there is none): enrollment changes call
+move_enrollment() to re-key a student's counts for the course, a student's department
+change calls move_department(), and deleting a student or course (whose Attendance rows
+the database cascades away) calls remove_student() / remove_course(). rebuild() recomputes
+every table from Attendance and AttendanceArchive; main.py runs it on first start and
+scripts/rebuild_attendance_summary.py after attendance or enrollments are changed outside
+the API.
+"""
+from collections import defaultdict
+from datetime import datetime
+from sqlalchemy import insert, select, union_all, func, case, and_, literal, DateTime
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from fastapi import HTTPException
+from models import (
+    AttendanceSummary, AttendanceCourseSummary, AttendanceDepartmentSummary,
+    Attendance, AttendanceArchive, Enrollment, Student, Course
+)
+
+# Lower-cased status -> the count it is added to (every status is added to total_count)
+STATUS_COLUMNS = {
+    "present": "present_count",
+    "absent": "absent_count",
+    "late": "late_count",
+}
+COUNT_COLUMNS = ("present_count", "absent_count", "late_count", "total_count")
+
+
+def _columns(status: str | None):
+    if status is None:
+        return ()
+    bucket = STATUS_COLUMNS.get(status.strip().lower())
+    return ("total_count", bucket) if bucket else ("total_count",)
+
+
+def _semesters(db: Session, pairs) -> dict:
+    """Enrollment semester of each (student_id, course_id) pair that has one"""
+    student_ids = {student_id for student_id, _ in pairs}
+    course_ids = {course_id for _, course_id in pairs}
+    rows = db.query(Enrollment.student_id, Enrollment.course_id, func.max(Enrollment.semester)).filter(
+        Enrollment.student_id.in_(student_ids),
+        Enrollment.course_id.in_(course_ids)
+    ).group_by(Enrollment.student_id, Enrollment.course_id).all()
+    return {(student_id, course_id): semester for student_id, course_id, semester in rows}
+
+
+def _zero() -> dict:
+    return dict.fromkeys(COUNT_COLUMNS, 0)
+
+
+def _upsert(db: Session, model, keyed: dict, key_columns: tuple, now: datetime):
+    """Add {key: counts} deltas to a rollup table, in key order so concurrent writers lock alike"""
+    values = [
+        {**dict(zip(key_columns, key)), "updated_at": now, **delta}
+        for key, delta in sorted(keyed.items()) if any(delta.values())
+    ]
+    if not values:
+        return
+    stmt = mysql_insert(model).values(values)
+    stmt = stmt.on_duplicate_key_update(
+        updated_at=stmt.inserted.updated_at,
+        **{column: getattr(model, column) + getattr(stmt.inserted, column) for column in COUNT_COLUMNS}
+    )
+    db.execute(stmt)
+
+
+def _add(db: Session, deltas: dict):
+    """Add {(student_id, course_id, semester): counts} deltas to the student, course and department rollups"""
+    deltas = {key: delta for key, delta in deltas.items() if any(delta.values())}
+    if not deltas:
+        return
+    departments = dict(db.query(Student.student_id, Student.department).filter(
+        Student.student_id.in_({student_id for student_id, _, _ in deltas})
+    ))
+    courses = defaultdict(_zero)
+    department_courses = defaultdict(_zero)
+    for (student_id, course_id, semester), delta in deltas.items():
+        department = departments.get(student_id)
+        for column, value in delta.items():
+            courses[(course_id, semester)][column] += value
+            if department:
+                department_courses[(department, course_id, semester)][column] += value
+
+    now = datetime.utcnow()
+    _upsert(db, AttendanceSummary, deltas, ("student_id", "course_id", "semester"), now)
+    _upsert(db, AttendanceCourseSummary, courses, ("course_id", "semester"), now)
+    _upsert(db, AttendanceDepartmentSummary, department_courses, ("department", "course_id", "semester"), now)
+
+
+def _drop_empty(db: Session, course_id: int, student_id: int | None = None):
+    """Delete the rows of a course (and student) that no attendance counts any more"""
+    if student_id is not None:
+        db.query(AttendanceSummary).filter(
+            AttendanceSummary.student_id == student_id,
+            AttendanceSummary.course_id == course_id,
+            AttendanceSummary.total_count == 0
+        ).delete(synchronize_session=False)
+    for model in (AttendanceCourseSummary, AttendanceDepartmentSummary):
+        db.query(model).filter(model.course_id == course_id, model.total_count == 0).delete(synchronize_session=False)
+
+
+def apply_changes(db: Session, changes):
+    """Move the counts for attendance rows written in the caller's transaction.
+
+    `changes` holds (student_id, course_id, old_status, new_status) tuples; old_status is
+    None for an inserted row and new_status None for a deleted one.
+    """
+    pairs = defaultdict(_zero)
+    for student_id, course_id, old_status, new_status in changes:
+        if student_id is None or course_id is None:
+            continue
+        delta = pairs[(student_id, course_id)]
+        for column in _columns(old_status):
+            delta[column] -= 1
+        for column in _columns(new_status):
+            delta[column] += 1
+
+    pairs = {pair: delta for pair, delta in pairs.items() if any(delta.values())}
+    if not pairs:
+        return
+    semesters = _semesters(db, pairs)
+    _add(db, {
+        (student_id, course_id, semesters.get((student_id, course_id)) or 0): delta
+        for (student_id, course_id), delta in pairs.items()
+    })
+
+
+def move_enrollment(db: Session, student_id: int, course_id: int):
+    """Re-key a student's counts for a course to the semester of their (flushed) enrollment"""
+    semester = _semesters(db, [(student_id, course_id)]).get((student_id, course_id)) or 0
+    rows = db.query(AttendanceSummary).filter(
+        AttendanceSummary.student_id == student_id,
+        AttendanceSummary.course_id == course_id,
+        AttendanceSummary.semester != semester
+    ).with_for_update().all()
+    if not rows:
+        return
+    deltas = defaultdict(_zero)
+    for row in rows:
+        for column, value in _counts(row).items():
+            deltas[(student_id, course_id, row.semester)][column] -= value
+            deltas[(student_id, course_id, semester)][column] += value
+    _add(db, deltas)
+    _drop_empty(db, course_id, student_id)
+
+
+def move_department(db: Session, student_id: int, old_department: str | None, new_department: str | None):
+    """Move a student's counts between department rollups when their department changes"""
+    if (old_department or None) == (new_department or None):
+        return
+    moved = defaultdict(_zero)
+    for row in db.query(AttendanceSummary).filter(AttendanceSummary.student_id == student_id):
+        for column, value in _counts(row).items():
+            if old_department:
+                moved[(old_department, row.course_id, row.semester)][column] -= value
+            if new_department:
+                moved[(new_department, row.course_id, row.semester)][column] += value
+    _upsert(db, AttendanceDepartmentSummary, moved, ("department", "course_id", "semester"), datetime.utcnow())
+    for course_id in {course_id for _, course_id, _ in moved}:
+        _drop_empty(db, course_id)
+
+
+def remove_student(db: Session, student_id: int):
+    """Take a student being deleted (with their cascaded attendance) out of every rollup"""
+    rows = db.query(AttendanceSummary).filter(AttendanceSummary.student_id == student_id).with_for_update().all()
+    deltas = {
+        (student_id, row.course_id, row.semester): {column: -value for column, value in _counts(row).items()}
+        for row in rows
+    }
+    _add(db, deltas)
+    for course_id in {row.course_id for row in rows}:
+        _drop_empty(db, course_id, student_id)
+
+
+def remove_course(db: Session, course_id: int):
+    """Drop every rollup row of a course being deleted (with its cascaded attendance)"""
+    for model in (AttendanceSummary, AttendanceCourseSummary, AttendanceDepartmentSummary):
+        db.query(model).filter(model.course_id == course_id).delete(synchronize_session=False)
+
+
+def is_empty(db: Session) -> bool:
+    """True when a rollup table has to be built (first start, or the course rollup is new)"""
+    return (db.query(AttendanceSummary.student_id).first() is None
+            or db.query(AttendanceCourseSummary.course_id).first() is None)
+
+
+def rebuild(db: Session):
+    """Recompute every summary row from Attendance and AttendanceArchive. Returns rows written"""
+    semesters = select(
+        Enrollment.student_id, Enrollment.course_id, func.max(Enrollment.semester).label("semester")
+    ).group_by(Enrollment.student_id, Enrollment.course_id).subquery()
+    records = union_all(
+        select(Attendance.student_id, Attendance.course_id, Attendance.status, Attendance.attendance_id),
+        select(AttendanceArchive.student_id, AttendanceArchive.course_id, AttendanceArchive.status,
+               AttendanceArchive.attendance_id)
+    ).subquery()
+    status = func.lower(records.c.status)
+    counts = [
+        func.sum(case((status == value, 1), else_=0)) for value in STATUS_COLUMNS
+    ]
+    source = select(
+        records.c.student_id, records.c.course_id, func.coalesce(semesters.c.semester, 0),
+        *counts, func.count(records.c.attendance_id), literal(datetime.utcnow(), DateTime)
+    ).outerjoin(semesters, and_(
+        semesters.c.student_id == records.c.student_id,
+        semesters.c.course_id == records.c.course_id
+    )).where(
+        records.c.student_id.isnot(None),
+        records.c.course_id.isnot(None)
+    ).group_by(records.c.student_id, records.c.course_id, semesters.c.semester)
+
+    now = literal(datetime.utcnow(), DateTime)
+    courses = select(
+        AttendanceSummary.course_id, AttendanceSummary.semester, *_sums(), now
+    ).group_by(AttendanceSummary.course_id, AttendanceSummary.semester)
+    departments = select(
+        Student.department, AttendanceSummary.course_id, AttendanceSummary.semester, *_sums(), now
+    ).join(Student, Student.student_id == AttendanceSummary.student_id).where(
+        Student.department.isnot(None), Student.department != ""
+    ).group_by(Student.department, AttendanceSummary.course_id, AttendanceSummary.semester)
+
+    for model in (AttendanceSummary, AttendanceCourseSummary, AttendanceDepartmentSummary):
+        db.query(model).delete(synchronize_session=False)
+    db.execute(insert(AttendanceSummary).from_select(
+        ["student_id", "course_id", "semester", *STATUS_COLUMNS.values(), "total_count", "updated_at"], source
+    ))
+    db.execute(insert(AttendanceCourseSummary).from_select(["course_id", "semester", *COUNT_COLUMNS, "updated_at"], courses))
+    db.execute(insert(AttendanceDepartmentSummary).from_select(
+        ["department", "course_id", "semester", *COUNT_COLUMNS, "updated_at"], departments
+    ))
+    db.commit()
+    return db.query(func.count()).select_from(AttendanceSummary).scalar()
+
+
+# -----------------------------------------------------------
+# REPORTS
+# -----------------------------------------------------------
+def _percentage(present, total) -> float:
+    return round(present / total * 100, 2) if total else 0.0
+
+
+def _counts(row) -> dict:
+    return {column: int(getattr(row, column) or 0) for column in COUNT_COLUMNS}
+
+
+def _totals(counts: dict) -> dict:
+    present, absent, late, total = (counts[column] for column in COUNT_COLUMNS)
+    return {
+        "present_count": present,
+        "absent_count": absent,
+        "late_count": late,
+        "total_count": total,
+        "attendance_percentage": _percentage(present, total),
+    }
+
+
+def _sums(model=AttendanceSummary):
+    return [func.sum(getattr(model, column)).label(column) for column in COUNT_COLUMNS]
+
+
+def get_student_summary(db: Session, student_id: int, semester: int | None = None):
+    """A student's attendance per course"""
+    query = db.query(AttendanceSummary, Course.course_name, Course.course_code).outerjoin(
+        Course, Course.course_id == AttendanceSummary.course_id
+    ).filter(AttendanceSummary.student_id == student_id)
+    if semester is not None:
+        query = query.filter(AttendanceSummary.semester == semester)
+    return [
+        {"student_id": s.student_id, "course_id": s.course_id, "semester": s.semester,
+         "course_name": course_name, "course_code": course_code, **_totals(_counts(s))}
+        for s, course_name, course_code in query.order_by(AttendanceSummary.semester, AttendanceSummary.course_id)
+    ]
+
+
+def get_course_summary(db: Session, course_id: int, semester: int | None = None, include_students: bool = True):
+    """A course's attendance percentage (from the course rollup), with a row per student unless left out"""
+    if not db.query(Course.course_id).filter(Course.course_id == course_id).first():
+        raise HTTPException(status_code=404, detail="Course not found")
+    totals = db.query(*_sums(AttendanceCourseSummary)).filter(AttendanceCourseSummary.course_id == course_id)
+    if semester is not None:
+        totals = totals.filter(AttendanceCourseSummary.semester == semester)
+    totals = _counts(totals.one())
+
+    students = []
+    if include_students:
+        query = db.query(AttendanceSummary, Student.full_name).outerjoin(
+            Student, Student.student_id == AttendanceSummary.student_id
+        ).filter(AttendanceSummary.course_id == course_id)
+        if semester is not None:
+            query = query.filter(AttendanceSummary.semester == semester)
+        students = [
+            {"student_id": s.student_id, "full_name": full_name, "semester": s.semester, **_totals(_counts(s))}
+            for s, full_name in query.order_by(AttendanceSummary.student_id)
+        ]
+    return {
+        "course_id": course_id,
+        "semester": semester,
+        "students": students,
+        **_totals(totals),
+    }
+
+
+def get_department_summary(db: Session, department: str, semester: int | None = None):
+    """A department's attendance percentage, with a row per course its students take (from the department rollup)"""
+    rollup = AttendanceDepartmentSummary
+    query = db.query(rollup.course_id, Course.course_name, Course.course_code, *_sums(rollup)).outerjoin(
+        Course, Course.course_id == rollup.course_id
+    ).filter(rollup.department == department)
+    if semester is not None:
+        query = query.filter(rollup.semester == semester)
+    rows = query.group_by(rollup.course_id, Course.course_name, Course.course_code).order_by(rollup.course_id).all()
+    if not rows and not db.query(Student.student_id).filter(Student.department == department).first():
+        raise HTTPException(status_code=404, detail="Department not found")
+
+    courses = [
+        {"course_id": row.course_id, "course_name": row.course_name, "course_code": row.course_code, **_totals(_counts(row))}
+        for row in rows
+    ]
+    totals = {column: sum(course[column] for course in courses) for column in COUNT_COLUMNS}
+    return {
+        "department": department,
+        "semester": semester,
+        "courses": courses,
+        **_totals(totals),
+    }
@@ -1,21 +1,140 @@
+from datetime import date
 from sqlalchemy.orm import Session
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException
-from models import Attendance, Enrollment
-from schemas import AttendanceCreate
+from models import Attendance, AttendanceArchive, Enrollment, Course, Student
+from schemas import AttendanceCreate, AttendanceBulk
+from crud import dashboard_counters
+from crud import attendance_summary
+from crud import semester_archive
+
+UPSERT_CHUNK_SIZE = 500
+
+ALREADY_RECORDED = "Attendance already recorded for this student, course and date"
 
 def create_attendance(db: Session, data: AttendanceCreate):
+    if not db.query(Student.student_id).filter(Student.student_id == data.student_id).first():
+        raise HTTPException(status_code=400, detail="Student not found")
+    if not db.query(Course.course_id).filter(Course.course_id == data.course_id).first():
+        raise HTTPException(status_code=400, detail="Course not found")
+    semester_archive.ensure_attendance_not_archived(db, data.course_id, data.date, [data.student_id])
     obj = Attendance(**data.dict())
     db.add(obj)
+    try:
+        # Flushed before the summary moves, so a repeated day fails on the unique key first
+        db.flush()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=409, detail=ALREADY_RECORDED)
+    attendance_summary.apply_changes(db, [(obj.student_id, obj.course_id, None, obj.status)])
+    dashboard_counters.invalidate(db, dashboard_counters.STUDENT, obj.student_id)
     db.commit()
     db.refresh(obj)
     return obj
 
-def get_attendances(db: Session):
-    return db.query(Attendance).all()
+def _ensure_enrolled(db: Session, course_id: int, student_ids):
+    """Refuse attendance for students without an active enrollment in the course"""
+    enrolled = {s for (s,) in db.query(Enrollment.student_id).filter(
+        Enrollment.course_id == course_id,
+        Enrollment.status == "Active",
+        Enrollment.student_id.in_(set(student_ids))
+    )}
+    missing = sorted(set(student_ids) - enrolled)
+    if missing:
+        raise HTTPException(status_code=400, detail=(
+            f"Students not enrolled in course {course_id}: {', '.join(map(str, missing))}"
+        ))
+
+def upsert_session_attendance(db: Session, data: AttendanceBulk):
+    """Save one class session's attendance in one transaction.
+
+    Rows are written with multi-row INSERT ... ON DUPLICATE KEY UPDATE on the
+    (student_id, course_id, date) unique key, so the session can be resubmitted safely.
+    The statuses they replace are read (and locked) first to move the summary counts.
+    Every student must have an active enrollment in the course.
+    """
+    if not db.query(Course.course_id).filter(Course.course_id == data.course_id).first():
+        raise HTTPException(status_code=404, detail="Course not found")
+    invalid = sorted({status for status in data.statuses.values() if not status or len(status) > 10})
+    if invalid:
+        raise HTTPException(status_code=400, detail=f"Invalid attendance status: {', '.join(invalid) or 'empty'}")
+    _ensure_enrolled(db, data.course_id, data.statuses)
+    semester_archive.ensure_attendance_not_archived(db, data.course_id, data.date, data.statuses)
+
+    values = [
+        {"student_id": student_id, "course_id": data.course_id, "date": data.date, "status": status}
+        for student_id, status in sorted(data.statuses.items())
+    ]
+    try:
+        previous = dict(db.query(Attendance.student_id, Attendance.status).filter(
+            Attendance.course_id == data.course_id,
+            Attendance.date == data.date,
+            Attendance.student_id.in_(data.statuses)
+        ).with_for_update().all())
+        for start in range(0, len(values), UPSERT_CHUNK_SIZE):
+            stmt = mysql_insert(Attendance).values(values[start:start + UPSERT_CHUNK_SIZE])
+            stmt = stmt.on_duplicate_key_update(status=stmt.inserted.status)
+            db.execute(stmt)
+        attendance_summary.apply_changes(db, [
+            (student_id, data.course_id, previous.get(student_id), status)
+            for student_id, status in data.statuses.items()
+        ])
+        dashboard_counters.invalidate(db, dashboard_counters.STUDENT, *data.statuses)
+        db.commit()
+    except IntegrityError as e:
+        # A student or enrollment removed since the checks above
+        db.rollback()
+        raise HTTPException(status_code=409, detail=str(e.orig))
+    except Exception:
+        db.rollback()
+        raise
+
+    return db.query(Attendance).filter(
+        Attendance.course_id == data.course_id,
+        Attendance.date == data.date
+    ).order_by(Attendance.student_id).all()
 
-def get_student_attendance(db: Session, student_id: int):
-    """Get attendance records for a student's enrolled courses only"""
-    return db.query(Attendance).select_from(Attendance).join(
+def attendance_model(archived: bool = False):
+    """Attendance, or AttendanceArchive for semesters moved out by the rollover"""
+    return AttendanceArchive if archived else Attendance
+
+def attendance_query(db: Session, student_id: int | None = None, course_id: int | None = None,
+                     from_date: date | None = None, to_date: date | None = None, status: str | None = None,
+                     archived: bool = False):
+    """Filtered attendance query shared by the paged list and the streaming export"""
+    if from_date and to_date and from_date > to_date:
+        raise HTTPException(status_code=400, detail="from must not be after to")
+    model = attendance_model(archived)
+    query = db.query(model)
+    if student_id is not None:
+        query = query.filter(model.student_id == student_id)
+    if course_id is not None:
+        query = query.filter(model.course_id == course_id)
+    if from_date is not None:
+        query = query.filter(model.date >= from_date)
+    if to_date is not None:
+        query = query.filter(model.date <= to_date)
+    if status:
+        query = query.filter(model.status == status)
+    return query
+
+def attendance_order(course_id: int | None = None, archived: bool = False) -> list:
+    """Keyset sort key for attendance_query.
+
+    Within one course rows are paged by (date, attendance_id): that is the order of
+    idx_attendance_course_date (and of unique_student_course_date when a student is given
+    too), so a date range is one index range scan with no sort. The archive has the same
+    two indexes.
+    """
+    model = attendance_model(archived)
+    if course_id is not None:
+        return [model.date, model.attendance_id]
+    return [model.attendance_id]
+
+def get_student_attendance(db: Session, student_id: int, include_archived: bool = False):
+    """Get attendance records for a student's enrolled courses only (plus past semesters if asked)"""
+    records = db.query(Attendance).select_from(Attendance).join(
         Enrollment,
         (Attendance.student_id == Enrollment.student_id) & 
         (Attendance.course_id == Enrollment.course_id)
@@ -23,24 +142,48 @@ def get_student_attendance(db: Session, student_id: int):
         Attendance.student_id == student_id,
         Enrollment.status == "Active"
     ).all()
+    if include_archived:
+        records += db.query(AttendanceArchive).filter(AttendanceArchive.student_id == student_id).order_by(
+            AttendanceArchive.course_id, AttendanceArchive.date
+        ).all()
+    return records
 
 def get_attendance(db: Session, attendance_id: int):
-    return db.query(Attendance).filter(Attendance.attendance_id == attendance_id).first()
+    """An attendance record, from the archive if its semester was rolled over"""
+    return (db.query(Attendance).filter(Attendance.attendance_id == attendance_id).first()
+            or db.query(AttendanceArchive).filter(AttendanceArchive.attendance_id == attendance_id).first())
+
+def _get_current_attendance(db: Session, attendance_id: int):
+    a = db.query(Attendance).filter(Attendance.attendance_id == attendance_id).first()
+    if a:
+        return a
+    if db.query(AttendanceArchive.attendance_id).filter(AttendanceArchive.attendance_id == attendance_id).first():
+        raise HTTPException(status_code=409, detail="Attendance of an archived semester cannot be changed")
+    raise HTTPException(status_code=404, detail="Attendance not found")
 
 def update_attendance(db: Session, attendance_id: int, data: AttendanceCreate):
-    a = get_attendance(db, attendance_id)
-    if not a:
-        raise HTTPException(status_code=404, detail="Attendance not found")
+    a = _get_current_attendance(db, attendance_id)
+    previous_student_id = a.student_id
+    semester_archive.ensure_attendance_not_archived(db, data.course_id, data.date, [data.student_id])
+    previous = (a.student_id, a.course_id, a.status, None)
     for k, v in data.dict().items():
         setattr(a, k, v)
+    try:
+        # Moving the row onto a day already recorded fails on the unique key here
+        db.flush()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=409, detail=ALREADY_RECORDED)
+    attendance_summary.apply_changes(db, [previous, (a.student_id, a.course_id, None, a.status)])
+    dashboard_counters.invalidate(db, dashboard_counters.STUDENT, previous_student_id, a.student_id)
     db.commit()
     db.refresh(a)
     return a
 
 def delete_attendance(db: Session, attendance_id: int):
-    a = get_attendance(db, attendance_id)
-    if not a:
-        raise HTTPException(status_code=404, detail="Attendance not found")
+    a = _get_current_attendance(db, attendance_id)
     db.delete(a)
+    attendance_summary.apply_changes(db, [(a.student_id, a.course_id, a.status, None)])
+    dashboard_counters.invalidate(db, dashboard_counters.STUDENT, a.student_id)
     db.commit()
     return {"detail": "Attendance deleted"}
@@ -0,0 +1,297 @@
+"""
+Notification broadcasts: one announcement delivered to every student of a course,
+department or semester, or to all students.
+
+Announcements to a department, semester or everyone are stored once (delivery "read"):
+the NotificationBroadcasts row and its audience predicate are matched against the student
+when their notifications are read (see crud.notifications), so storage grows with the
+number of announcements, not announcements x students.
+
+Course broadcasts (delivery "write") reach a small, fixed roster and are fanned out to
+per-student Notifications rows. create_broadcast() validates and counts the audience and
+stores a queued row, so the request returns at once; deliver() then expands the
+recipients in student_id order and writes one multi-row INSERT per BROADCAST_CHUNK_SIZE
+students, committing each chunk together with the broadcast's progress (delivered count
+and last_student_id cursor). An interrupted delivery resumes after the last committed chunk.
+
+A worker first claims the broadcast with a conditional UPDATE (queued, or running with an
+expired lease) and only delivers when it took the row; the lease (locked_until) is renewed
+with every chunk, and a chunk's progress update only applies if the cursor is still where
+the worker left it, so two workers never write the same chunk. A failed delivery is
+queued again after BROADCAST_RETRY_DELAY seconds until it has failed BROADCAST_MAX_ATTEMPTS
+times; it is then left "failed" with its error for the sender to see and retry().
+"""
+import os
+import time
+import logging
+from datetime import datetime, timedelta
+from sqlalchemy import insert, and_, or_, func, cast, String
+from sqlalchemy.orm import Session
+from fastapi import HTTPException
+from models import NotificationBroadcast, Notifications, Student, Enrollment, Course
+from schemas import BroadcastCreate
+from crud import dashboard_counters
+from crud import notifications as notifications_crud
+
+logger = logging.getLogger(__name__)
+
+# Students per multi-row INSERT (and per commit)
+BROADCAST_CHUNK_SIZE = int(os.getenv("BROADCAST_CHUNK_SIZE", "1000"))
+# Seconds a claimed broadcast is held per chunk, failed attempts before giving up, seconds between attempts
+BROADCAST_LEASE = int(os.getenv("BROADCAST_LEASE", "300"))
+BROADCAST_MAX_ATTEMPTS = int(os.getenv("BROADCAST_MAX_ATTEMPTS", "3"))
+BROADCAST_RETRY_DELAY = int(os.getenv("BROADCAST_RETRY_DELAY", "60"))
+
+COURSE = "course"
+DEPARTMENT = "department"
+SEMESTER = "semester"
+ALL = "all"
+TARGETS = (COURSE, DEPARTMENT, SEMESTER, ALL)
+
+FAN_OUT_ON_WRITE = "write"
+FAN_OUT_ON_READ = "read"
+# Targets whose announcements are stored once and matched when students read them
+READ_TARGETS = (DEPARTMENT, SEMESTER, ALL)
+
+
+def audience_filter(department: str | None, semester: int | None):
+    """Stored-once announcements addressed to a student of this department and semester"""
+    audience = [NotificationBroadcast.target == ALL]
+    if department:
+        audience.append(and_(NotificationBroadcast.target == DEPARTMENT, NotificationBroadcast.target_value == department))
+    if semester is not None:
+        audience.append(and_(NotificationBroadcast.target == SEMESTER, NotificationBroadcast.target_value == str(semester)))
+    return and_(NotificationBroadcast.delivery == FAN_OUT_ON_READ, or_(*audience))
+
+
+def student_audience_filter():
+    """audience_filter matched against the Student row of the enclosing query, for use in SQL"""
+    return and_(NotificationBroadcast.delivery == FAN_OUT_ON_READ, or_(
+        NotificationBroadcast.target == ALL,
+        and_(NotificationBroadcast.target == DEPARTMENT, NotificationBroadcast.target_value == Student.department),
+        and_(NotificationBroadcast.target == SEMESTER, NotificationBroadcast.target_value == cast(Student.semester, String))
+    ))
+
+
+def recipient_ids(db: Session, target: str, target_value):
+    """Query for the distinct student ids a broadcast audience covers"""
+    if target == COURSE:
+        return db.query(Enrollment.student_id.label("student_id")).filter(
+            Enrollment.course_id == int(target_value),
+            Enrollment.status == "Active"
+        ).distinct()
+    query = db.query(Student.student_id.label("student_id"))
+    if target == DEPARTMENT:
+        return query.filter(Student.department == target_value)
+    if target == SEMESTER:
+        return query.filter(Student.semester == int(target_value))
+    return query
+
+
+def _validate_target(db: Session, data: BroadcastCreate, session: dict):
+    if data.target_value is not None:
+        data.target_value = str(data.target_value).strip()
+    if data.target not in TARGETS:
+        raise HTTPException(status_code=400, detail=f"target must be one of: {', '.join(TARGETS)}")
+    if session["role"] == "faculty" and data.target not in (COURSE, ALL):
+        raise HTTPException(status_code=403, detail="Faculty can only broadcast to their own courses or to all students")
+    if data.target == ALL:
+        return
+    if not data.target_value:
+        raise HTTPException(status_code=400, detail=f"target_value is required for target '{data.target}'")
+    if data.target in (COURSE, SEMESTER) and not data.target_value.isdigit():
+        raise HTTPException(status_code=400, detail=f"target_value must be a number for target '{data.target}'")
+
+    if data.target == COURSE:
+        course = db.query(Course.faculty_id).filter(Course.course_id == int(data.target_value)).first()
+        if not course:
+            raise HTTPException(status_code=404, detail="Course not found")
+        if session["role"] == "faculty" and course.faculty_id != session["user_id"]:
+            raise HTTPException(status_code=403, detail="Faculty can only broadcast to their own courses")
+
+
+def create_broadcast(db: Session, data: BroadcastCreate, session: dict):
+    """Store a broadcast; a queued (fan-out-on-write) one is then handed to the delivery worker"""
+    _validate_target(db, data, session)
+    total = recipient_ids(db, data.target, data.target_value).order_by(None).count()
+    broadcast = NotificationBroadcast(
+        sender_id=session["user_id"],
+        title=data.title,
+        message=data.message,
+        type=data.type,
+        target=data.target,
+        target_value=None if data.target == ALL else data.target_value,
+        total_recipients=total,
+    )
+    if data.target in READ_TARGETS:
+        # Visible to its audience as soon as it commits
+        now = datetime.utcnow()
+        broadcast.delivery = FAN_OUT_ON_READ
+        broadcast.status = "completed"
+        broadcast.delivered = total
+        broadcast.created_at = broadcast.started_at = broadcast.finished_at = now
+        dashboard_counters.invalidate_all(db, dashboard_counters.STUDENT)
+    else:
+        broadcast.delivery = FAN_OUT_ON_WRITE
+    db.add(broadcast)
+    db.commit()
+    if broadcast.delivery == FAN_OUT_ON_READ:
+        notifications_crud.forget_unread_count()
+    db.refresh(broadcast)
+    return broadcast
+
+
+def get_broadcast(db: Session, broadcast_id: int):
+    broadcast = db.query(NotificationBroadcast).filter(NotificationBroadcast.broadcast_id == broadcast_id).first()
+    if not broadcast:
+        raise HTTPException(status_code=404, detail="Broadcast not found")
+    return broadcast
+
+
+def get_broadcasts(db: Session, sender_id: int | None = None, limit: int = 50, status: str | None = None):
+    query = db.query(NotificationBroadcast)
+    if sender_id is not None:
+        query = query.filter(NotificationBroadcast.sender_id == sender_id)
+    if status is not None:
+        query = query.filter(NotificationBroadcast.status == status)
+    return query.order_by(NotificationBroadcast.broadcast_id.desc()).limit(limit).all()
+
+
+def pending_broadcast_ids(db: Session) -> list:
+    """Broadcasts queued or interrupted mid-delivery (e.g. by a restart)"""
+    return [b for (b,) in db.query(NotificationBroadcast.broadcast_id).filter(
+        NotificationBroadcast.status.in_(("queued", "running"))
+    ).order_by(NotificationBroadcast.broadcast_id)]
+
+
+def claim(db: Session, broadcast_id: int) -> bool:
+    """Take a broadcast for delivery; False when it is done, failed or held by another worker"""
+    now = datetime.utcnow()
+    claimed = db.query(NotificationBroadcast).filter(
+        NotificationBroadcast.broadcast_id == broadcast_id,
+        NotificationBroadcast.status.in_(("queued", "running")),
+        or_(NotificationBroadcast.locked_until.is_(None), NotificationBroadcast.locked_until <= now)
+    ).update({
+        NotificationBroadcast.status: "running",
+        NotificationBroadcast.locked_until: now + timedelta(seconds=BROADCAST_LEASE),
+        NotificationBroadcast.started_at: func.coalesce(NotificationBroadcast.started_at, now),
+    }, synchronize_session=False)
+    db.commit()
+    return claimed == 1
+
+
+def retry(db: Session, broadcast_id: int):
+    """Queue a failed broadcast again; delivery resumes after its last committed chunk"""
+    broadcast = get_broadcast(db, broadcast_id)
+    if broadcast.status != "failed":
+        raise HTTPException(status_code=409, detail=f"Only failed broadcasts can be retried (status: {broadcast.status})")
+    broadcast.status = "queued"
+    broadcast.attempts = 0
+    broadcast.error = None
+    broadcast.locked_until = None
+    broadcast.finished_at = None
+    db.commit()
+    db.refresh(broadcast)
+    return broadcast
+
+
+def progress(broadcast) -> dict:
+    """A broadcast with its completion percentage and delivery rate"""
+    result = {column.key: getattr(broadcast, column.key) for column in NotificationBroadcast.__table__.columns}
+    total = broadcast.total_recipients or 0
+    result["percent_complete"] = round(100.0 * broadcast.delivered / total, 1) if total else 100.0
+    result["rows_per_second"] = None
+    if broadcast.started_at:
+        elapsed = ((broadcast.finished_at or datetime.utcnow()) - broadcast.started_at).total_seconds()
+        if elapsed > 0:
+            result["rows_per_second"] = round(broadcast.delivered / elapsed, 1)
+    return result
+
+
+def _deliver_chunk(db: Session, broadcast, student_ids: list, now: datetime) -> bool:
+    """Write one chunk with its progress; False when another worker has moved the cursor"""
+    # Progress first: the row lock orders competing workers, and the cursor check fails
+    # for the one that lost its lease
+    advanced = db.query(NotificationBroadcast).filter(
+        NotificationBroadcast.broadcast_id == broadcast.broadcast_id,
+        NotificationBroadcast.last_student_id == broadcast.last_student_id
+    ).update({
+        NotificationBroadcast.delivered: NotificationBroadcast.delivered + len(student_ids),
+        NotificationBroadcast.last_student_id: student_ids[-1],
+        NotificationBroadcast.locked_until: datetime.utcnow() + timedelta(seconds=BROADCAST_LEASE),
+    }, synchronize_session=False)
+    if not advanced:
+        db.rollback()
+        return False
+
+    rows = [{
+        "sender_id": broadcast.sender_id,
+        "recipient_id": student_id,
+        "student_id": student_id,
+        "title": broadcast.title,
+        "message": broadcast.message,
+        "type": broadcast.type,
+        "date_sent": now,
+        "created_at": now,
+        "is_read": False,
+        "broadcast_id": broadcast.broadcast_id,
+    } for student_id in student_ids]
+    # Rows as executemany parameters (still one multi-row INSERT), so the change event is
+    # addressed to these students instead of every subscriber
+    db.execute(insert(Notifications), rows)
+    dashboard_counters.invalidate(db, dashboard_counters.STUDENT, *student_ids)
+    db.commit()  # expires `broadcast`, which reloads the new cursor
+    notifications_crud.forget_unread_count(*student_ids)
+    return True
+
+
+def deliver(db: Session, broadcast_id: int):
+    """Write the Notifications rows of a queued broadcast, resuming after its cursor"""
+    if not claim(db, broadcast_id):
+        logger.info(f"Broadcast {broadcast_id} is not claimable (finished, failed or held by another worker)")
+        return get_broadcast(db, broadcast_id)
+    broadcast = get_broadcast(db, broadcast_id)
+
+    recipients = recipient_ids(db, broadcast.target, broadcast.target_value).subquery()
+    # Every row of one broadcast shares its timestamp, however long delivery takes
+    sent_at = broadcast.started_at
+    start = time.perf_counter()
+    try:
+        while True:
+            chunk = [s for (s,) in db.query(recipients.c.student_id).filter(
+                recipients.c.student_id > broadcast.last_student_id
+            ).order_by(recipients.c.student_id).limit(BROADCAST_CHUNK_SIZE)]
+            if not chunk:
+                break
+            if not _deliver_chunk(db, broadcast, chunk, sent_at):
+                logger.warning(f"Broadcast {broadcast_id} was taken over by another worker")
+                return get_broadcast(db, broadcast_id)
+    except Exception as e:
+        db.rollback()
+        now = datetime.utcnow()
+        broadcast.attempts += 1
+        broadcast.error = str(e)[:500]
+        if broadcast.attempts < BROADCAST_MAX_ATTEMPTS:
+            # Not claimable again before the retry delay
+            broadcast.status = "queued"
+            broadcast.locked_until = now + timedelta(seconds=BROADCAST_RETRY_DELAY)
+            logger.warning(f"Broadcast {broadcast_id} attempt {broadcast.attempts} failed after "
+                           f"{broadcast.delivered} rows, retrying in {BROADCAST_RETRY_DELAY}s: {e}")
+        else:
+            broadcast.status = "failed"
+            broadcast.locked_until = None
+            broadcast.finished_at = now
+            logger.error(f"Broadcast {broadcast_id} failed after {broadcast.attempts} attempts "
+                         f"and {broadcast.delivered} rows: {e}")
+        db.commit()
+        return broadcast
+
+    # Recipients who joined the audience after it was counted are delivered too
+    broadcast.total_recipients = max(broadcast.total_recipients, broadcast.delivered)
+    broadcast.status = "completed"
+    broadcast.locked_until = None
+    broadcast.finished_at = datetime.utcnow()
+    db.commit()
+    elapsed = time.perf_counter() - start
+    logger.info(f"Broadcast {broadcast_id} delivered {broadcast.delivered} notifications in {elapsed:.2f}s")
+    return broadcast
@@ -1,22 +1,29 @@
+from datetime import date
+from sqlalchemy import and_
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
-from models import Course, Enrollment
+from models import Course, Enrollment, Student, Attendance, Marks
 from schemas import CourseCreate
 from typing import Optional
+from crud import dashboard_counters
+from crud import attendance_summary
 
 def create_course(db: Session, data: CourseCreate):
     obj = Course(**data.dict())
     db.add(obj)
+    dashboard_counters.invalidate(db, dashboard_counters.FACULTY, obj.faculty_id)
     db.commit()
     db.refresh(obj)
     return obj
 
-def get_courses(db: Session, status: Optional[str] = None):
-    """Get all courses, optionally filtered by status"""
+def course_query(db: Session, status: Optional[str] = None, faculty_id: Optional[int] = None):
+    """Filtered course query behind the fast JSON list route"""
     query = db.query(Course)
     if status:
         query = query.filter(Course.course_status == status)
-    return query.all()
+    if faculty_id is not None:
+        query = query.filter(Course.faculty_id == faculty_id)
+    return query
 
 def get_student_enrolled_courses(db: Session, student_id: int):
     """Get all courses a student is enrolled in"""
@@ -28,6 +35,45 @@ def get_student_enrolled_courses(db: Session, student_id: int):
         Enrollment.status == "Active"
     ).all()
 
+# Marks fields a roster row carries with include=marks
+ROSTER_MARK_COLUMNS = (
+    Marks.quiz_total, Marks.assignment_total, Marks.midterm1, Marks.midterm2,
+    Marks.final_exam, Marks.total_marks, Marks.grade_letter,
+)
+
+def get_course_roster(db: Session, course_id: int, attendance_date: Optional[date] = None,
+                      include_marks: bool = False, status: Optional[str] = "Active") -> tuple:
+    """A course's enrolled students in one query, optionally with one day's attendance and
+    their marks for the enrollment semester. Returns (fields, rows) of column tuples."""
+    if not db.query(Course.course_id).filter(Course.course_id == course_id).first():
+        raise HTTPException(status_code=404, detail="Course not found")
+
+    query = db.query(
+        Student.student_id, Student.full_name, Student.email, Student.department,
+        Enrollment.semester, Enrollment.status.label("enrollment_status")
+    ).select_from(Enrollment).join(
+        Student, Student.student_id == Enrollment.student_id
+    ).filter(Enrollment.course_id == course_id)
+    if status:
+        query = query.filter(Enrollment.status == status)
+
+    # Both joins hit a unique key, so each student stays one row
+    if attendance_date is not None:
+        query = query.outerjoin(Attendance, and_(
+            Attendance.student_id == Enrollment.student_id,
+            Attendance.course_id == course_id,
+            Attendance.date == attendance_date
+        )).add_columns(Attendance.status.label("attendance_status"))
+    if include_marks:
+        query = query.outerjoin(Marks, and_(
+            Marks.student_id == Enrollment.student_id,
+            Marks.course_id == course_id,
+            Marks.semester == Enrollment.semester
+        )).add_columns(*ROSTER_MARK_COLUMNS)
+
+    fields = [column["name"] for column in query.column_descriptions]
+    return fields, query.order_by(Student.student_id).all()
+
 def get_course(db: Session, course_id: int):
     return db.query(Course).filter(Course.course_id == course_id).first()
 
@@ -35,8 +81,10 @@ def update_course(db: Session, course_id: int, data: CourseCreate):
     course = get_course(db, course_id)
     if not course:
         raise HTTPException(status_code=404, detail="Course not found")
+    previous_faculty_id = course.faculty_id
     for k, v in data.dict(exclude_unset=True).items():
         setattr(course, k, v)
+    dashboard_counters.invalidate(db, dashboard_counters.FACULTY, previous_faculty_id, course.faculty_id)
     db.commit()
     db.refresh(course)
     return course
@@ -55,6 +103,8 @@ def delete_course(db: Session, course_id: int):
     course = get_course(db, course_id)
     if not course:
         raise HTTPException(status_code=404, detail="Course not found")
+    attendance_summary.remove_course(db, course_id)
     db.delete(course)
+    dashboard_counters.invalidate(db, dashboard_counters.FACULTY, course.faculty_id)
     db.commit()
     return {"detail": "Course deleted"}
@@ -0,0 +1,146 @@
+"""
+Materialized dashboard counters.
+
+Each dashboard (admin, one per faculty member, one per student) is stored as a single
+DashboardCounters row, so reads are a primary-key lookup whatever the institution's size.
+CRUD write paths call invalidate() inside their own transaction; the next read recomputes
+the row once. Rows also expire after COUNTER_MAX_AGE seconds and are refreshed by
+reconcile_all(), which main.py runs periodically.
+
+invalidate() marks a row stale (refreshed_at NULL) and bumps its generation instead of
+deleting it. refresh() reads the generation before computing and only stores its result
+if the generation is unchanged, so a recompute that raced with a write (and read the data
+from before it) cannot overwrite the invalidation with stale figures.
+"""
+import json
+import os
+import logging
+from datetime import datetime, timedelta
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from models import DashboardCounters, Course, Enrollment
+
+logger = logging.getLogger(__name__)
+
+ADMIN = "admin"
+FACULTY = "faculty"
+STUDENT = "student"
+
+# Upper bound on how stale a counter row may get if a write bypasses the CRUD hooks
+COUNTER_MAX_AGE = int(os.getenv("DASHBOARD_COUNTER_MAX_AGE", "300"))
+
+# Seconds between runs of the background reconciler
+RECONCILE_INTERVAL = int(os.getenv("DASHBOARD_RECONCILE_INTERVAL", "600"))
+
+
+def _compute(db: Session, scope: str, scope_id: int):
+    # Imported here because the crud modules import this one for their invalidation hooks
+    from crud import admin as admin_crud, faculty as faculty_crud, student as student_crud
+
+    if scope == ADMIN:
+        return admin_crud.get_dashboard_stats(db)
+    if scope == FACULTY:
+        return faculty_crud.get_dashboard_stats(db, scope_id)
+    if scope == STUDENT:
+        return student_crud.get_dashboard_stats(db, scope_id)
+    raise ValueError(f"Unknown dashboard counter scope: {scope}")
+
+
+def _key(scope: str, scope_id: int):
+    return DashboardCounters.scope == scope, DashboardCounters.scope_id == scope_id
+
+
+def refresh(db: Session, scope: str, scope_id: int = 0):
+    """Recompute one dashboard's counters and store them unless invalidated meanwhile"""
+    # The row must exist before computing, so a concurrent invalidate() has a generation to bump
+    stmt = mysql_insert(DashboardCounters).values(
+        scope=scope, scope_id=scope_id, payload="{}", refreshed_at=None, generation=0
+    )
+    db.execute(stmt.on_duplicate_key_update(generation=DashboardCounters.generation))
+    db.commit()
+
+    # The computation reads in the same transaction (snapshot) as the generation
+    generation = db.query(DashboardCounters.generation).filter(*_key(scope, scope_id)).scalar()
+    stats = _compute(db, scope, scope_id)
+    stored = db.query(DashboardCounters).filter(
+        *_key(scope, scope_id), DashboardCounters.generation == generation
+    ).update({
+        DashboardCounters.payload: json.dumps(stats),
+        DashboardCounters.refreshed_at: datetime.utcnow(),
+    }, synchronize_session=False)
+    db.commit()
+    if not stored:
+        logger.debug(f"Dashboard counters {scope}:{scope_id} were invalidated while computing; left stale")
+    return stats
+
+
+def get_counters(db: Session, scope: str, scope_id: int = 0):
+    """Return a dashboard's counters, recomputing them only if missing or expired"""
+    row = db.query(DashboardCounters.payload, DashboardCounters.refreshed_at).filter(*_key(scope, scope_id)).first()
+
+    if row and row.refreshed_at and datetime.utcnow() - row.refreshed_at < timedelta(seconds=COUNTER_MAX_AGE):
+        return json.loads(row.payload)
+    return refresh(db, scope, scope_id)
+
+
+def get_admin_stats(db: Session):
+    return get_counters(db, ADMIN)
+
+
+def get_faculty_stats(db: Session, faculty_id: int):
+    return get_counters(db, FACULTY, faculty_id)
+
+
+def get_student_stats(db: Session, student_id: int):
+    return get_counters(db, STUDENT, student_id)
+
+
+_STALE = {DashboardCounters.refreshed_at: None, DashboardCounters.generation: DashboardCounters.generation + 1}
+
+
+def invalidate(db: Session, scope: str, *scope_ids: int):
+    """Mark dashboards' counters stale as part of the caller's transaction (committed with the write)"""
+    ids = {0} if scope == ADMIN else {i for i in scope_ids if i is not None}
+    if not ids:
+        return
+    db.query(DashboardCounters).filter(
+        DashboardCounters.scope == scope,
+        DashboardCounters.scope_id.in_(ids)
+    ).update(_STALE, synchronize_session=False)
+
+
+def invalidate_all(db: Session, scope: str):
+    """Mark every dashboard of a scope stale, e.g. after an announcement to all students"""
+    db.query(DashboardCounters).filter(DashboardCounters.scope == scope).update(_STALE, synchronize_session=False)
+
+
+def invalidate_course(db: Session, course_id: int):
+    """Invalidate the dashboard of the faculty member teaching a course"""
+    faculty_id = db.query(Course.faculty_id).filter(Course.course_id == course_id).scalar()
+    invalidate(db, FACULTY, faculty_id)
+
+
+def invalidate_enrollment(db: Session, student_id: int, course_id: int):
+    """Invalidate the dashboards an enrollment change affects"""
+    invalidate(db, STUDENT, student_id)
+    invalidate_course(db, course_id)
+
+
+def invalidate_student(db: Session, student_id: int):
+    """Invalidate a student's dashboard and those of the faculty teaching their courses (e.g. on delete)"""
+    invalidate(db, STUDENT, student_id)
+    faculty_ids = db.query(Course.faculty_id).join(Enrollment, Enrollment.course_id == Course.course_id).filter(
+        Enrollment.student_id == student_id
+    ).distinct()
+    invalidate(db, FACULTY, *(faculty_id for (faculty_id,) in faculty_ids))
+
+
+def reconcile_all(db: Session):
+    """Recompute the admin dashboard and every materialized faculty/student dashboard"""
+    keys = db.query(DashboardCounters.scope, DashboardCounters.scope_id).filter(
+        DashboardCounters.scope != ADMIN
+    ).all()
+    refresh(db, ADMIN)
+    for scope, scope_id in keys:
+        refresh(db, scope, scope_id)
+    return len(keys) + 1
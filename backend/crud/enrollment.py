@@ -2,16 +2,27 @@ from sqlalchemy.orm import Session
 from fastapi import HTTPException
 from models import Enrollment
 from schemas import EnrollmentCreate
+from crud import dashboard_counters
+from crud import attendance_summary
 
 def create_enrollment(db: Session, data: EnrollmentCreate):
     obj = Enrollment(**data.dict())
     db.add(obj)
+    dashboard_counters.invalidate_enrollment(db, obj.student_id, obj.course_id)
+    db.flush()
+    attendance_summary.move_enrollment(db, obj.student_id, obj.course_id)
     db.commit()
     db.refresh(obj)
     return obj
 
-def get_enrollments(db: Session):
-    return db.query(Enrollment).all()
+def enrollment_query(db: Session, student_id: int | None = None, course_id: int | None = None):
+    """Filtered enrollment query behind the fast JSON list route"""
+    query = db.query(Enrollment)
+    if student_id is not None:
+        query = query.filter(Enrollment.student_id == student_id)
+    if course_id is not None:
+        query = query.filter(Enrollment.course_id == course_id)
+    return query
 
 def get_enrollment(db: Session, enrollment_id: int):
     return db.query(Enrollment).filter(Enrollment.enrollment_id == enrollment_id).first()
@@ -20,8 +31,15 @@ def update_enrollment(db: Session, enrollment_id: int, data: EnrollmentCreate):
     e = get_enrollment(db, enrollment_id)
     if not e:
         raise HTTPException(status_code=404, detail="Enrollment not found")
+    dashboard_counters.invalidate_enrollment(db, e.student_id, e.course_id)
+    previous = (e.student_id, e.course_id)
     for k, v in data.dict().items():
         setattr(e, k, v)
+    dashboard_counters.invalidate_enrollment(db, e.student_id, e.course_id)
+    db.flush()
+    # The attendance of the old and new (student, course) follows the enrollment semesters
+    for student_id, course_id in {previous, (e.student_id, e.course_id)}:
+        attendance_summary.move_enrollment(db, student_id, course_id)
     db.commit()
     db.refresh(e)
     return e
@@ -31,5 +49,8 @@ def delete_enrollment(db: Session, enrollment_id: int):
     if not e:
         raise HTTPException(status_code=404, detail="Enrollment not found")
     db.delete(e)
+    dashboard_counters.invalidate_enrollment(db, e.student_id, e.course_id)
+    db.flush()
+    attendance_summary.move_enrollment(db, e.student_id, e.course_id)
     db.commit()
     return {"detail": "Enrollment deleted"}
@@ -1,35 +1,50 @@
 from sqlalchemy.orm import Session
+from sqlalchemy import func, select
 from fastapi import HTTPException
-from models import Faculty
-from schemas import FacultyCreate
-from security import hash_password
+from models import Faculty, Course, Enrollment, Feedback
+from schemas import FacultyCreate, FacultyUpdate
+from crud import dashboard_counters
+from crud import login_identity
+from crud import sessions
 
 def create_faculty(db: Session, data: FacultyCreate):
+    """`password` is already hashed: the router hashes it on the bcrypt worker pool"""
     faculty_data = data.dict()
-    faculty_data['password'] = hash_password(faculty_data['password'])
     obj = Faculty(**faculty_data)
     db.add(obj)
+    dashboard_counters.invalidate(db, dashboard_counters.ADMIN)
+    db.flush()
+    login_identity.sync_user(db, login_identity.FACULTY, obj)
     db.commit()
     db.refresh(obj)
     return obj
 
-def get_faculties(db: Session):
-    return db.query(Faculty).all()
+def faculty_query(db: Session, department: str | None = None):
+    """Filtered faculty query behind the fast JSON list route"""
+    query = db.query(Faculty)
+    if department:
+        query = query.filter(Faculty.department == department)
+    return query
 
 def get_faculty(db: Session, faculty_id: int):
     return db.query(Faculty).filter(Faculty.faculty_id == faculty_id).first()
 
-def update_faculty(db: Session, faculty_id: int, data: FacultyCreate):
+def update_faculty(db: Session, faculty_id: int, data: FacultyUpdate):
+    """A non-empty `password` is already hashed: the router hashes it on the bcrypt worker pool"""
     faculty = get_faculty(db, faculty_id)
     if not faculty:
         raise HTTPException(status_code=404, detail="Faculty not found")
     
     update_data = data.dict()
-    if 'password' in update_data and update_data['password']:
-        update_data['password'] = hash_password(update_data['password'])
+    if not update_data.get('password'):
+        update_data.pop('password', None)
+    else:
+        # A new password signs the user out everywhere, as a reset does
+        sessions.revoke_user_sessions(db, login_identity.FACULTY, faculty_id)
     
     for k, v in update_data.items():
         setattr(faculty, k, v)
+    login_identity.sync_user(db, login_identity.FACULTY, faculty)
     db.commit()
     db.refresh(faculty)
     return faculty
@@ -39,5 +54,38 @@ def delete_faculty(db: Session, faculty_id: int):
     if not faculty:
         raise HTTPException(status_code=404, detail="Faculty not found")
     db.delete(faculty)
+    dashboard_counters.invalidate(db, dashboard_counters.ADMIN)
+    dashboard_counters.invalidate(db, dashboard_counters.FACULTY, faculty_id)
+    login_identity.remove_user(db, login_identity.FACULTY, faculty_id)
+    sessions.revoke_user_sessions(db, login_identity.FACULTY, faculty_id)
     db.commit()
     return {"detail": "Faculty deleted"}
+
+def get_dashboard_stats(db: Session, faculty_id: int):
+    """Compute the faculty dashboard figures in a single statement"""
+    faculty_courses = select(Course.course_id).where(Course.faculty_id == faculty_id)
+
+    total_courses = select(func.count(Course.course_id)).where(
+        Course.faculty_id == faculty_id
+    ).scalar_subquery()
+
+    total_students = select(func.count(Enrollment.enrollment_id.distinct())).where(
+        Enrollment.course_id.in_(faculty_courses),
+        Enrollment.status == "Active"
+    ).scalar_subquery()
+
+    pending_feedback = select(func.count(Feedback.feedback_id)).where(
+        Feedback.faculty_id == faculty_id
+    ).scalar_subquery()
+
+    row = db.query(
+        total_courses.label("total_courses"),
+        total_students.label("total_students"),
+        pending_feedback.label("pending_feedback"),
+    ).one()
+
+    return {
+        "total_courses": int(row.total_courses or 0),
+        "total_students": int(row.total_students or 0),
+        "pending_feedback": int(row.pending_feedback or 0)
+    }
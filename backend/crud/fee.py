@@ -2,16 +2,29 @@ from sqlalchemy.orm import Session
 from fastapi import HTTPException
 from models import Fee
 from schemas import FeeCreate
+from crud import dashboard_counters
+from pagination import PageParams, paginate
 
 def create_fee(db: Session, data: FeeCreate):
     obj = Fee(**data.dict())
     db.add(obj)
+    dashboard_counters.invalidate(db, dashboard_counters.ADMIN)
+    dashboard_counters.invalidate(db, dashboard_counters.STUDENT, obj.student_id)
     db.commit()
     db.refresh(obj)
     return obj
 
-def get_fees(db: Session):
-    return db.query(Fee).all()
+def fee_query(db: Session, student_id: int | None = None, status: str | None = None):
+    """Filtered fee query shared by the paged list and the streaming export"""
+    query = db.query(Fee)
+    if student_id is not None:
+        query = query.filter(Fee.student_id == student_id)
+    if status:
+        query = query.filter(Fee.status == status)
+    return query
+
+def get_fees(db: Session, page: PageParams | None = None, student_id: int | None = None, status: str | None = None):
+    return paginate(fee_query(db, student_id, status), page, [Fee.fee_id])
 
 def get_student_fees(db: Session, student_id: int):
     """Get all fees for a specific student"""
@@ -24,8 +37,11 @@ def update_fee(db: Session, fee_id: int, data: FeeCreate):
     f = get_fee(db, fee_id)
     if not f:
         raise HTTPException(status_code=404, detail="Fee record not found")
+    previous_student_id = f.student_id
     for k, v in data.dict().items():
         setattr(f, k, v)
+    dashboard_counters.invalidate(db, dashboard_counters.ADMIN)
+    dashboard_counters.invalidate(db, dashboard_counters.STUDENT, previous_student_id, f.student_id)
     db.commit()
     db.refresh(f)
     return f
@@ -35,5 +51,7 @@ def delete_fee(db: Session, fee_id: int):
     if not f:
         raise HTTPException(status_code=404, detail="Fee record not found")
     db.delete(f)
+    dashboard_counters.invalidate(db, dashboard_counters.ADMIN)
+    dashboard_counters.invalidate(db, dashboard_counters.STUDENT, f.student_id)
     db.commit()
     return {"detail": "Fee deleted"}
@@ -2,16 +2,24 @@ from sqlalchemy.orm import Session
 from fastapi import HTTPException
 from models import Feedback
 from schemas import FeedbackCreate
+from crud import dashboard_counters
+from pagination import PageParams, paginate
 
 def create_feedback(db: Session, data: FeedbackCreate):
     obj = Feedback(**data.dict())
     db.add(obj)
+    dashboard_counters.invalidate(db, dashboard_counters.FACULTY, obj.faculty_id)
     db.commit()
     db.refresh(obj)
     return obj
 
-def get_feedbacks(db: Session):
-    return db.query(Feedback).all()
+def get_feedbacks(db: Session, page: PageParams | None = None, faculty_id: int | None = None, course_id: int | None = None):
+    query = db.query(Feedback)
+    if faculty_id is not None:
+        query = query.filter(Feedback.faculty_id == faculty_id)
+    if course_id is not None:
+        query = query.filter(Feedback.course_id == course_id)
+    return paginate(query, page, [Feedback.feedback_id])
 
 def get_faculty_feedback(db: Session, faculty_id: int):
     """Get all feedback for a specific faculty member"""
@@ -25,5 +33,6 @@ def delete_feedback(db: Session, feedback_id: int):
     if not f:
         raise HTTPException(status_code=404, detail="Feedback not found")
     db.delete(f)
+    dashboard_counters.invalidate(db, dashboard_counters.FACULTY, f.faculty_id)
     db.commit()
     return {"detail": "Feedback deleted"}
@@ -1,96 +1,169 @@
 from sqlalchemy.orm import Session
+from sqlalchemy import and_
 from fastapi import HTTPException
-from models import Grades, Marks
+from models import Grades, Marks, MarksArchive
 from schemas import GradesCreate
+from typing import Optional
+from crud import dashboard_counters
+from pagination import Page, PageParams, page_ids
+import numpy as np
+from bisect import bisect_right
+
+# Assessment columns in the order the batch engine expects them
+MARK_COLUMNS = (
+    'quiz1', 'quiz2', 'quiz3',
+    'assignment1', 'assignment2', 'assignment3',
+    'midterm1', 'midterm2', 'final_exam'
+)
+
+# Lower bound of every grade above F, ascending, and the letter for each bucket
+GRADE_CUTOFFS = np.array([55, 60, 65, 70, 75, 80, 85], dtype=np.float64)
+GRADE_LETTERS = np.array(['F', 'D', 'C', 'C+', 'B', 'B+', 'A', 'A+'])
+# The same table as plain lists for the scalar path
+_CUTOFFS = GRADE_CUTOFFS.tolist()
+_LETTERS = GRADE_LETTERS.tolist()
+
+def _score_column(values):
+    """Convert a column of scores (list, NumPy array or buffer) to float64, treating missing as 0"""
+    column = np.asarray(values, dtype=np.float64)
+    return np.where(np.isnan(column), 0.0, column)
+
+def _round_scores(values):
+    """Round to 2 places exactly like the builtin round(), which np.round misses on near-halfway values"""
+    rounded = np.round(values, 2)
+    scaled = values * 100
+    near_half = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    for i in np.flatnonzero(near_half):
+        rounded[i] = round(float(values[i]), 2)
+    return rounded
+
+def calculate_weightage_and_grade_batch(quiz1, quiz2, quiz3,
+                                        assignment1, assignment2, assignment3,
+                                        midterm1, midterm2, final_exam):
+    """Calculate total weightage and grade for whole columns of marks in one vectorized pass.
+
+    Returns a (weightage, grade) pair of arrays aligned with the input columns.
+    """
+    quiz_weightage = (
+        (_score_column(quiz1) / 100) * 3.333
+        + (_score_column(quiz2) / 100) * 3.333
+        + (_score_column(quiz3) / 100) * 3.333
+    )
+
+    assignment_weightage = (
+        (_score_column(assignment1) / 100) * 3.333
+        + (_score_column(assignment2) / 100) * 3.333
+        + (_score_column(assignment3) / 100) * 3.333
+    )
+
+    midterm1_weightage = (_score_column(midterm1) / 100) * 15
+    midterm2_weightage = (_score_column(midterm2) / 100) * 15
+    final_weightage = (_score_column(final_exam) / 100) * 50
+
+    total_weightage = quiz_weightage + assignment_weightage + midterm1_weightage + midterm2_weightage + final_weightage
+
+    # Determine grade: index of the highest cut-off reached
+    grades = GRADE_LETTERS[np.searchsorted(GRADE_CUTOFFS, total_weightage, side='right')]
+
+    return _round_scores(total_weightage), grades
+
+def calculate_weightage_and_grade_rows(rows):
+    """Calculate weightage and grade for a list of Marks rows with a single batch call.
+
+    A single row takes the scalar path: building arrays for one row costs more than the
+    arithmetic. Either way the result is a (weightage, grade) pair of sequences.
+    """
+    if not rows:
+        return np.zeros(0), np.zeros(0, dtype=GRADE_LETTERS.dtype)
+    if len(rows) == 1:
+        weightage, grade = calculate_weightage_and_grade(rows[0])
+        return [weightage], [grade]
+    columns = [[getattr(row, column) for row in rows] for column in MARK_COLUMNS]
+    return calculate_weightage_and_grade_batch(*columns)
 
 def calculate_weightage_and_grade(marks):
-    """Calculate total weightage and grade from marks"""
+    """Calculate total weightage and grade from marks (one row; same results as the batch engine)"""
     if not marks:
         return 0.00, 'F'
-    
-    # Calculate weightages
+
     quiz_weightage = sum([
         (float(marks.quiz1 or 0) / 100) * 3.333,
         (float(marks.quiz2 or 0) / 100) * 3.333,
         (float(marks.quiz3 or 0) / 100) * 3.333
     ])
-    
+
     assignment_weightage = sum([
         (float(marks.assignment1 or 0) / 100) * 3.333,
         (float(marks.assignment2 or 0) / 100) * 3.333,
         (float(marks.assignment3 or 0) / 100) * 3.333
     ])
-    
+
     midterm1_weightage = (float(marks.midterm1 or 0) / 100) * 15
     midterm2_weightage = (float(marks.midterm2 or 0) / 100) * 15
     final_weightage = (float(marks.final_exam or 0) / 100) * 50
-    
+
     total_weightage = quiz_weightage + assignment_weightage + midterm1_weightage + midterm2_weightage + final_weightage
-    
-    # Determine grade
-    if total_weightage >= 85:
-        grade = 'A+'
-    elif total_weightage >= 80:
-        grade = 'A'
-    elif total_weightage >= 75:
-        grade = 'B+'
-    elif total_weightage >= 70:
-        grade = 'B'
-    elif total_weightage >= 65:
-        grade = 'C+'
-    elif total_weightage >= 60:
-        grade = 'C'
-    elif total_weightage >= 55:
-        grade = 'D'
-    else:
-        grade = 'F'
-    
-    return round(total_weightage, 2), grade
+
+    return round(total_weightage, 2), _LETTERS[bisect_right(_CUTOFFS, total_weightage)]
 
 def create_grade(db: Session, data: GradesCreate):
     obj = Grades(**data.dict())
     db.add(obj)
+    dashboard_counters.invalidate(db, dashboard_counters.STUDENT, obj.student_id)
     db.commit()
     db.refresh(obj)
     return obj
 
-def get_grades(db: Session):
+def resolve_grades(db: Session, student_id: Optional[int] = None, page: Optional[PageParams] = None,
+                   course_id: Optional[int] = None):
+    """Fetch grades joined to their Marks totals in one query (two when paged).
+
+    Marks.total_marks and grade_letter are maintained by the marks CRUD layer on every write,
+    so this only reads the stored columns. Marks of rolled-over semesters are read from
+    MarksArchive. Each table gets its own outer join so both use their (student_id,
+    course_id, ...) index; a union of the two would be materialized whole on every request.
+    """
+    query = db.query(
+        Grades,
+        Marks.mark_id, Marks.total_marks, Marks.grade_letter,
+        MarksArchive.mark_id, MarksArchive.total_marks, MarksArchive.grade_letter
+    ).outerjoin(
+        Marks, and_(Marks.student_id == Grades.student_id, Marks.course_id == Grades.course_id)
+    ).outerjoin(
+        MarksArchive, and_(MarksArchive.student_id == Grades.student_id, MarksArchive.course_id == Grades.course_id)
+    )
+    if student_id is not None:
+        query = query.filter(Grades.student_id == student_id)
+    if course_id is not None:
+        query = query.filter(Grades.course_id == course_id)
+    # The Marks joins can repeat a grade, so page over grade ids rather than joined rows
+    query, next_cursor, total = page_ids(query, page, Grades.grade_id)
+
+    # A grade may match several Marks rows (one per semester, in either table); keep the
+    # lowest mark_id, as before. Archived rows keep their ids, so the ids compare across tables.
+    result = {}
+    marks = {}
+    for grade, *candidates in query.order_by(Grades.grade_id):
+        result.setdefault(grade.grade_id, grade)
+        for mark_id, total_marks, grade_letter in (candidates[:3], candidates[3:]):
+            if mark_id is not None and (grade.grade_id not in marks or mark_id < marks[grade.grade_id][0]):
+                marks[grade.grade_id] = (mark_id, total_marks, grade_letter)
+
+    for grade_id, (_, total_marks, grade_letter) in marks.items():
+        result[grade_id].marks_obtained = float(total_marks or 0)
+        result[grade_id].grade = grade_letter
+
+    result = list(result.values())
+    return Page(result, next_cursor, total)
+
+def get_grades(db: Session, page: Optional[PageParams] = None, student_id: Optional[int] = None,
+               course_id: Optional[int] = None):
     """Get all grades with calculated marks from Marks table"""
-    grades = db.query(Grades).all()
-    result = []
-    for grade in grades:
-        marks = db.query(Marks).filter(
-            Marks.student_id == grade.student_id,
-            Marks.course_id == grade.course_id
-        ).first()
-        
-        if marks:
-            total_weightage, calculated_grade = calculate_weightage_and_grade(marks)
-            grade.marks_obtained = total_weightage
-            grade.grade = calculated_grade
-        
-        result.append(grade)
-    
-    return result
+    return resolve_grades(db, student_id, page, course_id)
 
 def get_student_grades(db: Session, student_id: int):
     """Get all grades for a specific student with calculated marks from Marks table"""
-    grades = db.query(Grades).filter(Grades.student_id == student_id).all()
-    result = []
-    for grade in grades:
-        marks = db.query(Marks).filter(
-            Marks.student_id == grade.student_id,
-            Marks.course_id == grade.course_id
-        ).first()
-        
-        if marks:
-            total_weightage, calculated_grade = calculate_weightage_and_grade(marks)
-            grade.marks_obtained = total_weightage
-            grade.grade = calculated_grade
-        
-        result.append(grade)
-    
-    return result
+    return resolve_grades(db, student_id).items
 
 def get_grade(db: Session, grade_id: int):
     return db.query(Grades).filter(Grades.grade_id == grade_id).first()
@@ -99,8 +172,10 @@ def update_grade(db: Session, grade_id: int, data: GradesCreate):
     g = get_grade(db, grade_id)
     if not g:
         raise HTTPException(status_code=404, detail="Grade record not found")
+    previous_student_id = g.student_id
     for k, v in data.dict().items():
         setattr(g, k, v)
+    dashboard_counters.invalidate(db, dashboard_counters.STUDENT, previous_student_id, g.student_id)
     db.commit()
     db.refresh(g)
     return g
@@ -110,5 +185,6 @@ def delete_grade(db: Session, grade_id: int):
     if not g:
         raise HTTPException(status_code=404, detail="Grade record not found")
     db.delete(g)
+    dashboard_counters.invalidate(db, dashboard_counters.STUDENT, g.student_id)
     db.commit()
     return {"detail": "Grade deleted"}
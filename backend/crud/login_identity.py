@@ -0,0 +1,106 @@
+"""
+Login identifier index.
+
+Every identifier a user can sign in with (email, username, contact, name) is stored as a
+LoginIdentity row pointing at (role, user_id), so resolving a login is one indexed lookup
+instead of OR-scans across Student, Faculty and Admin. The student, faculty and admin CRUD
+call sync_user()/remove_user() inside their own transactions.
+
+When an identifier matches several accounts the lowest priority wins: exact identifiers
+(email, then username, then contact) beat names, and within a kind students beat faculty
+beat admins, then the lowest user id. A name shared by several accounts is ambiguous and
+does not resolve at all, so nobody is signed in to the wrong account by name.
+"""
+from sqlalchemy.orm import Session
+from models import LoginIdentity, Student, Faculty, Admin
+
+STUDENT = "student"
+FACULTY = "faculty"
+ADMIN = "admin"
+
+KIND_RANKS = {"email": 0, "username": 1, "contact": 2, "name": 3}
+ROLE_RANKS = {STUDENT: 0, FACULTY: 1, ADMIN: 2}
+
+# Identifier attributes per role, in the order of KIND_RANKS
+ROLE_FIELDS = {
+    STUDENT: (Student, "student_id", {"email": "email", "username": "username", "contact": "contact", "name": "full_name"}),
+    FACULTY: (Faculty, "faculty_id", {"email": "email", "contact": "contact", "name": "name"}),
+    ADMIN: (Admin, "admin_id", {"email": "email", "name": "name"}),
+}
+
+REBUILD_BATCH_SIZE = 1000
+
+
+def _identities(role: str, user):
+    _, id_attr, fields = ROLE_FIELDS[role]
+    user_id = getattr(user, id_attr)
+    seen = set()
+    rows = []
+    for kind, attr in fields.items():
+        identifier = (getattr(user, attr) or "").strip()
+        if not identifier or identifier in seen:
+            continue
+        seen.add(identifier)
+        rows.append({
+            "identifier": identifier[:100],
+            "kind": kind,
+            "role": role,
+            "user_id": user_id,
+            "priority": KIND_RANKS[kind] * len(ROLE_RANKS) + ROLE_RANKS[role],
+        })
+    return rows
+
+
+def remove_user(db: Session, role: str, user_id: int):
+    """Drop a user's identifiers as part of the caller's transaction"""
+    db.query(LoginIdentity).filter(
+        LoginIdentity.role == role,
+        LoginIdentity.user_id == user_id
+    ).delete(synchronize_session=False)
+
+
+def sync_user(db: Session, role: str, user):
+    """Replace a user's identifiers as part of the caller's transaction (user must have its id)"""
+    _, id_attr, _ = ROLE_FIELDS[role]
+    remove_user(db, role, getattr(user, id_attr))
+    rows = _identities(role, user)
+    if rows:
+        db.bulk_insert_mappings(LoginIdentity, rows)
+
+
+def resolve(db: Session, identifier: str):
+    """Return (role, user_id) for a login identifier, or None if unknown or ambiguous"""
+    matches = db.query(LoginIdentity.kind, LoginIdentity.role, LoginIdentity.user_id).filter(
+        LoginIdentity.identifier == identifier
+    ).order_by(LoginIdentity.priority, LoginIdentity.user_id).limit(2).all()
+
+    if not matches:
+        return None
+    best = matches[0]
+    if best.kind == "name" and len(matches) > 1:
+        return None
+    return best.role, best.user_id
+
+
+def is_empty(db: Session) -> bool:
+    return db.query(LoginIdentity.login_identity_id).first() is None
+
+
+def rebuild(db: Session, batch_size: int = REBUILD_BATCH_SIZE):
+    """Rebuild the whole index from the Student, Faculty and Admin tables. Returns rows written"""
+    db.query(LoginIdentity).delete(synchronize_session=False)
+    written = 0
+    for role, (model, id_attr, fields) in ROLE_FIELDS.items():
+        id_column = getattr(model, id_attr)
+        columns = [id_column] + [getattr(model, attr) for attr in fields.values()]
+        last_id = 0
+        while True:
+            batch = db.query(*columns).filter(id_column > last_id).order_by(id_column).limit(batch_size).all()
+            if not batch:
+                break
+            rows = [row for user in batch for row in _identities(role, user)]
+            db.bulk_insert_mappings(LoginIdentity, rows)
+            written += len(rows)
+            last_id = getattr(batch[-1], id_attr)
+    db.commit()
+    return written
@@ -1,64 +1,203 @@
-from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from database import get_db
-from crud import marks as marks_crud
-from schemas import MarksCreate, MarksUpdate, MarksResponse
-
-router = APIRouter(prefix="/marks", tags=["Marks"])
-
-
-@router.post("/", response_model=MarksResponse)
-def create_mark(data: MarksCreate, db: Session = Depends(get_db)):
-    """Create a new marks record"""
-    return marks_crud.create_mark(db, data)
-
-
-@router.get("/", response_model=list[MarksResponse])
-def list_marks(db: Session = Depends(get_db)):
-    """Get all marks records"""
-    return marks_crud.get_all_marks(db)
-
-
-@router.get("/student/{student_id}", response_model=list[MarksResponse])
-def get_student_marks(student_id: int, db: Session = Depends(get_db)):
-    """Get all marks for a specific student"""
-    return marks_crud.get_student_marks(db, student_id)
-
-
-@router.get("/course/{course_id}", response_model=list[MarksResponse])
-def get_course_marks(course_id: int, db: Session = Depends(get_db)):
-    """Get all marks for a specific course"""
-    return marks_crud.get_course_marks(db, course_id)
-
-
-@router.get("/semester/{semester}", response_model=list[MarksResponse])
-def get_semester_marks(semester: int, db: Session = Depends(get_db)):
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from fastapi import HTTPException
+from models import Marks, MarksArchive, Course
+from schemas import MarksCreate, MarksUpdate, MarksSheet
+from types import SimpleNamespace
+from datetime import datetime
+from crud.grades import MARK_COLUMNS, calculate_weightage_and_grade_rows
+from crud import semester_archive
+from crud import table_versions
+
+QUIZ_COLUMNS = ('quiz1', 'quiz2', 'quiz3')
+ASSIGNMENT_COLUMNS = ('assignment1', 'assignment2', 'assignment3')
+
+# Columns derived from the assessment scores; never taken from the client
+DERIVED_COLUMNS = ('quiz_total', 'assignment_total', 'total_marks', 'grade_letter')
+
+BACKFILL_BATCH_SIZE = 1000
+
+# Rows per INSERT ... ON DUPLICATE KEY UPDATE statement in a gradebook upsert
+UPSERT_CHUNK_SIZE = 500
+
+def _section_total(mark, columns):
+    """Weightage of a 3-part section (quizzes or assignments) out of 10"""
+    return round(sum((float(getattr(mark, c) or 0) / 100) * 3.333 for c in columns), 2)
+
+def calculate_grade_totals(marks):
+    """Calculate the derived columns for Marks rows (ORM objects or column tuples) in one batch"""
+    weightages, letters = calculate_weightage_and_grade_rows(marks)
+    return [
+        {
+            'quiz_total': _section_total(mark, QUIZ_COLUMNS),
+            'assignment_total': _section_total(mark, ASSIGNMENT_COLUMNS),
+            'total_marks': float(total_weightage),
+            'grade_letter': str(grade_letter),
+        }
+        for mark, total_weightage, grade_letter in zip(marks, weightages, letters)
+    ]
+
+def apply_grade_totals(marks):
+    """Recompute the stored section totals, total_marks and grade_letter of Marks rows in place"""
+    for mark, totals in zip(marks, calculate_grade_totals(marks)):
+        for column, value in totals.items():
+            setattr(mark, column, value)
+    return marks
+
+def _is_stale(mark, expected):
+    """Compare a row's stored derived columns with freshly calculated values"""
+    for column in DERIVED_COLUMNS:
+        stored = getattr(mark, column)
+        if column == 'grade_letter':
+            if stored != expected[column]:
+                return True
+        elif stored is None or round(float(stored), 2) != expected[column]:
+            return True
+    return False
+
+def _iter_mark_batches(db: Session, batch_size: int = BACKFILL_BATCH_SIZE):
+    """Yield Marks score and derived columns in primary-key order, one batch at a time"""
+    columns = [getattr(Marks, c) for c in ('mark_id',) + MARK_COLUMNS + DERIVED_COLUMNS]
+    last_id = 0
+    while True:
+        batch = db.query(*columns).filter(Marks.mark_id > last_id).order_by(Marks.mark_id).limit(batch_size).all()
+        if not batch:
+            return
+        yield batch
+        last_id = batch[-1].mark_id
+
+def find_stale_marks(db: Session, batch_size: int = BACKFILL_BATCH_SIZE):
+    """Return ids of Marks rows whose stored totals or grade letter do not match their scores"""
+    stale = []
+    for batch in _iter_mark_batches(db, batch_size):
+        for mark, expected in zip(batch, calculate_grade_totals(batch)):
+            if _is_stale(mark, expected):
+                stale.append(mark.mark_id)
+    return stale
+
+def backfill_grade_totals(db: Session, batch_size: int = BACKFILL_BATCH_SIZE, only_stale: bool = False):
+    """Recompute and store totals for Marks rows, committing once per batch. Returns the number of rows written"""
+    updated = 0
+    for batch in _iter_mark_batches(db, batch_size):
+        mappings = [
+            {'mark_id': mark.mark_id, **expected}
+            for mark, expected in zip(batch, calculate_grade_totals(batch))
+            if not only_stale or _is_stale(mark, expected)
+        ]
+        if mappings:
+            db.bulk_update_mappings(Marks, mappings)
+            # bulk_update_mappings fires no session hooks, so bump the Marks version by hand
+            table_versions.touch(db, "Marks")
+            db.commit()
+            updated += len(mappings)
+    return updated
+
+def create_mark(db: Session, data: MarksCreate):
+    semester_archive.ensure_marks_not_archived(db, data.course_id, data.semester, [data.student_id])
+    mark_data = data.dict(exclude=set(DERIVED_COLUMNS))
+    obj = Marks(**mark_data)
+    apply_grade_totals([obj])
+    db.add(obj)
+    db.commit()
+    db.refresh(obj)
+    return obj
+
+def marks_model(archived: bool = False):
+    """Marks, or MarksArchive for semesters moved out by the rollover"""
+    return MarksArchive if archived else Marks
+
+def marks_query(db: Session, course_id: int | None = None, semester: int | None = None, archived: bool = False):
+    """Filtered marks query shared by the list and the streaming export"""
+    model = marks_model(archived)
+    query = db.query(model)
+    if course_id is not None:
+        query = query.filter(model.course_id == course_id)
+    if semester is not None:
+        query = query.filter(model.semester == semester)
+    return query
+
+def get_all_marks(db: Session, course_id: int | None = None, semester: int | None = None, archived: bool = False):
+    return marks_query(db, course_id, semester, archived).all()
+
+def get_student_marks(db: Session, student_id: int):
+    """Get all marks for a specific student, past semesters included"""
+    return (db.query(Marks).filter(Marks.student_id == student_id).all()
+            + db.query(MarksArchive).filter(MarksArchive.student_id == student_id).all())
+
+def get_course_marks(db: Session, course_id: int, semester: int | None = None, archived: bool = False):
+    """Get all marks for a specific course, optionally limited to one semester"""
+    return marks_query(db, course_id, semester, archived).all()
+
+def get_semester_marks(db: Session, semester: int, archived: bool = False):
     """Get all marks for a specific semester"""
-    return marks_crud.get_semester_marks(db, semester)
-
-
-@router.get("/student/{student_id}/course/{course_id}", response_model=list[MarksResponse])
-def get_student_course_marks(student_id: int, course_id: int, db: Session = Depends(get_db)):
-    """Get marks for a specific student-course combination"""
-    return marks_crud.get_student_course_marks(db, student_id, course_id)
-
-
-@router.get("/{mark_id}", response_model=MarksResponse)
-def get_mark(mark_id: int, db: Session = Depends(get_db)):
-    """Get a specific marks record by ID"""
-    mark = marks_crud.get_mark(db, mark_id)
-    if not mark:
-        raise HTTPException(status_code=404, detail="Marks record not found")
+    return marks_query(db, semester=semester, archived=archived).all()
+
+def get_student_course_marks(db: Session, student_id: int, course_id: int):
+    """Get marks for a specific student-course combination, past semesters included"""
+    return [
+        mark for model in (Marks, MarksArchive)
+        for mark in db.query(model).filter(model.student_id == student_id, model.course_id == course_id)
+    ]
+
+def get_mark(db: Session, mark_id: int):
+    """A marks record, from the archive if its semester was rolled over"""
+    return (db.query(Marks).filter(Marks.mark_id == mark_id).first()
+            or db.query(MarksArchive).filter(MarksArchive.mark_id == mark_id).first())
+
+def _get_current_mark(db: Session, mark_id: int):
+    mark = db.query(Marks).filter(Marks.mark_id == mark_id).first()
+    if mark:
+        return mark
+    if db.query(MarksArchive.mark_id).filter(MarksArchive.mark_id == mark_id).first():
+        raise HTTPException(status_code=409, detail="Marks of an archived semester cannot be changed")
+    raise HTTPException(status_code=404, detail="Marks record not found")
+
+def update_mark(db: Session, mark_id: int, data: MarksUpdate):
+    mark = _get_current_mark(db, mark_id)
+    for k, v in data.dict(exclude_unset=True, exclude=set(DERIVED_COLUMNS)).items():
+        setattr(mark, k, v)
+    apply_grade_totals([mark])
+    db.commit()
+    db.refresh(mark)
     return mark
 
-
-@router.put("/{mark_id}", response_model=MarksResponse)
-def update_mark(mark_id: int, data: MarksUpdate, db: Session = Depends(get_db)):
-    """Update a marks record"""
-    return marks_crud.update_mark(db, mark_id, data)
-
-
-@router.delete("/{mark_id}")
-def delete_mark(mark_id: int, db: Session = Depends(get_db)):
-    """Delete a marks record"""
-    return marks_crud.delete_mark(db, mark_id)
+def delete_mark(db: Session, mark_id: int):
+    mark = _get_current_mark(db, mark_id)
+    db.delete(mark)
+    db.commit()
+    return {"detail": "Marks deleted"}
+
+def upsert_course_marks(db: Session, course_id: int, sheet: MarksSheet):
+    """Save a course's whole marks sheet in one transaction.
+
+    Rows are written with multi-row INSERT ... ON DUPLICATE KEY UPDATE on the
+    (student_id, course_id, semester) unique key, so the sheet can be resubmitted safely.
+    """
+    if not db.query(Course.course_id).filter(Course.course_id == course_id).first():
+        raise HTTPException(status_code=404, detail="Course not found")
+    semester_archive.ensure_marks_not_archived(db, course_id, sheet.semester, [row.student_id for row in sheet.rows])
+
+    now = datetime.utcnow()
+    rows = [
+        SimpleNamespace(**row.dict(), course_id=course_id, semester=sheet.semester)
+        for row in sheet.rows
+    ]
+    values = [
+        {**vars(row), **totals, 'created_at': now, 'updated_at': now}
+        for row, totals in zip(rows, calculate_grade_totals(rows))
+    ]
+
+    try:
+        for start in range(0, len(values), UPSERT_CHUNK_SIZE):
+            stmt = mysql_insert(Marks).values(values[start:start + UPSERT_CHUNK_SIZE])
+            stmt = stmt.on_duplicate_key_update({
+                column: stmt.inserted[column]
+                for column in MARK_COLUMNS + DERIVED_COLUMNS + ('updated_at',)
+            })
+            db.execute(stmt)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    return get_course_marks(db, course_id, sheet.semester)
@@ -0,0 +1,92 @@
+"""
+Retention for the Notifications table.
+
+Read notifications older than NOTIFICATION_RETENTION_DAYS are moved to NotificationsArchive
+so the hot table only holds unread and recent rows. archive_read_notifications() walks
+Notifications in primary key order one window of NOTIFICATION_ARCHIVE_BATCH rows at a time,
+copies the window's expired read rows with INSERT ... SELECT, deletes them and commits,
+then sleeps NOTIFICATION_ARCHIVE_PAUSE seconds, so each chunk holds its locks briefly and
+leaves room for the API's own writes. The walk stops at the first window that is entirely
+newer than the cutoff (notification ids grow with created_at).
+"""
+import os
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import insert, delete, select, literal, DateTime
+from sqlalchemy.orm import Session
+from models import Notifications, NotificationArchive
+from crud import table_versions
+from pagination import PageParams, paginate
+
+# Age (days) after which read notifications are archived, rows examined per chunk,
+# seconds to sleep between chunks, and seconds between scheduled runs
+NOTIFICATION_RETENTION_DAYS = int(os.getenv("NOTIFICATION_RETENTION_DAYS", "90"))
+NOTIFICATION_ARCHIVE_BATCH = int(os.getenv("NOTIFICATION_ARCHIVE_BATCH", "1000"))
+NOTIFICATION_ARCHIVE_PAUSE = float(os.getenv("NOTIFICATION_ARCHIVE_PAUSE", "0.2"))
+NOTIFICATION_ARCHIVE_INTERVAL = int(os.getenv("NOTIFICATION_ARCHIVE_INTERVAL", "86400"))
+
+ARCHIVED_COLUMNS = (
+    "notification_id", "sender_id", "recipient_id", "student_id", "title", "message",
+    "date_sent", "created_at", "is_read", "type", "broadcast_id",
+)
+
+
+def _archive_chunk(db: Session, ids: list, now: datetime):
+    source = select(*(getattr(Notifications, c) for c in ARCHIVED_COLUMNS), literal(now, DateTime))
+    # Executed on the connection rather than the session: archiving old read rows is not a
+    # change clients need pushed (the session hooks would send every subscriber a resync per
+    # chunk), so only the table versions are bumped, for the ETags of the history lists
+    connection = db.connection()
+    connection.execute(
+        insert(NotificationArchive).from_select(
+            [*ARCHIVED_COLUMNS, "archived_at"],
+            source.where(Notifications.notification_id.in_(ids))
+        )
+    )
+    connection.execute(delete(Notifications).where(Notifications.notification_id.in_(ids)))
+    table_versions.touch(db, "Notifications", "NotificationsArchive")
+    db.commit()
+
+
+def archive_read_notifications(db: Session, days: int | None = None, batch_size: int | None = None,
+                               pause: float | None = None) -> dict:
+    """Move read notifications older than `days` to the archive, one committed chunk at a time"""
+    days = NOTIFICATION_RETENTION_DAYS if days is None else days
+    batch_size = batch_size or NOTIFICATION_ARCHIVE_BATCH
+    pause = NOTIFICATION_ARCHIVE_PAUSE if pause is None else pause
+    cutoff = datetime.utcnow() - timedelta(days=days)
+
+    start = time.perf_counter()
+    cursor = 0
+    archived = examined = chunks = 0
+    while True:
+        window = db.query(Notifications.notification_id, Notifications.created_at, Notifications.is_read).filter(
+            Notifications.notification_id > cursor
+        ).order_by(Notifications.notification_id).limit(batch_size).all()
+        if not window:
+            break
+        examined += len(window)
+        cursor = window[-1].notification_id
+
+        expired = [row.notification_id for row in window
+                   if row.is_read and row.created_at is not None and row.created_at < cutoff]
+        if expired:
+            _archive_chunk(db, expired, datetime.utcnow())
+            archived += len(expired)
+            chunks += 1
+        else:
+            db.rollback()  # end the read transaction between windows
+
+        if all(row.created_at is not None and row.created_at >= cutoff for row in window):
+            break
+        if pause:
+            time.sleep(pause)
+
+    elapsed = time.perf_counter() - start
+    return {"archived": archived, "examined": examined, "chunks": chunks, "seconds": round(elapsed, 2)}
+
+
+def get_archived_notifications(db: Session, student_id: int, page: PageParams | None = None):
+    """A student's archived notifications, newest first"""
+    query = db.query(NotificationArchive).filter(NotificationArchive.student_id == student_id)
+    return paginate(query, page, [NotificationArchive.created_at, NotificationArchive.notification_id], descending=True)
@@ -1,23 +1,223 @@
+"""
+Notifications and the unread counters of the student notification bell.
+
+A student's notifications are their own Notifications rows merged with the announcements
+stored once in NotificationBroadcasts (delivery "read") whose audience predicate matches
+the student. Read state of announcements is kept per student as a read marker (every
+announcement up to read_through is read, moved by "mark all as read") plus a NotificationReads
+row for each announcement read on its own past the marker, so it stays one row per student
+plus the handful of announcements read individually since the last "mark all".
+"""
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime
+from sqlalchemy import func, or_, and_, exists, select
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
-from models import Notifications
+from models import Notifications, NotificationBroadcast, NotificationReadMarker, NotificationRead, Student
 from schemas import NotificationCreate
+from crud import dashboard_counters
+from pagination import PageParams, Page, paginate, keyset_filter, encode_cursor, decode_cursor
+
+# Students whose unread count is kept in memory, and how long a cached count is trusted.
+# Writes in this process drop the entry at once; the TTL bounds staleness across workers.
+UNREAD_CACHE_SIZE = int(os.getenv("UNREAD_CACHE_SIZE", "4096"))
+UNREAD_CACHE_TTL = int(os.getenv("UNREAD_CACHE_TTL", "60"))
+
+# student_id -> (unread count, cached_until monotonic)
+_unread_cache = OrderedDict()
+
+
+def _cache_unread(student_id: int, count: int):
+    _unread_cache[student_id] = (count, time.monotonic() + UNREAD_CACHE_TTL)
+    _unread_cache.move_to_end(student_id)
+    while len(_unread_cache) > UNREAD_CACHE_SIZE:
+        _unread_cache.popitem(last=False)
+
+
+def forget_unread_count(*student_ids: int):
+    """Drop cached unread counts; with no ids, every student's (a new announcement)"""
+    if not student_ids:
+        _unread_cache.clear()
+    for student_id in student_ids:
+        _unread_cache.pop(student_id, None)
+
+
+# -----------------------------------------------------------
+# ANNOUNCEMENTS (stored once, matched on read)
+# -----------------------------------------------------------
+def _reader(db: Session, student_id: int):
+    """The student's audience attributes and announcement read marker, in one lookup"""
+    return db.query(
+        Student.department, Student.semester,
+        func.coalesce(NotificationReadMarker.read_through, 0).label("read_through")
+    ).outerjoin(
+        NotificationReadMarker, NotificationReadMarker.student_id == Student.student_id
+    ).filter(Student.student_id == student_id).first()
+
+
+def _announcements(db: Session, student_id: int, reader, *columns):
+    # Imported here because crud.broadcasts imports this module for its unread-count hooks
+    from crud.broadcasts import audience_filter
+
+    is_read = or_(
+        NotificationBroadcast.broadcast_id <= reader.read_through,
+        _read_singly(student_id)
+    )
+    return db.query(*columns, is_read.label("is_read")).filter(audience_filter(reader.department, reader.semester))
+
+
+def _read_singly(student_id: int):
+    return exists().where(
+        NotificationRead.student_id == student_id,
+        NotificationRead.broadcast_id == NotificationBroadcast.broadcast_id
+    )
+
+
+def unread_announcements(student_id: int):
+    """Scalar subquery counting the announcements addressed to a student that they have not read.
+
+    The student's audience and read marker are joined in, so the count is one statement and
+    can sit in a larger SELECT (the student dashboard). Unread is a WHERE condition, so only
+    announcements past the marker are range-scanned.
+    """
+    from crud.broadcasts import student_audience_filter
+
+    return select(func.count(NotificationBroadcast.broadcast_id)).select_from(Student).outerjoin(
+        NotificationReadMarker, NotificationReadMarker.student_id == Student.student_id
+    ).join(
+        NotificationBroadcast, student_audience_filter()
+    ).where(
+        Student.student_id == student_id,
+        NotificationBroadcast.broadcast_id > func.coalesce(NotificationReadMarker.read_through, 0),
+        ~_read_singly(student_id)
+    ).scalar_subquery()
+
+
+def count_unread_announcements(db: Session, student_id: int) -> int:
+    """Announcements addressed to a student that they have not read"""
+    return db.query(unread_announcements(student_id)).scalar() or 0
+
+
+def count_unread(db: Session, student_id: int) -> int:
+    """Count a student's unread notifications in the database and cache the result"""
+    count = db.query(func.count(Notifications.notification_id)).filter(
+        Notifications.student_id == student_id,
+        Notifications.is_read == False
+    ).scalar()
+    count += count_unread_announcements(db, student_id)
+    _cache_unread(student_id, count)
+    return count
+
+
+def get_unread_count(db: Session, student_id: int) -> int:
+    """A student's unread notification count, from the cache when it is fresh"""
+    entry = _unread_cache.get(student_id)
+    if entry is not None and entry[1] > time.monotonic():
+        return entry[0]
+    return count_unread(db, student_id)
+
 
 def create_notification(db: Session, data: NotificationCreate):
+    """A notification for one student; announcements to many go through crud.broadcasts"""
+    if data.student_id is None:
+        data.student_id = data.recipient_id
+    if data.student_id is None:
+        raise HTTPException(status_code=400, detail=(
+            "student_id is required; send announcements to all students with POST /notifications/broadcasts/"
+        ))
     obj = Notifications(**data.dict())
     db.add(obj)
+    dashboard_counters.invalidate(db, dashboard_counters.STUDENT, obj.student_id)
     db.commit()
+    forget_unread_count(obj.student_id)
     db.refresh(obj)
     return obj
 
-def get_notifications(db: Session):
-    return db.query(Notifications).all()
+def get_notifications(db: Session, page: PageParams | None = None, student_id: int | None = None):
+    query = db.query(Notifications)
+    if student_id is not None:
+        query = query.filter(Notifications.student_id == student_id)
+    return paginate(query, page, [Notifications.notification_id])
+
+def _announcement_item(row, student_id: int) -> dict:
+    return {
+        "notification_id": None,
+        "broadcast_id": row.broadcast_id,
+        "sender_id": row.sender_id,
+        "recipient_id": student_id,
+        "student_id": student_id,
+        "title": row.title,
+        "message": row.message,
+        "type": row.type,
+        "is_read": bool(row.is_read),
+        "date_sent": row.created_at,
+        "created_at": row.created_at,
+    }
+
+
+def _item_key(item):
+    """Sort key of a merged item: (created_at, notification_id), announcements as -broadcast_id"""
+    if isinstance(item, dict):
+        return [item["created_at"], -item["broadcast_id"]]
+    return [item.created_at, item.notification_id]
 
-def get_student_notifications(db: Session, student_id: int):
-    """Get all notifications for a specific student"""
-    return db.query(Notifications).filter(
-        Notifications.student_id == student_id
-    ).order_by(Notifications.created_at.desc()).all()
+
+def get_student_notifications(db: Session, student_id: int, page: PageParams | None = None):
+    """Get a student's notifications and the announcements addressed to them, newest first.
+
+    Both sources are read in the merged order (created_at, then notification_id or
+    -broadcast_id, descending) and limited to one page each, so a page costs two index range
+    scans however many announcements exist.
+    """
+    direct = db.query(Notifications).filter(Notifications.student_id == student_id)
+    direct_order = [Notifications.created_at, Notifications.notification_id]
+
+    reader = _reader(db, student_id)
+    announcements = None
+    if reader is not None:
+        announcements = _announcements(
+            db, student_id, reader,
+            NotificationBroadcast.broadcast_id, NotificationBroadcast.sender_id, NotificationBroadcast.title,
+            NotificationBroadcast.message, NotificationBroadcast.type, NotificationBroadcast.created_at
+        )
+    if page is None:
+        items = direct.all() + [_announcement_item(row, student_id) for row in (announcements or [])]
+        return Page(sorted(items, key=_item_key, reverse=True))
+
+    total = None
+    if page.include_total:
+        total = direct.order_by(None).count() + (announcements.order_by(None).count() if announcements else 0)
+
+    if page.cursor:
+        created_at, key = decode_cursor(page.cursor, direct_order)
+        # Within one created_at, notifications (key > 0) come before announcements (key < 0)
+        if key > 0:
+            direct = direct.filter(keyset_filter(direct_order, [created_at, key], descending=True))
+            if announcements is not None:
+                announcements = announcements.filter(NotificationBroadcast.created_at <= created_at)
+        else:
+            direct = direct.filter(Notifications.created_at < created_at)
+            if announcements is not None:
+                announcements = announcements.filter(or_(
+                    NotificationBroadcast.created_at < created_at,
+                    and_(NotificationBroadcast.created_at == created_at, NotificationBroadcast.broadcast_id > -key)
+                ))
+
+    items = direct.order_by(*(column.desc() for column in direct_order)).limit(page.limit + 1).all()
+    if announcements is not None:
+        rows = announcements.order_by(
+            NotificationBroadcast.created_at.desc(), NotificationBroadcast.broadcast_id
+        ).limit(page.limit + 1).all()
+        items += [_announcement_item(row, student_id) for row in rows]
+    items.sort(key=_item_key, reverse=True)
+
+    next_cursor = None
+    if len(items) > page.limit:
+        items = items[:page.limit]
+        next_cursor = encode_cursor(_item_key(items[-1]))
+    return Page(items, next_cursor, total)
 
 def mark_student_notifications_read(db: Session, student_id: int):
     """Mark all notifications for a student as read"""
@@ -25,9 +225,41 @@ def mark_student_notifications_read(db: Session, student_id: int):
         Notifications.student_id == student_id,
         Notifications.is_read == False
     ).update({"is_read": True})
+
+    # One marker covers every announcement so far; single reads below it are redundant
+    latest = db.query(func.max(NotificationBroadcast.broadcast_id)).scalar() or 0
+    marker = db.get(NotificationReadMarker, student_id)
+    if marker is None:
+        db.add(NotificationReadMarker(student_id=student_id, read_through=latest))
+    elif latest > marker.read_through:
+        marker.read_through = latest
+    db.query(NotificationRead).filter(
+        NotificationRead.student_id == student_id,
+        NotificationRead.broadcast_id <= latest
+    ).delete(synchronize_session=False)
+
+    dashboard_counters.invalidate(db, dashboard_counters.STUDENT, student_id)
     db.commit()
+    forget_unread_count(student_id)
     return {"detail": "Notifications marked as read"}
 
+def mark_announcement_read(db: Session, student_id: int, broadcast_id: int):
+    """Mark one announcement addressed to a student as read"""
+    reader = _reader(db, student_id)
+    if reader is None:
+        raise HTTPException(status_code=404, detail="Student not found")
+    row = _announcements(db, student_id, reader, NotificationBroadcast.broadcast_id).filter(
+        NotificationBroadcast.broadcast_id == broadcast_id
+    ).first()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Announcement not found")
+    if not row.is_read:
+        db.add(NotificationRead(student_id=student_id, broadcast_id=broadcast_id, read_at=datetime.utcnow()))
+        dashboard_counters.invalidate(db, dashboard_counters.STUDENT, student_id)
+        db.commit()
+        forget_unread_count(student_id)
+    return {"detail": "Announcement marked as read"}
+
 def get_notification(db: Session, notification_id: int):
     return db.query(Notifications).filter(Notifications.notification_id == notification_id).first()
 
@@ -35,10 +267,13 @@ def update_notification(db: Session, notification_id: int, data: dict):
     n = get_notification(db, notification_id)
     if not n:
         raise HTTPException(status_code=404, detail="Notification not found")
+    previous_student_id = n.student_id
     for key, value in data.items():
         if hasattr(n, key):
             setattr(n, key, value)
+    dashboard_counters.invalidate(db, dashboard_counters.STUDENT, previous_student_id, n.student_id)
     db.commit()
+    forget_unread_count(previous_student_id, n.student_id)
     db.refresh(n)
     return n
 
@@ -47,5 +282,7 @@ def delete_notification(db: Session, notification_id: int):
     if not n:
         raise HTTPException(status_code=404, detail="Notification not found")
     db.delete(n)
+    dashboard_counters.invalidate(db, dashboard_counters.STUDENT, n.student_id)
     db.commit()
+    forget_unread_count(n.student_id)
     return {"detail": "Notification deleted"}
@@ -0,0 +1,166 @@
+"""
+Active/archive split for Attendance and Marks.
+
+Attendance and Marks rows of a semester the student has moved past (the row's semester is
+below Student.semester) are history, yet every query on the hot tables had to step over
+them. rollover() moves them to AttendanceArchive and MarksArchive, so current-semester
+reads and writes (rosters, bulk saves, course lists) only touch current rows. Archived rows keep their ids and stay readable through the attendance
+and marks crud functions (archived=True on the list queries; per-student and by-id lookups
+read both tables). Once archived they are read-only: the attendance and marks write paths
+call ensure_attendance_not_archived() / ensure_marks_not_archived() and answer 409 for a
+key that is already in the archive, since the hot table's unique key cannot see it and
+would accept a second row for the same day or semester.
+
+An Attendance row has no semester of its own: it takes the semester of the student's
+enrollment in the course, and rows without an enrollment stay in Attendance. Each table is
+walked in primary key order one window of SEMESTER_ARCHIVE_BATCH rows at a time; a window's
+past-semester rows are copied with INSERT ... SELECT and deleted in one committed chunk,
+then the walk sleeps SEMESTER_ARCHIVE_PAUSE seconds, as in notification_archive. The
+AttendanceSummary counts are left alone: archived attendance still counts.
+"""
+import os
+import time
+from datetime import datetime
+from sqlalchemy import insert, delete, select, func, literal, DateTime
+from sqlalchemy.orm import Session
+from fastapi import HTTPException
+from models import Attendance, AttendanceArchive, Marks, MarksArchive, Enrollment, Student
+from crud import table_versions
+
+# Rows examined per chunk and seconds to sleep between chunks
+SEMESTER_ARCHIVE_BATCH = int(os.getenv("SEMESTER_ARCHIVE_BATCH", "1000"))
+SEMESTER_ARCHIVE_PAUSE = float(os.getenv("SEMESTER_ARCHIVE_PAUSE", "0.2"))
+
+ATTENDANCE_COLUMNS = ("attendance_id", "student_id", "course_id", "date", "status")
+MARKS_COLUMNS = tuple(c.key for c in MarksArchive.__table__.columns if c.key != "archived_at")
+
+
+def ensure_attendance_not_archived(db: Session, course_id: int, day, student_ids):
+    """Refuse to write attendance for (student, course, date) keys a rollover has archived"""
+    archived = sorted(s for (s,) in db.query(AttendanceArchive.student_id).filter(
+        AttendanceArchive.student_id.in_(set(student_ids)),
+        AttendanceArchive.course_id == course_id,
+        AttendanceArchive.date == day
+    ))
+    if archived:
+        raise HTTPException(status_code=409, detail=(
+            f"Attendance of an archived semester cannot be changed (students {', '.join(map(str, archived))})"
+        ))
+
+
+def ensure_marks_not_archived(db: Session, course_id: int, semester, student_ids):
+    """Refuse to write marks for (student, course, semester) keys a rollover has archived"""
+    archived = sorted(s for (s,) in db.query(MarksArchive.student_id).filter(
+        MarksArchive.student_id.in_(set(student_ids)),
+        MarksArchive.course_id == course_id,
+        MarksArchive.semester == semester
+    ))
+    if archived:
+        raise HTTPException(status_code=409, detail=(
+            f"Marks of an archived semester cannot be changed (students {', '.join(map(str, archived))})"
+        ))
+
+
+def _enrollment_semester():
+    # Correlated so a duplicated enrollment cannot repeat the Attendance row
+    return select(func.max(Enrollment.semester)).where(
+        Enrollment.student_id == Attendance.student_id,
+        Enrollment.course_id == Attendance.course_id
+    ).scalar_subquery()
+
+
+def _current_semester(student_id_column):
+    return select(Student.semester).where(Student.student_id == student_id_column).scalar_subquery()
+
+
+def _is_past(semester, current) -> bool:
+    return semester is not None and current is not None and semester < current
+
+
+def _attendance_window(db: Session, cursor: int, batch_size: int):
+    return db.query(
+        Attendance.attendance_id.label("row_id"),
+        _enrollment_semester().label("semester"),
+        _current_semester(Attendance.student_id).label("current")
+    ).filter(Attendance.attendance_id > cursor).order_by(Attendance.attendance_id).limit(batch_size).all()
+
+
+def _marks_window(db: Session, cursor: int, batch_size: int):
+    return db.query(
+        Marks.mark_id.label("row_id"),
+        Marks.semester.label("semester"),
+        _current_semester(Marks.student_id).label("current")
+    ).filter(Marks.mark_id > cursor).order_by(Marks.mark_id).limit(batch_size).all()
+
+
+def _archive_attendance(connection, ids: list, now: datetime):
+    source = select(
+        *(getattr(Attendance, c) for c in ATTENDANCE_COLUMNS), _enrollment_semester(), literal(now, DateTime)
+    ).where(Attendance.attendance_id.in_(ids))
+    connection.execute(insert(AttendanceArchive).from_select([*ATTENDANCE_COLUMNS, "semester", "archived_at"], source))
+    connection.execute(delete(Attendance).where(Attendance.attendance_id.in_(ids)))
+
+
+def _archive_marks(connection, ids: list, now: datetime):
+    source = select(*(getattr(Marks, c) for c in MARKS_COLUMNS), literal(now, DateTime)).where(Marks.mark_id.in_(ids))
+    connection.execute(insert(MarksArchive).from_select([*MARKS_COLUMNS, "archived_at"], source))
+    connection.execute(delete(Marks).where(Marks.mark_id.in_(ids)))
+
+
+# table -> (window query, chunk mover, archive table)
+TABLES = {
+    "Attendance": (_attendance_window, _archive_attendance, "AttendanceArchive"),
+    "Marks": (_marks_window, _archive_marks, "MarksArchive"),
+}
+
+
+def count_past_rows(db: Session) -> dict:
+    """Rows of each table a rollover would move now (walks the tables without writing)"""
+    counts = {}
+    for table, (window_query, _, _) in TABLES.items():
+        cursor, counts[table] = 0, 0
+        while True:
+            window = window_query(db, cursor, SEMESTER_ARCHIVE_BATCH)
+            if not window:
+                break
+            counts[table] += sum(_is_past(row.semester, row.current) for row in window)
+            cursor = window[-1].row_id
+        db.rollback()
+    return counts
+
+
+def rollover(db: Session, batch_size: int | None = None, pause: float | None = None) -> dict:
+    """Move past-semester Attendance and Marks rows to their archives, one committed chunk at a time"""
+    batch_size = batch_size or SEMESTER_ARCHIVE_BATCH
+    pause = SEMESTER_ARCHIVE_PAUSE if pause is None else pause
+
+    result = {}
+    for table, (window_query, archive_chunk, archive_table) in TABLES.items():
+        start = time.perf_counter()
+        cursor = 0
+        archived = examined = chunks = 0
+        while True:
+            window = window_query(db, cursor, batch_size)
+            if not window:
+                break
+            examined += len(window)
+            cursor = window[-1].row_id
+
+            past = [row.row_id for row in window if _is_past(row.semester, row.current)]
+            if past:
+                # On the connection, like the notification archiver: moving history is not a
+                # change to push to clients, so only the table versions are bumped
+                archive_chunk(db.connection(), past, datetime.utcnow())
+                table_versions.touch(db, table, archive_table)
+                db.commit()
+                archived += len(past)
+                chunks += 1
+            else:
+                db.rollback()  # end the read transaction between windows
+
+            if pause and past:
+                time.sleep(pause)
+
+        result[table] = {"archived": archived, "examined": examined, "chunks": chunks,
+                         "seconds": round(time.perf_counter() - start, 2)}
+    return result
@@ -0,0 +1,139 @@
+"""
+Signed login sessions.
+
+/auth/login stores a UserSessions row and hands out "<session_id>.<signature>", where the
+signature is an HMAC-SHA256 of the session id under SESSION_SECRET. Checking a request is
+a signature check plus a lookup in an in-process LRU cache; the database is only read on a
+cache miss or once a cached entry is older than SESSION_CACHE_TTL, which also bounds how
+long a revocation made by another worker process takes to be seen here. Revocations made
+in this process drop the cache entry immediately.
+"""
+import base64
+import hashlib
+import hmac
+import logging
+import os
+import secrets
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from sqlalchemy.orm import Session
+from models import UserSession
+
+logger = logging.getLogger(__name__)
+
+# Lifetime of a session from login (seconds)
+SESSION_TTL = int(os.getenv("SESSION_TTL", "43200"))
+# Sessions kept in memory, and how long a cached session is trusted before re-reading it
+SESSION_CACHE_SIZE = int(os.getenv("SESSION_CACHE_SIZE", "4096"))
+SESSION_CACHE_TTL = int(os.getenv("SESSION_CACHE_TTL", "60"))
+
+_secret = os.getenv("SESSION_SECRET", "")
+if not _secret:
+    logger.warning("SESSION_SECRET is not set; sessions will not survive a restart")
+    _secret = secrets.token_hex(32)
+SESSION_SECRET = _secret.encode("utf-8")
+
+# session_id -> (role, user_id, expires_at epoch, cached_until monotonic)
+_cache = OrderedDict()
+
+
+def _sign(session_id: str) -> str:
+    digest = hmac.new(SESSION_SECRET, session_id.encode("utf-8"), hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode("ascii")
+
+
+def session_id_from_token(token: str):
+    """Return the session id of a well-signed token, or None"""
+    session_id, _, signature = (token or "").partition(".")
+    if not session_id or not signature:
+        return None
+    if not hmac.compare_digest(signature, _sign(session_id)):
+        return None
+    return session_id
+
+
+def _cache_store(session_id: str, role: str, user_id: int, expires_at: float):
+    _cache[session_id] = (role, user_id, expires_at, time.monotonic() + SESSION_CACHE_TTL)
+    _cache.move_to_end(session_id)
+    while len(_cache) > SESSION_CACHE_SIZE:
+        _cache.popitem(last=False)
+
+
+def _session_dict(session_id: str, role: str, user_id: int, expires_at: float):
+    return {"session_id": session_id, "role": role, "user_id": user_id, "expires_at": expires_at}
+
+
+def create_session(db: Session, role: str, user_id: int):
+    """Start a session for a signed-in user and return its token"""
+    session_id = secrets.token_urlsafe(32)
+    expires_at = datetime.utcnow() + timedelta(seconds=SESSION_TTL)
+    db.add(UserSession(session_id=session_id, role=role, user_id=user_id, expires_at=expires_at))
+    db.commit()
+    _cache_store(session_id, role, user_id, time.time() + SESSION_TTL)
+    return f"{session_id}.{_sign(session_id)}"
+
+
+def get_cached_session(session_id: str):
+    """Return the session from the in-process cache, or None on a miss or stale entry"""
+    entry = _cache.get(session_id)
+    if entry is None:
+        return None
+    role, user_id, expires_at, cached_until = entry
+    now = time.monotonic()
+    if cached_until < now or expires_at < time.time():
+        _cache.pop(session_id, None)
+        return None
+    _cache.move_to_end(session_id)
+    return _session_dict(session_id, role, user_id, expires_at)
+
+
+def get_session(db: Session, session_id: str):
+    """Return a live session, reading the database on a cache miss"""
+    cached = get_cached_session(session_id)
+    if cached:
+        return cached
+
+    row = db.query(
+        UserSession.role, UserSession.user_id, UserSession.expires_at
+    ).filter(
+        UserSession.session_id == session_id,
+        UserSession.revoked == False
+    ).first()
+    if not row or row.expires_at < datetime.utcnow():
+        return None
+
+    remaining = (row.expires_at - datetime.utcnow()).total_seconds()
+    expires_at = time.time() + remaining
+    _cache_store(session_id, row.role, row.user_id, expires_at)
+    return _session_dict(session_id, row.role, row.user_id, expires_at)
+
+
+def revoke_session(db: Session, session_id: str):
+    """Sign a single session out"""
+    _cache.pop(session_id, None)
+    db.query(UserSession).filter(UserSession.session_id == session_id).update(
+        {UserSession.revoked: True}, synchronize_session=False
+    )
+    db.commit()
+
+
+def revoke_user_sessions(db: Session, role: str, user_id: int):
+    """Sign a user out everywhere as part of the caller's transaction (password reset, lock, delete)"""
+    for session_id, entry in list(_cache.items()):
+        if entry[0] == role and entry[1] == user_id:
+            _cache.pop(session_id, None)
+    db.query(UserSession).filter(
+        UserSession.role == role,
+        UserSession.user_id == user_id,
+        UserSession.revoked == False
+    ).update({UserSession.revoked: True}, synchronize_session=False)
+
+
+def purge_expired(db: Session):
+    """Delete expired and revoked sessions. Returns rows deleted"""
+    deleted = db.query(UserSession).filter(
+        (UserSession.expires_at < datetime.utcnow()) | (UserSession.revoked == True)
+    ).delete(synchronize_session=False)
+    db.commit()
+    return deleted
@@ -1,20 +1,28 @@
 from sqlalchemy.orm import Session
+from sqlalchemy import func, select, case
 from fastapi import HTTPException
-from models import Student
-from schemas import StudentCreate, StudentResponse
-from security import hash_password
+from models import Student, Enrollment, AttendanceSummary, Grades, Fee, Notifications
+from schemas import StudentCreate, StudentUpdate, StudentResponse
+from crud import dashboard_counters
+from crud import attendance_summary
+from crud import login_identity
+from crud import sessions
+from crud import notifications as notifications_crud
 from sqlalchemy.exc import IntegrityError
 
 def create_student(db: Session, student: StudentCreate) -> Student:
+    """`password` is already hashed: the router hashes it on the bcrypt worker pool"""
     existing = db.query(Student).filter(Student.email == student.email).first()
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
 
     student_data = student.dict()
-    student_data['password'] = hash_password(student_data['password'])
     db_student = Student(**student_data)
     db.add(db_student)
+    dashboard_counters.invalidate(db, dashboard_counters.ADMIN)
     try:
+        db.flush()
+        login_identity.sync_user(db, login_identity.STUDENT, db_student)
         db.commit()
         db.refresh(db_student)
     except IntegrityError as e:
@@ -25,27 +33,50 @@ def create_student(db: Session, student: StudentCreate) -> Student:
         raise HTTPException(status_code=500, detail=str(e))
     return db_student
 
-def get_students(db: Session):
-    return db.query(Student).all()
+def student_query(db: Session, department: str | None = None, semester: int | None = None):
+    """Filtered student query behind the fast JSON list route"""
+    query = db.query(Student)
+    if department:
+        query = query.filter(Student.department == department)
+    if semester is not None:
+        query = query.filter(Student.semester == semester)
+    return query
 
 def get_student(db: Session, student_id: int):
     return db.query(Student).filter(Student.student_id == student_id).first()
 
-def update_student(db: Session, student_id: int, data: StudentCreate):
+def update_student(db: Session, student_id: int, data: StudentUpdate):
+    """A non-empty `password` is already hashed: the router hashes it on the bcrypt worker pool"""
     student = get_student(db, student_id)
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
     
     update_data = data.dict()
-    if 'password' in update_data and update_data['password']:
-        update_data['password'] = hash_password(update_data['password'])
+    if not update_data.get('password'):
+        update_data.pop('password', None)
+    else:
+        # A new password signs the user out everywhere, as a reset does
+        sessions.revoke_user_sessions(db, login_identity.STUDENT, student_id)
     
+    if 'department' in update_data:
+        attendance_summary.move_department(db, student_id, student.department, update_data['department'])
     for key, value in update_data.items():
         setattr(student, key, value)
+    dashboard_counters.invalidate(db, dashboard_counters.ADMIN)
+    login_identity.sync_user(db, login_identity.STUDENT, student)
     db.commit()
     db.refresh(student)
     return student
 
+def reset_password(db: Session, student_id: int, password_hash: str):
+    """Set a new (hashed) password and sign the student out everywhere"""
+    student = get_student(db, student_id)
+    if not student:
+        raise HTTPException(status_code=404, detail="Student not found")
+    student.password = password_hash
+    sessions.revoke_user_sessions(db, 'student', student_id)
+    db.commit()
+
 
 def submit_profile_update(db: Session, student_id: int, updates: dict):
     """Apply profile updates and mark verification pending."""
@@ -54,11 +85,15 @@ def submit_profile_update(db: Session, student_id: int, updates: dict):
         raise HTTPException(status_code=404, detail="Student not found")
     # Only update allowed profile fields
     allowed = {"gender", "dob", "department", "contact", "address"}
+    if "department" in updates:
+        attendance_summary.move_department(db, student_id, student.department, updates["department"])
     for k, v in updates.items():
         if k in allowed:
             setattr(student, k, v)
     student.verification_status = 'pending'
     student.profile_verified = False
+    dashboard_counters.invalidate(db, dashboard_counters.ADMIN)
+    login_identity.sync_user(db, login_identity.STUDENT, student)
     db.commit()
     db.refresh(student)
     return student
@@ -74,14 +109,100 @@ def verify_profile(db: Session, student_id: int, approve: bool = True):
         raise HTTPException(status_code=404, detail="Student not found")
     student.profile_verified = bool(approve)
     student.verification_status = 'verified' if approve else 'rejected'
+    dashboard_counters.invalidate(db, dashboard_counters.ADMIN)
     db.commit()
     db.refresh(student)
     return student
 
+# Grade points used for CGPA; grades outside this table are ignored
+GRADE_POINTS = {
+    'A+': 4.0, 'A': 4.0, 'A-': 3.7,
+    'B+': 3.3, 'B': 3.0, 'B-': 2.7,
+    'C+': 2.3, 'C': 2.0, 'C-': 1.7,
+    'D': 1.0, 'F': 0.0
+}
+
+
+def get_dashboard_stats(db: Session, student_id: int):
+    """Compute every student dashboard figure in a single statement of scalar subqueries"""
+    enrolled_courses = select(func.count(Enrollment.enrollment_id)).where(
+        Enrollment.student_id == student_id,
+        Enrollment.status == "Active"
+    ).scalar_subquery()
+
+    # From the per-course rollup rather than every Attendance row
+    total_attendance = select(func.sum(AttendanceSummary.total_count)).where(
+        AttendanceSummary.student_id == student_id
+    ).scalar_subquery()
+
+    present_count = select(func.sum(AttendanceSummary.present_count)).where(
+        AttendanceSummary.student_id == student_id
+    ).scalar_subquery()
+
+    # AVG skips the NULLs CASE yields for unknown grades, matching the old per-row filter
+    cgpa = select(func.avg(case(GRADE_POINTS, value=Grades.grade))).where(
+        Grades.student_id == student_id
+    ).scalar_subquery()
+
+    total_fee_amount = select(func.coalesce(func.sum(Fee.total_amount), 0)).where(
+        Fee.student_id == student_id
+    ).scalar_subquery()
+
+    amount_paid = select(func.coalesce(func.sum(Fee.amount_paid), 0)).where(
+        Fee.student_id == student_id
+    ).scalar_subquery()
+
+    unread_notifications = select(func.count(Notifications.notification_id)).where(
+        Notifications.student_id == student_id,
+        Notifications.is_read == False
+    ).scalar_subquery()
+
+    unread_announcements = notifications_crud.unread_announcements(student_id)
+
+    row = db.query(
+        enrolled_courses.label("enrolled_courses"),
+        total_attendance.label("total_attendance"),
+        present_count.label("present_count"),
+        cgpa.label("cgpa"),
+        total_fee_amount.label("total_fee_amount"),
+        amount_paid.label("amount_paid"),
+        unread_notifications.label("unread_notifications"),
+        unread_announcements.label("unread_announcements"),
+    ).one()
+
+    total = int(row.total_attendance or 0)
+    present = int(row.present_count or 0)
+    attendance_percentage = round((present / total * 100), 2) if total > 0 else 0
+
+    total_fee = float(row.total_fee_amount or 0)
+    paid = float(row.amount_paid or 0)
+    fee_balance = total_fee - paid
+
+    # Determine fee status: Paid if balance is 0 or negative, otherwise Unpaid
+    fee_status = "Paid" if fee_balance <= 0 and total_fee > 0 else ("Unpaid" if total_fee > 0 else "N/A")
+
+    return {
+        "enrolled_courses": int(row.enrolled_courses or 0),
+        "attendance_percentage": float(attendance_percentage),
+        "total_attendance_records": total,
+        "present_count": present,
+        "cgpa": round(float(row.cgpa), 2) if row.cgpa is not None else 0.0,
+        "fee_status": fee_status,
+        "fee_balance": float(fee_balance),
+        "total_fee_amount": total_fee,
+        "amount_paid": paid,
+        "unread_notifications": int(row.unread_notifications or 0) + int(row.unread_announcements or 0)
+    }
+
 def delete_student(db: Session, student_id: int):
     student = get_student(db, student_id)
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
+    attendance_summary.remove_student(db, student_id)
     db.delete(student)
+    dashboard_counters.invalidate(db, dashboard_counters.ADMIN)
+    dashboard_counters.invalidate_student(db, student_id)
+    login_identity.remove_user(db, login_identity.STUDENT, student_id)
+    sessions.revoke_user_sessions(db, login_identity.STUDENT, student_id)
     db.commit()
     return {"detail": "Student deleted"}
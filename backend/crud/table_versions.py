@@ -0,0 +1,80 @@
+"""
+Per-table change counters for conditional GETs.
+
+Every committed write to a tracked table bumps that table's TableVersions row inside the
+same transaction, so the versions of the tables a route reads identify the data behind a
+response (etag.py turns them into ETags). The bumps come from Session event hooks rather
+than from each CRUD function, so writes made directly in routers (e.g. the security PATCH
+endpoints) and bulk UPDATE/DELETE statements are covered too. Paths that bypass both the
+unit of work and ORM statement execution (bulk_insert_mappings, bulk_update_mappings,
+statements run on db.connection()) call touch() themselves.
+"""
+from itertools import chain
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from models import TableVersion
+
+# Tables whose reads are served with ETags
+TRACKED_TABLES = frozenset({
+    "Student", "Faculty", "Admin", "Course", "Enrollment", "Attendance",
+    "Grades", "Marks", "Fee", "Salary", "Notifications", "NotificationBroadcasts",
+    "NotificationReadMarkers", "NotificationReads", "NotificationsArchive", "Feedback",
+    "AttendanceSummary", "AttendanceCourseSummary", "AttendanceDepartmentSummary",
+    "AttendanceArchive", "MarksArchive",
+})
+
+_INFO_KEY = "touched_tables"
+
+
+def touch(db: Session, *tables: str):
+    """Mark tables as changed in the current transaction (for writes the hooks cannot see)"""
+    db.info.setdefault(_INFO_KEY, set()).update(t for t in tables if t in TRACKED_TABLES)
+
+
+def bump(connection, tables):
+    """Increment the versions of `tables`, creating missing rows"""
+    # Sorted so concurrent transactions lock the version rows in the same order
+    rows = [{"table_name": table, "version": 1} for table in sorted(tables)]
+    stmt = mysql_insert(TableVersion).values(rows)
+    stmt = stmt.on_duplicate_key_update(version=TableVersion.version + 1)
+    connection.execute(stmt)
+
+
+def get_versions(db: Session, tables) -> dict:
+    """Current version of each table (0 if it was never written)"""
+    rows = db.query(TableVersion.table_name, TableVersion.version).filter(
+        TableVersion.table_name.in_(tables)
+    ).all()
+    versions = dict.fromkeys(tables, 0)
+    versions.update({row.table_name: row.version for row in rows})
+    return versions
+
+
+# -----------------------------------------------------------
+# SESSION HOOKS
+# -----------------------------------------------------------
+@event.listens_for(Session, "after_flush")
+def _record_flush(session, flush_context):
+    # new/dirty/deleted still hold the pre-flush state here
+    tables = {getattr(obj, "__tablename__", None) for obj in chain(session.new, session.dirty, session.deleted)}
+    touch(session, *filter(None, tables))
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _record_statement(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        touch(orm_execute_state.session, orm_execute_state.statement.table.name)
+
+
+@event.listens_for(Session, "before_commit")
+def _bump_versions(session):
+    session.flush()
+    tables = session.info.pop(_INFO_KEY, None)
+    if tables:
+        bump(session.connection(), tables)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changes(session):
+    session.info.pop(_INFO_KEY, None)
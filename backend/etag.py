@@ -0,0 +1,164 @@
+"""
+Conditional GETs for the read routes.
+
+Each GET/HEAD under a prefix in ROUTE_TABLES gets a strong ETag derived from the versions
+of the tables that route reads (crud/table_versions.py) plus the request URL. When the
+client's If-None-Match matches, the middleware answers 304 after a single primary-key
+lookup on TableVersions, before the route runs any row query. Otherwise the route runs as
+usual and the ETag is added to its 200 response.
+
+Routes guarded by a session dependency (security.get_current_session / require_role) are
+never answered early, since that would skip the 401/403: they run, and a 200 whose ETag
+matches is sent as a body-less 304 instead.
+
+Dashboard stats are left out: they are served from DashboardCounters, which has its own
+reconciliation and is not versioned.
+"""
+import hashlib
+import logging
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import Response
+from starlette.routing import Match
+from database import SessionLocal
+from crud import table_versions
+
+logger = logging.getLogger(__name__)
+
+# First path segment -> tables the routes under it read
+ROUTE_TABLES = {
+    "students": ("Student",),
+    "faculties": ("Faculty", "Course"),
+    "admins": ("Admin", "Student"),
+    "courses": ("Course", "Enrollment"),
+    "enrollments": ("Enrollment",),
+    "attendance": ("Attendance", "AttendanceArchive", "Enrollment"),
+    "grades": ("Grades", "Marks", "MarksArchive"),
+    "marks": ("Marks", "MarksArchive"),
+    "fees": ("Fee",),
+    "salaries": ("Salary", "Faculty"),
+    "notifications": ("Notifications", "NotificationBroadcasts", "NotificationReadMarkers", "NotificationReads",
+                      "NotificationsArchive", "Student"),
+    "feedback": ("Feedback",),
+}
+
+# (first, last or second) path segments of routes reading more than their prefix's tables
+SUBROUTE_TABLES = {
+    ("courses", "roster"): ("Course", "Enrollment", "Student", "Attendance", "Marks"),
+    ("attendance", "summary"): ("AttendanceSummary", "AttendanceCourseSummary", "AttendanceDepartmentSummary",
+                                "Course", "Student"),
+}
+
+
+def tables_for(path: str):
+    """Tables behind a GET path, or None if its responses are not versioned"""
+    if "/dashboard/" in path:
+        return None
+    segments = path.strip("/").split("/")
+    return (SUBROUTE_TABLES.get((segments[0], segments[-1]))
+            or SUBROUTE_TABLES.get((segments[0], segments[1] if len(segments) > 1 else None))
+            or ROUTE_TABLES.get(segments[0]))
+
+
+def _load_versions(tables) -> dict:
+    db = SessionLocal()
+    try:
+        return table_versions.get_versions(db, tables)
+    finally:
+        db.close()
+
+
+def make_etag(versions: dict, headers: Headers, path: str, query: str) -> str:
+    digest = hashlib.sha256()
+    for table in sorted(versions):
+        digest.update(f"{table}:{versions[table]};".encode())
+    digest.update(f"{path}?{query}".encode())
+    # GZipMiddleware may compress the body, so the encoding is part of the representation
+    digest.update(b"gzip" if "gzip" in headers.get("accept-encoding", "") else b"identity")
+    return f'"{digest.hexdigest()[:32]}"'
+
+
+def _requires_session(dependant) -> bool:
+    return any(getattr(d.call, "requires_session", False) or _requires_session(d) for d in dependant.dependencies)
+
+
+def _api_routes(routes):
+    for route in routes:
+        router = getattr(route, "original_router", None)  # how newer FastAPI releases keep included routers
+        if router is not None:
+            yield from _api_routes(router.routes)
+        elif hasattr(route, "dependant"):
+            yield route
+
+
+def _guarded(app, scope) -> bool:
+    """Whether the route a request reaches depends on a signed-in session"""
+    scope = {**scope, "method": "GET"}  # HEAD is answered by the GET route
+    for route in _api_routes(app.router.routes):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return _requires_session(route.dependant)
+    return False
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+class ETagMiddleware:
+    def __init__(self, app):
+        self.app = app
+        self._guarded_paths = {}  # path -> whether its route needs a session
+
+    def _is_guarded(self, scope) -> bool:
+        path = scope["path"]
+        guarded = self._guarded_paths.get(path)
+        if guarded is None:
+            if len(self._guarded_paths) >= 4096:
+                self._guarded_paths.clear()
+            guarded = self._guarded_paths[path] = _guarded(scope["app"], scope)
+        return guarded
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            return await self.app(scope, receive, send)
+        tables = tables_for(scope["path"])
+        if tables is None:
+            return await self.app(scope, receive, send)
+
+        try:
+            versions = await run_in_threadpool(_load_versions, tables)
+        except Exception as e:
+            # Serve the request without an ETag rather than fail it
+            logger.warning(f"Could not read table versions: {e}")
+            return await self.app(scope, receive, send)
+
+        headers = Headers(scope=scope)
+        etag = make_etag(versions, headers, scope["path"], scope["query_string"].decode("latin-1"))
+        not_modified = _matches(headers.get("if-none-match", ""), etag)
+        if not_modified and not self._is_guarded(scope):
+            response = Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+            return await response(scope, receive, send)
+
+        # A guarded route that passed its session checks: its 200 becomes the 304
+        dropping_body = False
+
+        async def send_with_etag(message):
+            nonlocal dropping_body
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                if not_modified:
+                    dropping_body = True
+                    message = {"type": "http.response.start", "status": 304,
+                               "headers": [(b"etag", etag.encode()), (b"cache-control", b"no-cache")]}
+                else:
+                    response_headers = MutableHeaders(scope=message)
+                    response_headers["ETag"] = etag
+                    response_headers.setdefault("Cache-Control", "no-cache")
+            elif message["type"] == "http.response.body" and dropping_body:
+                if message.get("more_body", False):
+                    return
+                message = {"type": "http.response.body", "body": b""}
+            await send(message)
+
+        await self.app(scope, receive, send_with_etag)
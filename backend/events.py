@@ -0,0 +1,277 @@
+"""
+In-process pub/sub for live updates (GET /events/).
+
+Committed ORM writes to the tables in PUBLISHED_TABLES become change events: a Session
+hook collects the inserted, updated and deleted rows during flush and hands them to the
+bus once the transaction commits, so rolled-back changes are never published. Bulk
+INSERT/UPDATE/DELETE statements publish a row-less "changed" event and clients refetch
+that entity. The event is addressed to the users the statement names (the user columns of
+an executemany INSERT's rows, or an equality/IN on a user column in the WHERE clause) and
+to every subscriber of the entity when it names none.
+
+Every event is encoded as an SSE frame once and fanned out on the event loop to the
+queues of the subscribers whose entity/user filter matches it, so each extra client costs
+a queue append. A client that stops reading until its queue is full gets a single
+"resync" event instead of the backlog, and so does a client reconnecting with a
+Last-Event-ID older than the replay buffer.
+
+The bus lives in one worker process: with several workers, clients only see the writes
+made by the worker they are connected to.
+"""
+import asyncio
+import itertools
+import os
+import threading
+from collections import deque
+from typing import Collection, Optional
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.elements import BinaryExpression, BindParameter, BooleanClauseList
+from crud.table_versions import TRACKED_TABLES
+from fast_json import dumps
+
+# Frames buffered per client, events kept for Last-Event-ID replay, seconds between keep-alives
+EVENTS_QUEUE_SIZE = int(os.getenv("EVENTS_QUEUE_SIZE", "256"))
+EVENTS_REPLAY_SIZE = int(os.getenv("EVENTS_REPLAY_SIZE", "1000"))
+EVENTS_HEARTBEAT = float(os.getenv("EVENTS_HEARTBEAT", "15"))
+
+PUBLISHED_TABLES = TRACKED_TABLES
+ENTITIES = frozenset(table.lower() for table in PUBLISHED_TABLES)
+HIDDEN_COLUMNS = {"password"}
+
+# Columns naming the users a row belongs to, and the session role they map to
+USER_COLUMNS = {"student_id": "student", "faculty_id": "faculty", "admin_id": "admin"}
+
+# Rows of these tables that name no user are addressed to everyone when the predicate holds
+# (announcements stored once; course broadcasts only go to admins)
+BROADCAST_TABLES = {
+    "Notifications": lambda row: True,
+    "NotificationBroadcasts": lambda row: row.get("delivery") == "read",
+}
+
+HEARTBEAT = b": ping\n\n"
+
+
+class Event:
+    __slots__ = ("id", "entity", "op", "users", "data", "frame")
+
+    def __init__(self, event_id: Optional[int], entity: str, users: Optional[Collection], data: bytes,
+                 op: Optional[str] = None):
+        self.id = event_id
+        self.entity = entity
+        self.op = op  # created, updated, deleted or changed
+        self.users = users  # "role:id" strings; None: everyone
+        self.data = data  # the JSON-encoded change
+        event_line = b"event: %s\ndata: %s\n\n" % (entity.encode(), data)
+        self.frame = event_line if event_id is None else b"id: %d\n%s" % (event_id, event_line)
+
+
+# Sent instead of events a subscriber missed; the client refetches
+RESYNC = Event(None, "resync", None, b"{}")
+
+
+class Subscriber:
+    def __init__(self, entities: Optional[set] = None, user: Optional[str] = None):
+        self.entities = entities  # None: every entity
+        self.user = user  # "student:5"; None: every user
+        self.queue = asyncio.Queue(maxsize=EVENTS_QUEUE_SIZE)
+
+    def matches(self, ev: Event) -> bool:
+        if self.entities is not None and ev.entity not in self.entities:
+            return False
+        # users=None: a broadcast row or a row-less "changed" event, which every subscriber of the entity gets
+        return self.user is None or ev.users is None or self.user in ev.users
+
+    def offer(self, ev: Event):
+        try:
+            self.queue.put_nowait(ev)
+        except asyncio.QueueFull:
+            # The client is not keeping up; drop its backlog and have it refetch
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+
+
+class EventBus:
+    def __init__(self, replay_size: int = EVENTS_REPLAY_SIZE):
+        self._subscribers = set()
+        self._recent = deque(maxlen=replay_size)  # only touched on the event loop
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._loop = None
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, changes):
+        """Publish (entity, users, data) changes from any thread"""
+        loop = self._loop
+        if loop is None:
+            return  # nobody has ever subscribed in this process
+        encoded = [(entity, users, dumps(data), data["op"]) for entity, users, data in changes]
+        # Ids are taken and dispatches queued under one lock so they reach the loop in order
+        with self._lock:
+            events = [Event(next(self._ids), *change) for change in encoded]
+            try:
+                loop.call_soon_threadsafe(self._dispatch, events)
+            except RuntimeError:
+                pass  # loop closed during shutdown
+
+    def _dispatch(self, events):
+        for ev in events:
+            self._recent.append(ev)
+            for subscriber in self._subscribers:
+                if subscriber.matches(ev):
+                    subscriber.offer(ev)
+
+    def subscribe(self, entities: Optional[set] = None, user: Optional[str] = None,
+                  last_event_id: Optional[int] = None) -> Subscriber:
+        """Register a subscriber on the running loop, replaying what it missed since `last_event_id`"""
+        self._loop = asyncio.get_running_loop()
+        subscriber = Subscriber(entities, user)
+        if last_event_id is not None:
+            recent = self._recent
+            if not recent or last_event_id < recent[0].id - 1 or last_event_id > recent[-1].id:
+                subscriber.offer(RESYNC)
+            else:
+                for ev in recent:
+                    if ev.id > last_event_id and subscriber.matches(ev):
+                        subscriber.offer(ev)
+        self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        self._subscribers.discard(subscriber)
+
+    @staticmethod
+    async def next_batch(subscriber: Subscriber, timeout: Optional[float] = None) -> list:
+        """Wait for the subscriber's next event and return it with any others already queued"""
+        batch = [await asyncio.wait_for(subscriber.queue.get(), timeout)]
+        while not subscriber.queue.empty():
+            batch.append(subscriber.queue.get_nowait())
+        return batch
+
+    async def stream(self, entities: Optional[set] = None, user: Optional[str] = None,
+                     last_event_id: Optional[int] = None):
+        """SSE body for one client; subscribes when the response starts and unsubscribes when it ends"""
+        subscriber = self.subscribe(entities, user, last_event_id)
+        try:
+            yield b"retry: 3000\n\n"
+            while True:
+                try:
+                    batch = await self.next_batch(subscriber, EVENTS_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    yield HEARTBEAT
+                    continue
+                yield b"".join(ev.frame for ev in batch)
+        finally:
+            self.unsubscribe(subscriber)
+
+
+bus = EventBus()
+
+
+# -----------------------------------------------------------
+# SESSION HOOKS
+# -----------------------------------------------------------
+_INFO_KEY = "pending_events"
+
+
+def _row_users(row: dict):
+    return [f"{role}:{row[column]}" for column, role in USER_COLUMNS.items() if row.get(column) is not None]
+
+
+def _row_change(op: str, obj):
+    state = inspect(obj)
+    loaded = state.dict
+    row = {
+        attr.key: loaded[attr.key] for attr in state.mapper.column_attrs
+        if attr.key in loaded and attr.key not in HIDDEN_COLUMNS
+    }
+    users = tuple(_row_users(row))
+    addressed_to_all = BROADCAST_TABLES.get(obj.__tablename__)
+    if not users and addressed_to_all and addressed_to_all(row):
+        users = None
+    key = state.mapper.primary_key_from_instance(obj)
+    entity = obj.__tablename__.lower()
+    return entity, users, {"op": op, "entity": entity, "key": key[0] if len(key) == 1 else key, "data": row}
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_rows(session, flush_context):
+    pending = session.info.setdefault(_INFO_KEY, [])
+    for op, objects in (("created", session.new), ("updated", session.dirty), ("deleted", session.deleted)):
+        for obj in objects:
+            if getattr(obj, "__tablename__", None) not in PUBLISHED_TABLES:
+                continue
+            if op == "updated" and not session.is_modified(obj, include_collections=False):
+                continue
+            pending.append(_row_change(op, obj))
+
+
+def _criterion_users(criterion):
+    """Users an equality or IN on a user column restricts a WHERE clause to, or None"""
+    if not isinstance(criterion, BinaryExpression) or not isinstance(criterion.right, BindParameter):
+        return None
+    role = USER_COLUMNS.get(getattr(criterion.left, "key", None))
+    if role is None:
+        return None
+    value = criterion.right.effective_value
+    if criterion.operator is operators.eq:
+        values = [value]
+    elif criterion.operator is operators.in_op:
+        values = value
+    else:
+        return None
+    return [f"{role}:{v}" for v in values]
+
+
+def _statement_users(orm_execute_state) -> Optional[frozenset]:
+    """Users whose rows a bulk statement writes; None when it cannot be told"""
+    if orm_execute_state.is_insert:
+        rows = orm_execute_state.parameters
+        if not isinstance(rows, list) or not rows:
+            return None  # INSERT ... VALUES / FROM SELECT: rows are not inspected
+        users = set()
+        for row in rows:
+            row_users = _row_users(row)
+            if not row_users:
+                return None
+            users.update(row_users)
+        return frozenset(users)
+
+    where = orm_execute_state.statement.whereclause
+    if where is None:
+        return None
+    # Any top-level AND condition on a user column bounds the rows the statement touches
+    criteria = where.clauses if isinstance(where, BooleanClauseList) and where.operator is operators.and_ else [where]
+    for criterion in criteria:
+        users = _criterion_users(criterion)
+        if users is not None:
+            return frozenset(users)
+    return None
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_statement(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = orm_execute_state.statement.table.name
+        if table in PUBLISHED_TABLES:
+            entity = table.lower()
+            orm_execute_state.session.info.setdefault(_INFO_KEY, []).append(
+                (entity, _statement_users(orm_execute_state), {"op": "changed", "entity": entity, "key": None, "data": None})
+            )
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_committed(session):
+    changes = session.info.pop(_INFO_KEY, None)
+    if changes:
+        bus.publish(changes)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session):
+    session.info.pop(_INFO_KEY, None)
@@ -0,0 +1,96 @@
+"""
+Fast JSON responses built straight from column tuples.
+
+A `response_model=list[XResponse]` route turns every row into an ORM object, validates it
+into a Pydantic model and serializes that model again. Routes that opt in here instead
+select only the schema's columns and encode the tuples with orjson. The output is the
+same JSON the schema would produce; scripts/test_fast_json.py checks that against the
+schemas instead of validating every row of every request.
+
+Routes that take `?fields=a,b` narrow both the SELECT list and the payload to those fields
+(plus the key column, which the cursor needs).
+"""
+from decimal import Decimal
+import orjson
+from typing import Optional
+from fastapi import HTTPException, Query, Request, Response
+from pagination import PageParams, paginate, page_headers
+
+
+def _default(value):
+    # DECIMAL columns are declared as float in the schemas
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def dumps(value) -> bytes:
+    """orjson.dumps with the DECIMAL handling of the list responses"""
+    return orjson.dumps(value, default=_default)
+
+
+def fields_param(
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. fields=student_id,full_name")
+) -> Optional[list]:
+    """FastAPI dependency for the `fields` projection parameter"""
+    if not fields:
+        return None
+    return [name.strip() for name in fields.split(",") if name.strip()]
+
+
+def schema_fields(schema, model, requested: Optional[list] = None) -> list:
+    """Names of the schema's fields that are columns of `model`, in schema order.
+
+    With `requested`, only those fields; unknown names are a 400.
+    """
+    columns = model.__table__.columns
+    available = [name for name in schema.model_fields if name in columns]
+    if requested is None:
+        return available
+    unknown = sorted(set(requested) - set(available))
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(unknown)}. Available: {', '.join(available)}"
+        )
+    return [name for name in available if name in requested]
+
+
+def select_schema_columns(query, schema, requested: Optional[list] = None):
+    """Replace a single-model query's entity with the schema's columns. Returns (query, fields)"""
+    model = query.column_descriptions[0]["entity"]
+    fields = schema_fields(schema, model, requested)
+    columns = model.__table__.columns
+    return query.with_entities(*[columns[name] for name in fields]), fields
+
+
+def dumps_rows(fields, rows) -> bytes:
+    """Encode column tuples as a JSON array of objects"""
+    return orjson.dumps([dict(zip(fields, row)) for row in rows], default=_default)
+
+
+def dumps_row_lines(fields, rows) -> bytes:
+    """Encode column tuples as NDJSON"""
+    return b"".join(
+        orjson.dumps(dict(zip(fields, row)), default=_default, option=orjson.OPT_APPEND_NEWLINE)
+        for row in rows
+    )
+
+
+def fetch_page(query, schema, page: PageParams | None, columns, requested: Optional[list] = None) -> tuple:
+    """One page of a model query as column tuples. Returns (fields, Page)"""
+    if requested is not None:
+        requested = list(requested) + [column.key for column in columns if column.key not in requested]
+    query, fields = select_schema_columns(query, schema, requested)
+    return fields, paginate(query, page, columns)
+
+
+def page_response(request: Request, query, schema, page: PageParams | None, columns,
+                  requested: Optional[list] = None) -> Response:
+    """Paged list response for a model query, serialized from column tuples"""
+    fields, result = fetch_page(query, schema, page, columns, requested)
+    return Response(
+        content=dumps_rows(fields, result.items),
+        media_type="application/json",
+        headers=page_headers(request, result)
+    )
@@ -6,12 +6,21 @@ from fastapi.responses import FileResponse, JSONResponse
 from fastapi import Request, status
 from fastapi.exceptions import RequestValidationError
 from contextlib import asynccontextmanager
+import asyncio
 import os
 from dotenv import load_dotenv
 from sqlalchemy import text
 import logging
 
-from database import engine, Base
+from database import engine, Base, SessionLocal
+from crud import dashboard_counters
+from crud import login_identity
+from crud import attendance_summary
+from crud import sessions
+from crud import notification_archive
+import security
+import broadcast_worker
+from etag import ETagMiddleware
 from routers import student as student_router
 from routers import faculty as faculty_router
 from routers import admin as admin_router
@@ -25,6 +34,7 @@ from routers import notifications as notifications_router
 from routers import feedback as feedback_router
 from routers import salaries as salaries_router
 from routers import auth as auth_router
+from routers import events as events_router
 
 logging.basicConfig(
     level=logging.INFO,
@@ -36,6 +46,72 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+
+def reconcile_dashboard_counters():
+    db = SessionLocal()
+    try:
+        refreshed = dashboard_counters.reconcile_all(db)
+        logger.debug(f"Reconciled {refreshed} dashboard counter rows")
+    except Exception as e:
+        logger.error(f"Dashboard counter reconciliation failed: {e}")
+    finally:
+        db.close()
+
+
+def ensure_login_identities():
+    """Build the login identifier index on first start (e.g. after importing SQL/EDU-Track.sql)"""
+    db = SessionLocal()
+    try:
+        if login_identity.is_empty(db):
+            written = login_identity.rebuild(db)
+            logger.info(f"Built login identity index ({written} identifiers)")
+    finally:
+        db.close()
+
+
+def ensure_attendance_summary():
+    """Build the attendance rollup on first start (e.g. after importing SQL/EDU-Track.sql)"""
+    db = SessionLocal()
+    try:
+        if attendance_summary.is_empty(db):
+            written = attendance_summary.rebuild(db)
+            logger.info(f"Built attendance summary ({written} rows)")
+    finally:
+        db.close()
+
+
+def purge_expired_sessions():
+    db = SessionLocal()
+    try:
+        purged = sessions.purge_expired(db)
+        logger.info(f"Purged {purged} expired login sessions")
+    finally:
+        db.close()
+
+
+def archive_read_notifications():
+    db = SessionLocal()
+    try:
+        result = notification_archive.archive_read_notifications(db)
+        logger.info(f"Archived {result['archived']} read notifications in {result['seconds']}s")
+    except Exception as e:
+        logger.error(f"Notification archiving failed: {e}")
+    finally:
+        db.close()
+
+
+async def reconcile_dashboard_counters_periodically():
+    while True:
+        await asyncio.sleep(dashboard_counters.RECONCILE_INTERVAL)
+        await asyncio.to_thread(reconcile_dashboard_counters)
+
+
+async def archive_read_notifications_periodically():
+    while True:
+        await asyncio.sleep(notification_archive.NOTIFICATION_ARCHIVE_INTERVAL)
+        await asyncio.to_thread(archive_read_notifications)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
@@ -43,20 +119,35 @@ async def lifespan(app: FastAPI):
         with engine.connect() as conn:
             conn.execute(text("SELECT 1"))
         logger.info("Database connection successful")
+        ensure_login_identities()
+        ensure_attendance_summary()
+        purge_expired_sessions()
         logger.info("EDU-Track API started successfully")
     except Exception as e:
         logger.error(f"Database connection failed: {e}")
         logger.warning("Server started but database is not accessible")
     
+    security.configure_password_pool()
+    reconciler = asyncio.create_task(reconcile_dashboard_counters_periodically())
+    broadcaster = asyncio.create_task(broadcast_worker.run())
+    archiver = asyncio.create_task(archive_read_notifications_periodically())
+    
     yield
     
-    # Shutdown (if needed in the future)
+    # Shutdown
+    reconciler.cancel()
+    broadcaster.cancel()
+    archiver.cancel()
+    security.shutdown_password_pool()
     logger.info("EDU-Track API shutting down")
 
 app = FastAPI(title="EDU-Track API", version="1.0.0", lifespan=lifespan)
 
 load_dotenv(os.path.join(os.path.dirname(__file__), '.env'))
 
+# Answer If-None-Match on the read routes from the table version counters
+app.add_middleware(ETagMiddleware)
+
 # Add GZip compression middleware for faster response times
 app.add_middleware(GZipMiddleware, minimum_size=1000)
 
@@ -66,6 +157,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Link", "X-Next-Cursor", "X-Total-Count", "ETag"],
 )
 
 
@@ -104,6 +196,7 @@ app.include_router(notifications_router.router)
 app.include_router(feedback_router.router)
 app.include_router(salaries_router.router)
 app.include_router(auth_router.router)
+app.include_router(events_router.router)
 
 
 @app.get("/health")
@@ -81,6 +81,124 @@ def run_migration():
                 print("Adding created_at column to Notifications table...")
                 conn.execute(text("ALTER TABLE Notifications ADD COLUMN created_at DATETIME DEFAULT CURRENT_TIMESTAMP"))
                 conn.commit()
+            
+            # Per-student history is paged newest first
+            indexes = [ix['name'] for ix in inspector.get_indexes('Notifications')]
+            if 'idx_notifications_student_created' not in indexes:
+                print("Adding idx_notifications_student_created index to Notifications table...")
+                conn.execute(text("ALTER TABLE Notifications ADD INDEX idx_notifications_student_created (student_id, created_at)"))
+                conn.commit()
+            
+            # Rows delivered by a broadcast are tagged so an interrupted delivery can resume
+            if 'broadcast_id' not in columns:
+                print("Adding broadcast_id column to Notifications table...")
+                conn.execute(text("ALTER TABLE Notifications ADD COLUMN broadcast_id INT NULL"))
+                conn.commit()
+            
+            if 'idx_notifications_broadcast' not in indexes:
+                print("Adding idx_notifications_broadcast index to Notifications table...")
+                conn.execute(text("ALTER TABLE Notifications ADD INDEX idx_notifications_broadcast (broadcast_id, student_id)"))
+                conn.commit()
+            
+            # Unread counts and the unread/recent lists of a student read this index only
+            if 'idx_notifications_student_read_created' not in indexes:
+                print("Adding idx_notifications_student_read_created index to Notifications table...")
+                conn.execute(text("ALTER TABLE Notifications ADD INDEX idx_notifications_student_read_created (student_id, is_read, created_at)"))
+                conn.commit()
+        
+        # Announcements to a department, semester or everyone are stored once and matched on read
+        if 'NotificationBroadcasts' in inspector.get_table_names():
+            columns = [col['name'] for col in inspector.get_columns('NotificationBroadcasts')]
+            if 'delivery' not in columns:
+                print("Adding delivery column to NotificationBroadcasts table...")
+                conn.execute(text("ALTER TABLE NotificationBroadcasts ADD COLUMN delivery VARCHAR(10) NOT NULL DEFAULT 'write' AFTER target_value"))
+                conn.commit()
+            
+            # Delivery workers claim broadcasts with a lease and retry failed ones
+            if 'attempts' not in columns:
+                print("Adding attempts and locked_until columns to NotificationBroadcasts table...")
+                conn.execute(text("ALTER TABLE NotificationBroadcasts ADD COLUMN attempts INT NOT NULL DEFAULT 0 AFTER last_student_id"))
+                conn.execute(text("ALTER TABLE NotificationBroadcasts ADD COLUMN locked_until DATETIME NULL AFTER attempts"))
+                conn.commit()
+            
+            indexes = [ix['name'] for ix in inspector.get_indexes('NotificationBroadcasts')]
+            if 'idx_notification_broadcasts_audience' not in indexes:
+                print("Adding idx_notification_broadcasts_audience index to NotificationBroadcasts table...")
+                conn.execute(text("ALTER TABLE NotificationBroadcasts ADD INDEX idx_notification_broadcasts_audience (delivery, target, target_value, created_at)"))
+                conn.commit()
+            
+            # Notifications rows without a student were shown to everyone with one shared is_read;
+            # they become stored-once announcements to all students, read per student
+            if 'Notifications' in inspector.get_table_names():
+                print("Addressing Notifications rows without a student...")
+                conn.execute(text("UPDATE Notifications SET student_id = recipient_id WHERE student_id IS NULL AND recipient_id IS NOT NULL"))
+                conn.execute(text("""
+                    INSERT INTO NotificationBroadcasts
+                        (sender_id, title, message, type, target, delivery, status, total_recipients, delivered,
+                         created_at, started_at, finished_at)
+                    SELECT n.sender_id, n.title, n.message, n.type, 'all', 'read', 'completed', s.total, s.total,
+                           n.created_at, n.created_at, n.created_at
+                    FROM Notifications n CROSS JOIN (SELECT COUNT(*) AS total FROM Student) s
+                    WHERE n.student_id IS NULL
+                    ORDER BY n.created_at, n.notification_id
+                """))
+                conn.execute(text("DELETE FROM Notifications WHERE student_id IS NULL"))
+                conn.commit()
+        
+        # Counter refreshes only store their result if no invalidation bumped the generation
+        if 'DashboardCounters' in inspector.get_table_names():
+            columns = [col['name'] for col in inspector.get_columns('DashboardCounters')]
+            if 'generation' not in columns:
+                print("Adding generation column to DashboardCounters table...")
+                conn.execute(text("ALTER TABLE DashboardCounters ADD COLUMN generation INT NOT NULL DEFAULT 0"))
+                conn.commit()
+        
+        # Gradebook upserts rely on a unique key over (student_id, course_id, semester)
+        if 'Marks' in inspector.get_table_names():
+            unique_keys = [uc['name'] for uc in inspector.get_unique_constraints('Marks')]
+            unique_keys += [ix['name'] for ix in inspector.get_indexes('Marks') if ix.get('unique')]
+            
+            if 'unique_student_course_marks' not in unique_keys:
+                # Repeated saves used to insert a second row; keep the latest of each
+                print("Removing duplicate Marks rows...")
+                conn.execute(text("""
+                    DELETE older FROM Marks older
+                    JOIN Marks newer
+                      ON newer.student_id = older.student_id
+                     AND newer.course_id = older.course_id
+                     AND newer.semester = older.semester
+                     AND newer.mark_id > older.mark_id
+                """))
+                print("Adding unique_student_course_marks key to Marks table...")
+                conn.execute(text("ALTER TABLE Marks ADD UNIQUE KEY unique_student_course_marks (student_id, course_id, semester)"))
+                conn.commit()
+        
+        # Bulk attendance upserts rely on a unique key over (student_id, course_id, date)
+        if 'Attendance' in inspector.get_table_names():
+            unique_keys = [uc['name'] for uc in inspector.get_unique_constraints('Attendance')]
+            unique_keys += [ix['name'] for ix in inspector.get_indexes('Attendance') if ix.get('unique')]
+            
+            if 'unique_student_course_date' not in unique_keys:
+                # Resubmitted sessions used to insert a second row; keep the latest of each
+                print("Removing duplicate Attendance rows...")
+                conn.execute(text("""
+                    DELETE older FROM Attendance older
+                    JOIN Attendance newer
+                      ON newer.student_id = older.student_id
+                     AND newer.course_id = older.course_id
+                     AND newer.date = older.date
+                     AND newer.attendance_id > older.attendance_id
+                """))
+                print("Adding unique_student_course_date key to Attendance table...")
+                conn.execute(text("ALTER TABLE Attendance ADD UNIQUE KEY unique_student_course_date (student_id, course_id, date)"))
+                conn.commit()
+            
+            # Course attendance over a date range (GET /attendance/?course_id=&from=&to=)
+            attendance_indexes = [ix['name'] for ix in inspector.get_indexes('Attendance')]
+            if 'idx_attendance_course_date' not in attendance_indexes:
+                print("Adding idx_attendance_course_date index to Attendance table...")
+                conn.execute(text("ALTER TABLE Attendance ADD INDEX idx_attendance_course_date (course_id, date)"))
+                conn.commit()
         
         print("\nMigration completed successfully!")
         print("\nIMPORTANT: Please update all user passwords!")
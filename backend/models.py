@@ -1,6 +1,6 @@
 from sqlalchemy import (
     Column, Integer, String, Date, DateTime,
-    DECIMAL, ForeignKey, Boolean
+    DECIMAL, ForeignKey, Boolean, UniqueConstraint, Text, Index, BigInteger
 )
 from sqlalchemy.orm import relationship
 from database import Base
@@ -128,6 +128,80 @@ class Attendance(Base):
     student = relationship("Student", back_populates="attendance")
     course = relationship("Course", back_populates="attendance")
 
+    __table_args__ = (
+        # Also the index for a student's attendance in a course over a date range
+        UniqueConstraint("student_id", "course_id", "date", name="unique_student_course_date"),
+        Index("idx_attendance_course_date", "course_id", "date"),
+    )
+
+
+class AttendanceArchive(Base):
+    __tablename__ = "AttendanceArchive"
+
+    # Attendance of semesters the student has moved past, moved out by rollover_semester.py
+    attendance_id = Column(Integer, primary_key=True, autoincrement=False)
+    student_id = Column(Integer, nullable=False)
+    course_id = Column(Integer, nullable=False)
+    date = Column(Date, nullable=False)
+    status = Column(String(10), nullable=False)
+    semester = Column(Integer, nullable=False)  # enrollment semester the row belonged to
+    archived_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("idx_attendance_archive_student_course_date", "student_id", "course_id", "date"),
+        Index("idx_attendance_archive_course_date", "course_id", "date"),
+    )
+
+
+class AttendanceSummary(Base):
+    __tablename__ = "AttendanceSummary"
+
+    # Per-student, per-course attendance counts, kept in step with Attendance by
+    # crud/attendance_summary.py; semester is the enrollment's (0 when not enrolled)
+    student_id = Column(Integer, primary_key=True, autoincrement=False)
+    course_id = Column(Integer, primary_key=True, autoincrement=False)
+    semester = Column(Integer, primary_key=True, autoincrement=False, default=0)
+    present_count = Column(Integer, nullable=False, default=0)
+    absent_count = Column(Integer, nullable=False, default=0)
+    late_count = Column(Integer, nullable=False, default=0)
+    total_count = Column(Integer, nullable=False, default=0)  # every status, including the three above
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("idx_attendance_summary_course", "course_id", "semester"),
+    )
+
+
+class AttendanceCourseSummary(Base):
+    __tablename__ = "AttendanceCourseSummary"
+
+    # AttendanceSummary rolled up per course and semester
+    course_id = Column(Integer, primary_key=True, autoincrement=False)
+    semester = Column(Integer, primary_key=True, autoincrement=False, default=0)
+    present_count = Column(Integer, nullable=False, default=0)
+    absent_count = Column(Integer, nullable=False, default=0)
+    late_count = Column(Integer, nullable=False, default=0)
+    total_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+
+class AttendanceDepartmentSummary(Base):
+    __tablename__ = "AttendanceDepartmentSummary"
+
+    # AttendanceSummary rolled up per student department, course and semester
+    department = Column(String(50), primary_key=True)
+    course_id = Column(Integer, primary_key=True, autoincrement=False)
+    semester = Column(Integer, primary_key=True, autoincrement=False, default=0)
+    present_count = Column(Integer, nullable=False, default=0)
+    absent_count = Column(Integer, nullable=False, default=0)
+    late_count = Column(Integer, nullable=False, default=0)
+    total_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("idx_attendance_department_summary_course", "course_id", "semester"),
+    )
+
 
 # -----------------------------------------------------------
 # GRADES
@@ -179,6 +253,80 @@ class Notifications(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     is_read = Column(Boolean, default=False)
     type = Column(String(20))
+    broadcast_id = Column(Integer, nullable=True)  # set on rows delivered by a NotificationBroadcast
+
+    __table_args__ = (
+        Index("idx_notifications_student_created", "student_id", "created_at"),
+        Index("idx_notifications_student_read_created", "student_id", "is_read", "created_at"),
+        Index("idx_notifications_broadcast", "broadcast_id", "student_id"),
+    )
+
+
+class NotificationArchive(Base):
+    __tablename__ = "NotificationsArchive"
+
+    # Read notifications moved out of Notifications once past the retention age
+    notification_id = Column(Integer, primary_key=True, autoincrement=False)
+    sender_id = Column(Integer)
+    recipient_id = Column(Integer)
+    student_id = Column(Integer)
+    title = Column(String(255), nullable=False, default="Notification")
+    message = Column(String(500), nullable=False)
+    date_sent = Column(DateTime)
+    created_at = Column(DateTime)
+    is_read = Column(Boolean, default=True)
+    type = Column(String(20))
+    broadcast_id = Column(Integer, nullable=True)
+    archived_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("idx_notifications_archive_student_created", "student_id", "created_at"),
+    )
+
+
+class NotificationBroadcast(Base):
+    __tablename__ = "NotificationBroadcasts"
+
+    broadcast_id = Column(Integer, primary_key=True, index=True)
+    sender_id = Column(Integer)  # Admin or Faculty
+    title = Column(String(255), nullable=False, default="Notification")
+    message = Column(String(500), nullable=False)
+    type = Column(String(20))
+    target = Column(String(20), nullable=False)  # course, department, semester or all
+    target_value = Column(String(100))  # course id, department name or semester number
+    delivery = Column(String(10), nullable=False, default="write")  # write: a Notifications row per student; read: stored once
+    status = Column(String(20), nullable=False, default="queued")  # queued, running, completed, failed
+    total_recipients = Column(Integer, nullable=False, default=0)
+    delivered = Column(Integer, nullable=False, default=0)
+    last_student_id = Column(Integer, nullable=False, default=0)  # delivery cursor, for resuming
+    attempts = Column(Integer, nullable=False, default=0)  # failed delivery attempts
+    locked_until = Column(DateTime)  # not claimable before: a worker's lease, or the retry delay
+    error = Column(String(500))
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+
+    __table_args__ = (
+        Index("idx_notification_broadcasts_status", "status"),
+        Index("idx_notification_broadcasts_audience", "delivery", "target", "target_value", "created_at"),
+    )
+
+
+class NotificationReadMarker(Base):
+    __tablename__ = "NotificationReadMarkers"
+
+    student_id = Column(Integer, primary_key=True)
+    read_through = Column(Integer, nullable=False, default=0)  # announcements with broadcast_id <= this are read
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class NotificationRead(Base):
+    __tablename__ = "NotificationReads"
+
+    # Announcements read one at a time past the student's read marker
+    student_id = Column(Integer, primary_key=True)
+    broadcast_id = Column(Integer, primary_key=True)
+    read_at = Column(DateTime, default=datetime.utcnow)
 
 
 # -----------------------------------------------------------
@@ -219,6 +367,9 @@ class Salary(Base):
 # -----------------------------------------------------------
 class Marks(Base):
     __tablename__ = "Marks"
+    __table_args__ = (
+        UniqueConstraint("student_id", "course_id", "semester", name="unique_student_course_marks"),
+    )
 
     mark_id = Column(Integer, primary_key=True, index=True)
     student_id = Column(Integer, ForeignKey("Student.student_id"), nullable=False)
@@ -255,3 +406,91 @@ class Marks(Base):
     # Relationships
     student = relationship("Student", back_populates="marks")
     course = relationship("Course", back_populates="marks")
+
+
+# -----------------------------------------------------------
+# DASHBOARD COUNTERS (Materialized dashboard statistics)
+# -----------------------------------------------------------
+class DashboardCounters(Base):
+    __tablename__ = "DashboardCounters"
+
+    scope = Column(String(20), primary_key=True)  # admin, faculty or student
+    scope_id = Column(Integer, primary_key=True, default=0)  # faculty/student id, 0 for admin
+    payload = Column(Text, nullable=False)  # JSON-encoded dashboard stats
+    refreshed_at = Column(DateTime, default=datetime.utcnow)  # NULL: invalidated, recomputed on the next read
+    generation = Column(Integer, nullable=False, default=0)  # bumped by every invalidation
+
+
+class MarksArchive(Base):
+    __tablename__ = "MarksArchive"
+    __table_args__ = (
+        Index("idx_marks_archive_student_course", "student_id", "course_id", "semester"),
+        Index("idx_marks_archive_course_semester", "course_id", "semester"),
+    )
+
+    # Marks of semesters the student has moved past, moved out by rollover_semester.py
+    mark_id = Column(Integer, primary_key=True, autoincrement=False)
+    student_id = Column(Integer, nullable=False)
+    course_id = Column(Integer, nullable=False)
+    semester = Column(Integer)
+    quiz1 = Column(DECIMAL(5, 2))
+    quiz2 = Column(DECIMAL(5, 2))
+    quiz3 = Column(DECIMAL(5, 2))
+    quiz_total = Column(DECIMAL(5, 2))
+    assignment1 = Column(DECIMAL(5, 2))
+    assignment2 = Column(DECIMAL(5, 2))
+    assignment3 = Column(DECIMAL(5, 2))
+    assignment_total = Column(DECIMAL(5, 2))
+    midterm1 = Column(DECIMAL(5, 2))
+    midterm2 = Column(DECIMAL(5, 2))
+    final_exam = Column(DECIMAL(5, 2))
+    total_marks = Column(DECIMAL(5, 2))
+    grade_letter = Column(String(2))
+    created_at = Column(DateTime)
+    updated_at = Column(DateTime)
+    archived_at = Column(DateTime, default=datetime.utcnow)
+
+
+# -----------------------------------------------------------
+# LOGIN IDENTITY (Identifier index for login)
+# -----------------------------------------------------------
+class LoginIdentity(Base):
+    __tablename__ = "LoginIdentity"
+    __table_args__ = (
+        Index("idx_login_identity_lookup", "identifier", "priority", "user_id"),
+        Index("idx_login_identity_user", "role", "user_id"),
+    )
+
+    login_identity_id = Column(Integer, primary_key=True, index=True)
+    identifier = Column(String(100), nullable=False)  # email, username, contact or name
+    kind = Column(String(20), nullable=False)
+    role = Column(String(20), nullable=False)  # student, faculty or admin (which table user_id is in)
+    user_id = Column(Integer, nullable=False)
+    priority = Column(Integer, nullable=False)  # lower wins when an identifier matches several accounts
+
+
+# -----------------------------------------------------------
+# USER SESSIONS (Signed login sessions)
+# -----------------------------------------------------------
+class UserSession(Base):
+    __tablename__ = "UserSessions"
+    __table_args__ = (
+        Index("idx_user_sessions_user", "role", "user_id"),
+    )
+
+    session_id = Column(String(64), primary_key=True)  # random id, signed in the token
+    role = Column(String(20), nullable=False)  # student, faculty or admin
+    user_id = Column(Integer, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False)
+    revoked = Column(Boolean, default=False)
+
+
+# -----------------------------------------------------------
+# TABLE VERSIONS (Change counters for conditional GETs)
+# -----------------------------------------------------------
+class TableVersion(Base):
+    __tablename__ = "TableVersions"
+
+    table_name = Column(String(50), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)  # bumped by every committed write to the table
@@ -0,0 +1,176 @@
+"""
+Keyset pagination for list endpoints.
+
+List routes take `limit`, `cursor` and `include_total` query parameters and still return a
+plain JSON list. A request with none of them gets the whole list, as before pagination, so
+pages that fetch full lists keep working; clients opt in to paging by passing `limit`. The cursor for the next page is sent in the `X-Next-Cursor` header and as a
+`Link: <...>; rel="next"` URL; `X-Total-Count` is only computed when include_total=true.
+
+A cursor is the sort key of the last row of a page (e.g. its primary key), so the next page
+is an index range scan starting right after it and costs the same at page 1 and page 10 000,
+unlike OFFSET which reads and discards every skipped row.
+"""
+import base64
+import json
+import os
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Optional
+from fastapi import HTTPException, Query, Request, Response
+from sqlalchemy import and_, or_
+
+# Page size when paging without `limit` (cursor or include_total only), and the largest page a client may ask for
+DEFAULT_PAGE_SIZE = int(os.getenv("LIST_PAGE_SIZE", "500"))
+MAX_PAGE_SIZE = int(os.getenv("LIST_MAX_PAGE_SIZE", "1000"))
+
+
+class PageParams:
+    def __init__(self, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None, include_total: bool = False):
+        self.limit = min(limit, MAX_PAGE_SIZE)
+        self.cursor = cursor
+        self.include_total = include_total
+
+
+class Page:
+    def __init__(self, items: list, next_cursor: Optional[str] = None, total: Optional[int] = None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.total = total
+
+
+def page_params(
+    limit: Optional[int] = Query(None, ge=1, description=f"Page size (at most {MAX_PAGE_SIZE}); omit for the whole list"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor of the previous page"),
+    include_total: bool = Query(False, description="Also return X-Total-Count (costs a COUNT query)")
+) -> Optional[PageParams]:
+    """FastAPI dependency for the pagination query parameters (None: unpaged)"""
+    if limit is None and cursor is None and not include_total:
+        return None
+    return PageParams(limit or DEFAULT_PAGE_SIZE, cursor, include_total)
+
+
+# -----------------------------------------------------------
+# CURSORS
+# -----------------------------------------------------------
+def _to_json(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _from_json(column, value):
+    if value is None:
+        return None
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    return python_type(value)
+
+
+def encode_cursor(values) -> str:
+    raw = json.dumps([_to_json(v) for v in values], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str, columns) -> list:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError("cursor does not match the sort key")
+        return [_from_json(column, value) for column, value in zip(columns, values)]
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+# -----------------------------------------------------------
+# QUERIES
+# -----------------------------------------------------------
+def keyset_filter(columns, values, descending: bool = False):
+    """Rows strictly after `values` in (columns) order.
+
+    Written as `a >= x AND (a > x OR (a = x AND b > y))` rather than a row comparison so
+    MySQL can use the leading column as an index range.
+    """
+    def after(column, value):
+        return column < value if descending else column > value
+
+    def at_or_after(column, value):
+        return column <= value if descending else column >= value
+
+    condition = after(columns[-1], values[-1])
+    for column, value in zip(reversed(columns[:-1]), reversed(values[:-1])):
+        condition = or_(after(column, value), and_(column == value, condition))
+    if len(columns) > 1:
+        condition = and_(at_or_after(columns[0], values[0]), condition)
+    return condition
+
+
+def paginate(query, page: Optional[PageParams], columns, descending: bool = False, key=None) -> Page:
+    """Run `query` one page at a time, ordered by `columns` (ending in a unique column).
+
+    `key(item)` returns an item's sort values; by default they are read as attributes named
+    after the columns. With page=None every row is returned in the same order.
+    """
+    order = [column.desc() if descending else column for column in columns]
+    if page is None:
+        return Page(query.order_by(*order).all())
+
+    total = query.order_by(None).count() if page.include_total else None
+    if page.cursor:
+        query = query.filter(keyset_filter(columns, decode_cursor(page.cursor, columns), descending))
+
+    items = query.order_by(*order).limit(page.limit + 1).all()
+    next_cursor = None
+    if len(items) > page.limit:
+        items = items[:page.limit]
+        last = items[-1]
+        values = key(last) if key else [getattr(last, column.key) for column in columns]
+        next_cursor = encode_cursor(values)
+    return Page(items, next_cursor, total)
+
+
+def page_ids(query, page: Optional[PageParams], column, descending: bool = False):
+    """Restrict `query` to one page of `column` values; for queries whose joins repeat rows.
+
+    Returns (query, next_cursor, total). The page is taken from a derived table so LIMIT
+    applies to distinct ids rather than to joined rows.
+    """
+    if page is None:
+        return query, None, None
+
+    ids = query.with_entities(column).distinct()
+    total = ids.order_by(None).count() if page.include_total else None
+    if page.cursor:
+        ids = ids.filter(keyset_filter([column], decode_cursor(page.cursor, [column]), descending))
+    window = [row[0] for row in ids.order_by(column.desc() if descending else column).limit(page.limit + 1)]
+
+    next_cursor = None
+    if len(window) > page.limit:
+        window = window[:page.limit]
+        next_cursor = encode_cursor([window[-1]])
+    return query.filter(column.in_(window)), next_cursor, total
+
+
+# -----------------------------------------------------------
+# RESPONSES
+# -----------------------------------------------------------
+def page_headers(request: Request, page: Page) -> dict:
+    headers = {}
+    if page.next_cursor:
+        next_url = request.url.include_query_params(cursor=page.next_cursor)
+        headers["Link"] = f'<{next_url}>; rel="next"'
+        headers["X-Next-Cursor"] = page.next_cursor
+    if page.total is not None:
+        headers["X-Total-Count"] = str(page.total)
+    return headers
+
+
+def paged_response(request: Request, response: Response, page: Page) -> list:
+    """Set the pagination headers and return the page's items as the response body"""
+    response.headers.update(page_headers(request, page))
+    return page.items
@@ -0,0 +1,56 @@
+"""
+Semester Rollover Script for EDU Track
+Moves Attendance and Marks rows of semesters students have moved past into
+AttendanceArchive and MarksArchive (see crud/semester_archive.py).
+Run after promoting students to their next semester.
+
+Usage:
+    python rollover_semester.py [--dry-run] [--batch-size 1000] [--pause 0.2]
+"""
+
+import argparse
+from sqlalchemy import inspect
+from database import engine, SessionLocal, Base
+from models import AttendanceArchive, MarksArchive
+from crud import semester_archive
+
+def run_rollover(dry_run: bool = False, batch_size: int | None = None, pause: float | None = None):
+    inspector = inspect(engine)
+    print("Starting semester rollover...")
+
+    # Archive tables of databases created before the split
+    archives = [AttendanceArchive.__table__, MarksArchive.__table__]
+    missing = [table for table in archives if table.name not in inspector.get_table_names()]
+    for table in missing:
+        print(f"Creating {table.name} table...")
+    if missing:
+        Base.metadata.create_all(bind=engine, tables=missing)
+
+    db = SessionLocal()
+    try:
+        if dry_run:
+            for table, count in semester_archive.count_past_rows(db).items():
+                print(f"{table}: {count} rows of past semesters would be archived")
+            print("\nDry run: nothing was moved.")
+            return
+
+        for table, stats in semester_archive.rollover(db, batch_size, pause).items():
+            print(f"Archived {stats['archived']} {table} rows "
+                  f"({stats['examined']} examined, {stats['chunks']} chunks, {stats['seconds']}s)")
+    finally:
+        db.close()
+
+    print("\nRollover completed successfully!")
+    print("Archived rows stay readable with ?archived=true on the attendance and marks lists.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="Only count the rows that would move")
+    parser.add_argument("--batch-size", type=int, default=semester_archive.SEMESTER_ARCHIVE_BATCH)
+    parser.add_argument("--pause", type=float, default=semester_archive.SEMESTER_ARCHIVE_PAUSE)
+    args = parser.parse_args()
+    try:
+        run_rollover(args.dry_run, args.batch_size, args.pause)
+    except Exception as e:
+        print(f"\nERROR during rollover: {e}")
+        print("Please check your database connection and try again.")
@@ -1,22 +1,70 @@
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
 from database import get_db
 from crud import attendence as attendance_crud
-from schemas import AttendanceCreate, AttendanceResponse
+from crud import attendance_summary
+from schemas import (
+    AttendanceCreate, AttendanceResponse, AttendanceBulk,
+    StudentCourseAttendance, CourseAttendanceSummary, DepartmentAttendanceSummary
+)
+from pagination import PageParams, page_params
+import export
+import fast_json
 router = APIRouter(prefix="/attendance", tags=["Attendance"])
 
 @router.post("/", response_model=AttendanceResponse)
 def create_attendance(data: AttendanceCreate, db: Session = Depends(get_db)):
     return attendance_crud.create_attendance(db, data)
 
+@router.post("/bulk", response_model=list[AttendanceResponse])
+def save_session_attendance(data: AttendanceBulk, db: Session = Depends(get_db)):
+    """Upsert a class session's attendance (course, date, status per student) in one transaction"""
+    return attendance_crud.upsert_session_attendance(db, data)
+
 @router.get("/", response_model=list[AttendanceResponse])
-def list_attendance(db: Session = Depends(get_db)):
-    return attendance_crud.get_attendances(db)
+def list_attendance(request: Request, page: PageParams = Depends(page_params), db: Session = Depends(get_db),
+                    student_id: int | None = None, course_id: int | None = None,
+                    from_date: date | None = Query(None, alias="from", description="First date (inclusive)"),
+                    to_date: date | None = Query(None, alias="to", description="Last date (inclusive)"),
+                    status: str | None = None, archived: bool = False,
+                    format: str | None = Query(None, pattern="^(ndjson|csv)$")):
+    """List attendance a page at a time, or stream all of it with ?format=ndjson|csv.
+
+    With course_id, pages run in date order (see attendance_crud.attendance_order);
+    ?archived=true reads the semesters moved out by the rollover.
+    """
+    query = attendance_crud.attendance_query(db, student_id, course_id, from_date, to_date, status, archived)
+    if format:
+        model = attendance_crud.attendance_model(archived)
+        return export.stream_export(query, AttendanceResponse, format, "attendance", model.attendance_id)
+    # Serialized from column tuples; conformance with AttendanceResponse is checked by scripts/test_fast_json.py
+    return fast_json.page_response(request, query, AttendanceResponse, page,
+                                   attendance_crud.attendance_order(course_id, archived))
 
 @router.get("/student/{student_id}", response_model=list[AttendanceResponse])
-def get_student_attendance(student_id: int, db: Session = Depends(get_db)):
-    """Get attendance records for a student's enrolled courses only"""
-    return attendance_crud.get_student_attendance(db, student_id)
+def get_student_attendance(student_id: int, include_archived: bool = False, db: Session = Depends(get_db)):
+    """Get attendance records for a student's enrolled courses only (plus past semesters if asked)"""
+    return attendance_crud.get_student_attendance(db, student_id, include_archived)
+
+@router.get("/summary/student/{student_id}", response_model=list[StudentCourseAttendance])
+def get_student_attendance_summary(student_id: int, semester: int | None = None, db: Session = Depends(get_db)):
+    """A student's attendance percentage per course, from the rollup"""
+    return attendance_summary.get_student_summary(db, student_id, semester)
+
+@router.get("/summary/course/{course_id}", response_model=CourseAttendanceSummary)
+def get_course_attendance_summary(course_id: int, semester: int | None = None, include_students: bool = True,
+                                  db: Session = Depends(get_db)):
+    """A course's attendance percentage and each enrolled student's, from the rollup.
+
+    With include_students=false only the course figures are read (one rollup row per semester).
+    """
+    return attendance_summary.get_course_summary(db, course_id, semester, include_students)
+
+@router.get("/summary/department/{department}", response_model=DepartmentAttendanceSummary)
+def get_department_attendance_summary(department: str, semester: int | None = None, db: Session = Depends(get_db)):
+    """A department's attendance percentage and each course's, from the rollup"""
+    return attendance_summary.get_department_summary(db, department, semester)
 
 @router.get("/{attendance_id}", response_model=AttendanceResponse)
 def get_attendance(attendance_id: int, db: Session = Depends(get_db)):
@@ -1,66 +1,72 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
 from database import get_db
 from models import Student, Faculty, Admin
-from security import verify_password
+from crud import login_identity
+from crud import sessions
+from security import verify_password_async, get_current_session
 
 router = APIRouter(prefix="/auth", tags=["Auth"])
 
 
+def find_login_user(db: Session, identifier: str):
+    """Return (user, profile) for the account a login identifier resolves to"""
+    match = login_identity.resolve(db, identifier)
+    if not match:
+        return None, None
+    role, user_id = match
+
+    if role == login_identity.STUDENT:
+        user = db.query(Student).filter(Student.student_id == user_id).first()
+        return user, user and {
+            "role": user.role,
+            "id": user.student_id,
+            "name": user.full_name,
+            "email": user.email
+        }
+
+    if role == login_identity.FACULTY:
+        faculty = db.query(Faculty).filter(Faculty.faculty_id == user_id).first()
+        return faculty, faculty and {
+            "role": faculty.role,
+            "id": faculty.faculty_id,
+            "name": faculty.name,
+            "email": faculty.email
+        }
+
+    admin = db.query(Admin).filter(Admin.admin_id == user_id).first()
+    return admin, admin and {
+        "role": admin.role,
+        "id": admin.admin_id,
+        "name": admin.name,
+        "email": admin.email
+    }
+
+
 @router.post("/login")
-def login(payload: dict, db: Session = Depends(get_db)):
+async def login(payload: dict, db: Session = Depends(get_db)):
     identifier = (payload.get('email') or payload.get('username') or '').strip()
     password = (payload.get('password') or '').strip()
     if not identifier or not password:
         raise HTTPException(status_code=400, detail="Email/username and password required")
 
-    user = db.query(Student).filter(
-        or_(Student.email == identifier,
-            Student.username == identifier,
-            Student.contact == identifier,
-            Student.full_name == identifier)
-    ).first()
-    if user:
-        if verify_password(password, user.password):
-            return {
-                "role": user.role,
-                "id": user.student_id,
-                "name": user.full_name,
-                "email": user.email
-            }
-        else:
-            raise HTTPException(status_code=401, detail="Invalid credentials")
+    # Database lookups stay on the threadpool; bcrypt runs on the password worker pool
+    user, profile = await run_in_threadpool(find_login_user, db, identifier)
+    if user and await verify_password_async(password, user.password):
+        profile["token"] = await run_in_threadpool(sessions.create_session, db, profile["role"], profile["id"])
+        return profile
 
-    faculty = db.query(Faculty).filter(
-        or_(Faculty.email == identifier,
-            Faculty.contact == identifier,
-            Faculty.name == identifier)
-    ).first()
-    if faculty:
-        if verify_password(password, faculty.password):
-            return {
-                "role": faculty.role,
-                "id": faculty.faculty_id,
-                "name": faculty.name,
-                "email": faculty.email
-            }
-        else:
-            raise HTTPException(status_code=401, detail="Invalid credentials")
+    raise HTTPException(status_code=401, detail="Invalid credentials")
 
-    admin = db.query(Admin).filter(
-        or_(Admin.email == identifier,
-            Admin.name == identifier)
-    ).first()
-    if admin:
-        if verify_password(password, admin.password):
-            return {
-                "role": admin.role,
-                "id": admin.admin_id,
-                "name": admin.name,
-                "email": admin.email
-            }
-        else:
-            raise HTTPException(status_code=401, detail="Invalid credentials")
 
-    raise HTTPException(status_code=401, detail="Invalid credentials")
+@router.get("/session")
+async def current_session(session: dict = Depends(get_current_session)):
+    """Return the role and user id behind the caller's token"""
+    return {"role": session["role"], "id": session["user_id"]}
+
+
+@router.post("/logout")
+def logout(session: dict = Depends(get_current_session), db: Session = Depends(get_db)):
+    sessions.revoke_session(db, session["session_id"])
+    return {"detail": "Logged out"}
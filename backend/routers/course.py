@@ -1,10 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
 from database import get_db
 from crud import course as course_crud
-from schemas import CourseCreate, CourseResponse
+from schemas import CourseCreate, CourseResponse, RosterEntry
 from typing import Optional
 from pydantic import BaseModel
+from pagination import PageParams, page_params
+from models import Course
+import fast_json
 
 router = APIRouter(prefix="/courses", tags=["Courses"])
 
@@ -16,9 +20,11 @@ def create_course(data: CourseCreate, db: Session = Depends(get_db)):
     return course_crud.create_course(db, data)
 
 @router.get("/", response_model=list[CourseResponse])
-def list_courses(status: Optional[str] = None, db: Session = Depends(get_db)):
+def list_courses(request: Request, page: PageParams = Depends(page_params), db: Session = Depends(get_db),
+                 status: Optional[str] = None, faculty_id: Optional[int] = None, fields: list | None = Depends(fast_json.fields_param)):
     """Get all courses, optionally filtered by status (Pending, Active, Rejected)"""
-    return course_crud.get_courses(db, status)
+    query = course_crud.course_query(db, status, faculty_id)
+    return fast_json.page_response(request, query, CourseResponse, page, [Course.course_id], fields)
 
 @router.get("/student/{student_id}", response_model=list[CourseResponse])
 def get_student_courses(student_id: int, db: Session = Depends(get_db)):
@@ -32,6 +38,26 @@ def get_course(course_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Course not found")
     return c
 
+@router.get("/{course_id}/roster", response_model=list[RosterEntry])
+def get_course_roster(course_id: int, db: Session = Depends(get_db),
+                      include: Optional[str] = Query(None, description="Comma-separated extras: attendance, marks"),
+                      attendance_date: Optional[date] = Query(None, alias="date", description="Attendance day (default today)"),
+                      status: Optional[str] = Query("Active", description="Enrollment status; empty for all")):
+    """Students enrolled in a course, optionally with a day's attendance and their marks"""
+    extras = {name.strip() for name in include.split(",") if name.strip()} if include else set()
+    unknown = sorted(extras - {"attendance", "marks"})
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown include: {', '.join(unknown)}. Available: attendance, marks")
+    if "attendance" in extras and attendance_date is None:
+        attendance_date = date.today()
+    fields, rows = course_crud.get_course_roster(
+        db, course_id,
+        attendance_date if "attendance" in extras else None,
+        "marks" in extras,
+        status or None
+    )
+    return Response(content=fast_json.dumps_rows(fields, rows), media_type="application/json")
+
 @router.put("/{course_id}", response_model=CourseResponse)
 def update_course(course_id: int, data: CourseCreate, db: Session = Depends(get_db)):
     return course_crud.update_course(db, course_id, data)
@@ -1,8 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.orm import Session
 from database import get_db
 from crud import enrollment as enrollment_crud
 from schemas import EnrollmentCreate, EnrollmentResponse
+from pagination import PageParams, page_params
+from models import Enrollment
+import fast_json
 
 router = APIRouter(prefix="/enrollments", tags=["Enrollments"])
 
@@ -11,8 +14,10 @@ def create_enrollment(data: EnrollmentCreate, db: Session = Depends(get_db)):
     return enrollment_crud.create_enrollment(db, data)
 
 @router.get("/", response_model=list[EnrollmentResponse])
-def list_enrollments(db: Session = Depends(get_db)):
-    return enrollment_crud.get_enrollments(db)
+def list_enrollments(request: Request, page: PageParams = Depends(page_params), db: Session = Depends(get_db),
+                     student_id: int | None = None, course_id: int | None = None, fields: list | None = Depends(fast_json.fields_param)):
+    query = enrollment_crud.enrollment_query(db, student_id, course_id)
+    return fast_json.page_response(request, query, EnrollmentResponse, page, [Enrollment.enrollment_id], fields)
 
 @router.get("/{enrollment_id}", response_model=EnrollmentResponse)
 def get_enrollment(enrollment_id: int, db: Session = Depends(get_db)):
@@ -0,0 +1,41 @@
+from typing import Optional
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from security import get_current_session, session_from_token
+from events import bus, ENTITIES
+
+router = APIRouter(prefix="/events", tags=["Events"])
+
+
+@router.get("/")
+async def stream_events(
+    entities: Optional[str] = Query(None, description="Comma-separated entities to receive, e.g. entities=fee,salary"),
+    user: Optional[str] = Query(None, description="Only changes to rows of this user, e.g. user=student:5 (admins only)"),
+    token: Optional[str] = Query(None, description="Session token, for EventSource clients that cannot send headers"),
+    last_event_id: Optional[int] = Header(None),
+    authorization: Optional[str] = Header(None)
+):
+    """Server-sent change events for the signed-in user"""
+    session = await session_from_token(token) if token else await get_current_session(authorization)
+
+    own = f"{session['role']}:{session['user_id']}"
+    if session["role"] != "admin":
+        if user and user != own:
+            raise HTTPException(status_code=403, detail="Admin privileges required to follow other users")
+        user = own
+
+    selected = None
+    if entities:
+        selected = {name.strip().lower() for name in entities.split(",") if name.strip()}
+        unknown = sorted(selected - ENTITIES)
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown entities: {', '.join(unknown)}. Available: {', '.join(sorted(ENTITIES))}"
+            )
+
+    return StreamingResponse(
+        bus.stream(selected, user, last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,20 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from sqlalchemy import func
 from database import get_db
 from crud import faculty as faculty_crud
-from schemas import FacultyCreate, FacultyResponse
-from models import Course, Feedback, Enrollment
+from crud import dashboard_counters
+from schemas import FacultyCreate, FacultyUpdate, FacultyResponse
+from models import Course, Faculty
+from pagination import PageParams, page_params
+from security import hash_password_async
+import fast_json
 
 router = APIRouter(prefix="/faculties", tags=["Faculty"])
 
 @router.post("/", response_model=FacultyResponse)
-def create_faculty(data: FacultyCreate, db: Session = Depends(get_db)):
-    return faculty_crud.create_faculty(db, data)
+async def create_faculty(data: FacultyCreate, db: Session = Depends(get_db)):
+    data.password = await hash_password_async(data.password)
+    return await run_in_threadpool(faculty_crud.create_faculty, db, data)
 
 @router.get("/", response_model=list[FacultyResponse])
-def list_faculties(db: Session = Depends(get_db)):
-    return faculty_crud.get_faculties(db)
+def list_faculties(request: Request, page: PageParams = Depends(page_params), db: Session = Depends(get_db),
+                   department: str | None = None, fields: list | None = Depends(fast_json.fields_param)):
+    query = faculty_crud.faculty_query(db, department)
+    return fast_json.page_response(request, query, FacultyResponse, page, [Faculty.faculty_id], fields)
 
 @router.get("/{faculty_id}", response_model=FacultyResponse)
 def get_faculty(faculty_id: int, db: Session = Depends(get_db)):
@@ -24,8 +31,10 @@ def get_faculty(faculty_id: int, db: Session = Depends(get_db)):
     return f
 
 @router.put("/{faculty_id}", response_model=FacultyResponse)
-def update_faculty(faculty_id: int, data: FacultyCreate, db: Session = Depends(get_db)):
-    return faculty_crud.update_faculty(db, faculty_id, data)
+async def update_faculty(faculty_id: int, data: FacultyUpdate, db: Session = Depends(get_db)):
+    if data.password:
+        data.password = await hash_password_async(data.password)
+    return await run_in_threadpool(faculty_crud.update_faculty, db, faculty_id, data)
 
 @router.delete("/{faculty_id}")
 def delete_faculty(faculty_id: int, db: Session = Depends(get_db)):
@@ -34,27 +43,8 @@ def delete_faculty(faculty_id: int, db: Session = Depends(get_db)):
 
 @router.get("/{faculty_id}/dashboard/stats")
 def get_faculty_dashboard_stats(faculty_id: int, db: Session = Depends(get_db)):
-    """Return faculty dashboard statistics"""
-    total_courses = db.query(func.count(Course.course_id)).filter(
-        Course.faculty_id == faculty_id
-    ).scalar() or 0
-    
-    course_ids = [c.course_id for c in db.query(Course.course_id).filter(Course.faculty_id == faculty_id).all()]
-    
-    total_students = db.query(func.count(Enrollment.enrollment_id.distinct())).filter(
-        Enrollment.course_id.in_(course_ids),
-        Enrollment.status == "Active"
-    ).scalar() or 0 if course_ids else 0
-    
-    pending_feedback = db.query(func.count(Feedback.feedback_id)).filter(
-        Feedback.faculty_id == faculty_id
-    ).scalar() or 0
-    
-    return {
-        "total_courses": total_courses,
-        "total_students": total_students,
-        "pending_feedback": pending_feedback
-    }
+    """Return faculty dashboard statistics (materialized, see crud.dashboard_counters)"""
+    return dashboard_counters.get_faculty_stats(db, faculty_id)
 
 
 @router.get("/{faculty_id}/courses", response_model=list)
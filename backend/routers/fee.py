@@ -1,8 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
 from database import get_db
 from crud import fee as fee_crud
 from schemas import FeeCreate, FeeResponse
+from pagination import PageParams, page_params, paged_response
+from models import Fee
+import export
 
 router = APIRouter(prefix="/fees", tags=["Fees"])
 
@@ -11,8 +14,13 @@ def create_fee(data: FeeCreate, db: Session = Depends(get_db)):
     return fee_crud.create_fee(db, data)
 
 @router.get("/", response_model=list[FeeResponse])
-def list_fees(db: Session = Depends(get_db)):
-    return fee_crud.get_fees(db)
+def list_fees(request: Request, response: Response, page: PageParams = Depends(page_params), db: Session = Depends(get_db),
+              student_id: int | None = None, status: str | None = None,
+              format: str | None = Query(None, pattern="^(ndjson|csv)$")):
+    """List fees a page at a time, or stream all of them with ?format=ndjson|csv"""
+    if format:
+        return export.stream_export(fee_crud.fee_query(db, student_id, status), FeeResponse, format, "fees", Fee.fee_id)
+    return paged_response(request, response, fee_crud.get_fees(db, page, student_id, status))
 
 @router.get("/student/{student_id}", response_model=list[FeeResponse])
 def get_student_fees(student_id: int, db: Session = Depends(get_db)):
@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 from database import get_db
 from crud import feedback as feedback_crud
 from schemas import FeedbackCreate, FeedbackResponse
+from pagination import PageParams, page_params, paged_response
 
 router = APIRouter(prefix="/feedback", tags=["Feedback"])
 
@@ -11,8 +12,9 @@ def create_feedback(data: FeedbackCreate, db: Session = Depends(get_db)):
     return feedback_crud.create_feedback(db, data)
 
 @router.get("/", response_model=list[FeedbackResponse])
-def list_feedback(db: Session = Depends(get_db)):
-    return feedback_crud.get_feedbacks(db)
+def list_feedback(request: Request, response: Response, page: PageParams = Depends(page_params), db: Session = Depends(get_db),
+                  faculty_id: int | None = None, course_id: int | None = None):
+    return paged_response(request, response, feedback_crud.get_feedbacks(db, page, faculty_id, course_id))
 
 @router.get("/faculty/{faculty_id}", response_model=list[FeedbackResponse])
 def get_faculty_feedback(faculty_id: int, db: Session = Depends(get_db)):
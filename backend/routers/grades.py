@@ -1,8 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 from database import get_db
 from crud import grades as grades_crud
 from schemas import GradesCreate, GradesResponse
+from typing import Optional
+from pagination import PageParams, page_params, paged_response
 
 router = APIRouter(prefix="/grades", tags=["Grades"])
 
@@ -11,8 +13,10 @@ def create_grade(data: GradesCreate, db: Session = Depends(get_db)):
     return grades_crud.create_grade(db, data)
 
 @router.get("/", response_model=list[GradesResponse])
-def list_grades(db: Session = Depends(get_db)):
-    return grades_crud.get_grades(db)
+def list_grades(request: Request, response: Response, page: PageParams = Depends(page_params), db: Session = Depends(get_db),
+                student_id: Optional[int] = None, course_id: Optional[int] = None):
+    """Get all grades, optionally filtered by student or course"""
+    return paged_response(request, response, grades_crud.get_grades(db, page, student_id, course_id))
 
 @router.get("/student/{student_id}", response_model=list[GradesResponse])
 def get_student_grades(student_id: int, db: Session = Depends(get_db)):
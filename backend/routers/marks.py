@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from database import get_db
 from crud import marks as marks_crud
-from schemas import MarksCreate, MarksUpdate, MarksResponse
+from schemas import MarksCreate, MarksUpdate, MarksResponse, MarksSheet
+import export
 
 router = APIRouter(prefix="/marks", tags=["Marks"])
 
@@ -14,9 +15,13 @@ def create_mark(data: MarksCreate, db: Session = Depends(get_db)):
 
 
 @router.get("/", response_model=list[MarksResponse])
-def list_marks(db: Session = Depends(get_db)):
-    """Get all marks records"""
-    return marks_crud.get_all_marks(db)
+def list_marks(course_id: int | None = None, semester: int | None = None, archived: bool = False,
+               format: str | None = Query(None, pattern="^(ndjson|csv)$"), db: Session = Depends(get_db)):
+    """Get all marks records, or stream them with ?format=ndjson|csv (?archived=true: past semesters)"""
+    if format:
+        query = marks_crud.marks_query(db, course_id, semester, archived)
+        return export.stream_export(query, MarksResponse, format, "marks", marks_crud.marks_model(archived).mark_id)
+    return marks_crud.get_all_marks(db, course_id, semester, archived)
 
 
 @router.get("/student/{student_id}", response_model=list[MarksResponse])
@@ -26,15 +31,21 @@ def get_student_marks(student_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/course/{course_id}", response_model=list[MarksResponse])
-def get_course_marks(course_id: int, db: Session = Depends(get_db)):
-    """Get all marks for a specific course"""
-    return marks_crud.get_course_marks(db, course_id)
+def get_course_marks(course_id: int, archived: bool = False, db: Session = Depends(get_db)):
+    """Get all marks for a specific course (?archived=true: past semesters)"""
+    return marks_crud.get_course_marks(db, course_id, archived=archived)
+
+
+@router.put("/course/{course_id}/bulk", response_model=list[MarksResponse])
+def save_course_marks(course_id: int, sheet: MarksSheet, db: Session = Depends(get_db)):
+    """Upsert a course's whole marks sheet in one transaction"""
+    return marks_crud.upsert_course_marks(db, course_id, sheet)
 
 
 @router.get("/semester/{semester}", response_model=list[MarksResponse])
-def get_semester_marks(semester: int, db: Session = Depends(get_db)):
-    """Get all marks for a specific semester"""
-    return marks_crud.get_semester_marks(db, semester)
+def get_semester_marks(semester: int, archived: bool = False, db: Session = Depends(get_db)):
+    """Get all marks for a specific semester (?archived=true: rolled-over rows)"""
+    return marks_crud.get_semester_marks(db, semester, archived)
 
 
 @router.get("/student/{student_id}/course/{course_id}", response_model=list[MarksResponse])
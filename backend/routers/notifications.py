@@ -1,29 +1,164 @@
-from fastapi import APIRouter, Depends, HTTPException
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, WebSocket, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from database import get_db
+from database import get_db, SessionLocal
 from crud import notifications as notifications_crud
-from schemas import NotificationCreate, NotificationResponse
+from crud import broadcasts as broadcasts_crud
+from crud import notification_archive
+from schemas import NotificationCreate, NotificationResponse, BroadcastCreate, BroadcastResponse
+from pagination import PageParams, page_params, paged_response
+from security import session_from_token, require_role
+from events import bus, RESYNC
+import broadcast_worker
 
 router = APIRouter(prefix="/notifications", tags=["Notifications"])
 
+
+def _unread_count(student_id: int, refresh: bool) -> int:
+    db = SessionLocal()
+    try:
+        if refresh:
+            return notifications_crud.count_unread(db, student_id)
+        return notifications_crud.get_unread_count(db, student_id)
+    finally:
+        db.close()
+
+
+# Entities the socket follows: the student's notifications, new announcements and their
+# read state (the last two only move the unread count or trigger a refetch)
+SOCKET_ENTITIES = {"notifications", "notificationbroadcasts", "notificationreadmarkers", "notificationreads"}
+
+
+async def _push_changes(websocket: WebSocket, subscriber, student_id: int):
+    unread = await run_in_threadpool(_unread_count, student_id, False)
+    await websocket.send_json({"type": "unread", "count": unread})
+    while True:
+        batch = await bus.next_batch(subscriber)
+        resync = recount = False
+        for ev in batch:
+            if ev is RESYNC or (ev.entity == "notificationbroadcasts" and ev.op == "created"):
+                # An announcement is matched against the student's audience on read: refetch
+                resync = recount = True
+            elif ev.entity == "notifications":
+                await websocket.send_text('{"type":"change","change":%s}' % ev.data.decode())
+            # Rows of this student (every Notifications row has one; announcements to
+            # everyone are broadcasts, handled above)
+            if ev.users is not None:
+                recount = True
+        if resync:
+            await websocket.send_json({"type": "resync"})
+        if not recount:
+            continue
+        # Events arrive after the write committed, so this count includes it
+        count = await run_in_threadpool(_unread_count, student_id, True)
+        if count != unread:
+            unread = count
+            await websocket.send_json({"type": "unread", "count": unread})
+
+
+async def _wait_for_disconnect(websocket: WebSocket):
+    while (await websocket.receive())["type"] != "websocket.disconnect":
+        pass
+
 @router.post("/", response_model=NotificationResponse)
 def create_notification(data: NotificationCreate, db: Session = Depends(get_db)):
     return notifications_crud.create_notification(db, data)
 
 @router.get("/", response_model=list[NotificationResponse])
-def list_notifications(db: Session = Depends(get_db)):
-    return notifications_crud.get_notifications(db)
+def list_notifications(request: Request, response: Response, page: PageParams = Depends(page_params), db: Session = Depends(get_db),
+                       student_id: int | None = None):
+    return paged_response(request, response, notifications_crud.get_notifications(db, page, student_id))
 
 @router.get("/student/{student_id}", response_model=list[NotificationResponse])
-def get_student_notifications(student_id: int, db: Session = Depends(get_db)):
-    """Get all notifications for a specific student"""
-    return notifications_crud.get_student_notifications(db, student_id)
+def get_student_notifications(student_id: int, request: Request, response: Response,
+                              page: PageParams = Depends(page_params), db: Session = Depends(get_db)):
+    """Get a student's notifications, newest first"""
+    return paged_response(request, response, notifications_crud.get_student_notifications(db, student_id, page))
+
+@router.get("/student/{student_id}/archive", response_model=list[NotificationResponse])
+def get_archived_notifications(student_id: int, request: Request, response: Response,
+                               page: PageParams = Depends(page_params), db: Session = Depends(get_db)):
+    """Get a student's archived (read and past the retention age) notifications, newest first"""
+    return paged_response(request, response, notification_archive.get_archived_notifications(db, student_id, page))
+
+@router.get("/student/{student_id}/unread-count")
+def get_unread_count(student_id: int, db: Session = Depends(get_db)):
+    """Number of unread notifications addressed to a student"""
+    return {"student_id": student_id, "unread": notifications_crud.get_unread_count(db, student_id)}
 
 @router.post("/student/{student_id}/mark-read")
 def mark_notifications_read(student_id: int, db: Session = Depends(get_db)):
     """Mark all notifications for a student as read"""
     return notifications_crud.mark_student_notifications_read(db, student_id)
 
+@router.post("/student/{student_id}/announcements/{broadcast_id}/read")
+def mark_announcement_read(student_id: int, broadcast_id: int, db: Session = Depends(get_db)):
+    """Mark one announcement addressed to a student as read"""
+    return notifications_crud.mark_announcement_read(db, student_id, broadcast_id)
+
+@router.websocket("/ws")
+async def notification_socket(websocket: WebSocket, token: str | None = None, student_id: int | None = None):
+    """Push a student's new and changed notifications and unread count.
+
+    Students are connected to their own notifications; admins pass `student_id`.
+    """
+    try:
+        session = await session_from_token(token)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    if session["role"] == "student":
+        student_id = session["user_id"]
+    elif session["role"] != "admin" or student_id is None:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    subscriber = bus.subscribe(SOCKET_ENTITIES, f"student:{student_id}")
+    tasks = {
+        asyncio.create_task(_push_changes(websocket, subscriber, student_id)),
+        asyncio.create_task(_wait_for_disconnect(websocket)),
+    }
+    try:
+        # Whichever ends first (client gone, or the push failed) ends the connection
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            task.cancel()
+        bus.unsubscribe(subscriber)
+
+@router.post("/broadcasts/", response_model=BroadcastResponse, status_code=status.HTTP_202_ACCEPTED)
+def create_broadcast(data: BroadcastCreate, db: Session = Depends(get_db),
+                     session: dict = Depends(require_role("admin", "faculty"))):
+    """Queue a notification for every student of a course, department or semester, or for all students.
+
+    Department, semester and all-student announcements are stored once and visible at once.
+    Course broadcasts are expanded to per-student notifications in the background; poll
+    GET /notifications/broadcasts/{id} for progress. Faculty can broadcast to courses they teach or to all students.
+    """
+    broadcast = broadcasts_crud.create_broadcast(db, data, session)
+    if broadcast.status == "queued":
+        broadcast_worker.enqueue(broadcast.broadcast_id)
+    return broadcasts_crud.progress(broadcast)
+
+@router.get("/broadcasts/", response_model=list[BroadcastResponse])
+def list_broadcasts(limit: int = 50, status: str | None = None, db: Session = Depends(get_db),
+                    session: dict = Depends(require_role("admin", "faculty"))):
+    """Recent broadcasts, newest first (faculty see their own); ?status=failed lists the ones that gave up"""
+    sender_id = session["user_id"] if session["role"] == "faculty" else None
+    broadcasts = broadcasts_crud.get_broadcasts(db, sender_id, min(limit, 200), status)
+    return [broadcasts_crud.progress(b) for b in broadcasts]
+
+@router.get("/broadcasts/{broadcast_id}", response_model=BroadcastResponse)
+def get_broadcast(broadcast_id: int, db: Session = Depends(get_db),
+                  session: dict = Depends(require_role("admin", "faculty"))):
+    """Delivery progress of a broadcast"""
+    broadcast = broadcasts_crud.get_broadcast(db, broadcast_id)
+    if session["role"] == "faculty" and broadcast.sender_id != session["user_id"]:
+        raise HTTPException(status_code=403, detail="Not your broadcast")
+    return broadcasts_crud.progress(broadcast)
+
 @router.get("/{notification_id}", response_model=NotificationResponse)
 def get_notification(notification_id: int, db: Session = Depends(get_db)):
     n = notifications_crud.get_notification(db, notification_id)
@@ -38,3 +173,14 @@ def update_notification(notification_id: int, data: dict, db: Session = Depends(
 @router.delete("/{notification_id}")
 def delete_notification(notification_id: int, db: Session = Depends(get_db)):
     return notifications_crud.delete_notification(db, notification_id)
+
+@router.post("/broadcasts/{broadcast_id}/retry", response_model=BroadcastResponse, status_code=status.HTTP_202_ACCEPTED)
+def retry_broadcast(broadcast_id: int, db: Session = Depends(get_db),
+                    session: dict = Depends(require_role("admin", "faculty"))):
+    """Queue a failed broadcast again; delivery resumes where it stopped"""
+    broadcast = broadcasts_crud.get_broadcast(db, broadcast_id)
+    if session["role"] == "faculty" and broadcast.sender_id != session["user_id"]:
+        raise HTTPException(status_code=403, detail="Not your broadcast")
+    broadcast = broadcasts_crud.retry(db, broadcast_id)
+    broadcast_worker.enqueue(broadcast.broadcast_id)
+    return broadcasts_crud.progress(broadcast)
@@ -9,7 +9,6 @@ class StudentBase(BaseModel):
     username: str | None = None
     full_name: str
     email: str
-    password: str
     gender: str | None = None
     dob: date | None = None
     department: str | None = None
@@ -20,7 +19,11 @@ class StudentBase(BaseModel):
 
 
 class StudentCreate(StudentBase):
-    pass
+    password: str
+
+
+class StudentUpdate(StudentBase):
+    password: str | None = None  # keeps the current password when omitted
 
 
 class StudentResponse(StudentBase):
@@ -40,14 +43,17 @@ class StudentResponse(StudentBase):
 class FacultyBase(BaseModel):
     name: str
     email: str
-    password: str
     department: str | None = None
     contact: str | None = None
     role: str = "faculty"
 
 
 class FacultyCreate(FacultyBase):
-    pass
+    password: str
+
+
+class FacultyUpdate(FacultyBase):
+    password: str | None = None  # keeps the current password when omitted
 
 
 class FacultyResponse(FacultyBase):
@@ -65,12 +71,15 @@ class FacultyResponse(FacultyBase):
 class AdminBase(BaseModel):
     name: str
     email: str
-    password: str
     role: str = "admin"
 
 
 class AdminCreate(AdminBase):
-    pass
+    password: str
+
+
+class AdminUpdate(AdminBase):
+    password: str | None = None  # keeps the current password when omitted
 
 
 class AdminResponse(AdminBase):
@@ -105,6 +114,24 @@ class CourseResponse(CourseBase):
         from_attributes = True
 
 
+class RosterEntry(BaseModel):
+    """A student enrolled in a course; attendance and marks fields only with ?include="""
+    student_id: int
+    full_name: str
+    email: str
+    department: str | None = None
+    semester: int
+    enrollment_status: str | None = None
+    attendance_status: str | None = None
+    quiz_total: float | None = None
+    assignment_total: float | None = None
+    midterm1: float | None = None
+    midterm2: float | None = None
+    final_exam: float | None = None
+    total_marks: float | None = None
+    grade_letter: str | None = None
+
+
 # -----------------------------------------------------------
 # ENROLLMENT
 # -----------------------------------------------------------
@@ -140,6 +167,13 @@ class AttendanceCreate(AttendanceBase):
     pass
 
 
+class AttendanceBulk(BaseModel):
+    """One class session's attendance: a status per student"""
+    course_id: int
+    date: date
+    statuses: dict[int, str]  # student_id -> Present / Absent
+
+
 class AttendanceResponse(AttendanceBase):
     attendance_id: int
 
@@ -147,6 +181,46 @@ class AttendanceResponse(AttendanceBase):
         from_attributes = True
 
 
+class AttendanceTotals(BaseModel):
+    present_count: int
+    absent_count: int
+    late_count: int
+    total_count: int
+    attendance_percentage: float  # present / total
+
+
+class StudentCourseAttendance(AttendanceTotals):
+    student_id: int
+    course_id: int
+    semester: int
+    course_name: str | None = None
+    course_code: str | None = None
+
+
+class CourseStudentAttendance(AttendanceTotals):
+    student_id: int
+    full_name: str | None = None
+    semester: int
+
+
+class CourseAttendanceSummary(AttendanceTotals):
+    course_id: int
+    semester: int | None = None
+    students: list[CourseStudentAttendance]
+
+
+class DepartmentCourseAttendance(AttendanceTotals):
+    course_id: int
+    course_name: str | None = None
+    course_code: str | None = None
+
+
+class DepartmentAttendanceSummary(AttendanceTotals):
+    department: str
+    semester: int | None = None
+    courses: list[DepartmentCourseAttendance]
+
+
 # -----------------------------------------------------------
 # GRADES
 # -----------------------------------------------------------
@@ -213,7 +287,8 @@ class NotificationCreate(NotificationBase):
 
 
 class NotificationResponse(NotificationBase):
-    notification_id: int
+    notification_id: int | None = None  # None for an announcement (see broadcast_id)
+    broadcast_id: int | None = None
     date_sent: datetime
     created_at: datetime
 
@@ -221,6 +296,37 @@ class NotificationResponse(NotificationBase):
         from_attributes = True
 
 
+class BroadcastCreate(BaseModel):
+    title: str = "Notification"
+    message: str
+    type: str | None = "announcement"
+    target: str  # course, department, semester or all
+    target_value: str | int | None = None  # course_id, department name or semester number
+
+
+class BroadcastResponse(BaseModel):
+    broadcast_id: int
+    sender_id: int | None = None
+    title: str
+    message: str
+    type: str | None = None
+    target: str
+    target_value: str | None = None
+    status: str
+    total_recipients: int
+    delivered: int
+    attempts: int = 0
+    error: str | None = None
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+    percent_complete: float
+    rows_per_second: float | None = None
+
+    class Config:
+        from_attributes = True
+
+
 # -----------------------------------------------------------
 # FEEDBACK
 # -----------------------------------------------------------
@@ -288,6 +394,25 @@ class MarksUpdate(BaseModel):
         from_attributes = True
 
 
+class MarksSheetRow(BaseModel):
+    student_id: int
+    quiz1: float = 0.0
+    quiz2: float = 0.0
+    quiz3: float = 0.0
+    assignment1: float = 0.0
+    assignment2: float = 0.0
+    assignment3: float = 0.0
+    midterm1: float = 0.0
+    midterm2: float = 0.0
+    final_exam: float = 0.0
+
+
+class MarksSheet(BaseModel):
+    """A course's whole gradebook for one semester"""
+    semester: int
+    rows: list[MarksSheetRow]
+
+
 class MarksResponse(MarksBase):
     mark_id: int
     created_at: datetime
@@ -0,0 +1,36 @@
+"""
+Move read notifications past the retention age to NotificationsArchive now, instead of
+waiting for the API's daily run.
+
+Usage:
+    python scripts/archive_notifications.py [--days 90] [--batch-size 1000] [--pause 0.2]
+"""
+import sys
+import os
+import argparse
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import SessionLocal
+from crud import notification_archive
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=notification_archive.NOTIFICATION_RETENTION_DAYS)
+    parser.add_argument("--batch-size", type=int, default=notification_archive.NOTIFICATION_ARCHIVE_BATCH)
+    parser.add_argument("--pause", type=float, default=notification_archive.NOTIFICATION_ARCHIVE_PAUSE)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        result = notification_archive.archive_read_notifications(db, args.days, args.batch_size, args.pause)
+        print(f"✓ Archived {result['archived']} read notifications older than {args.days} days "
+              f"({result['examined']} rows examined, {result['chunks']} chunks, {result['seconds']}s)")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Recompute the stored totals (quiz_total, assignment_total, total_marks, grade_letter)
+for every Marks row.
+
+Usage:
+    python scripts/backfill_grade_totals.py          # rewrite every row
+    python scripts/backfill_grade_totals.py --stale  # rewrite only rows that are out of date
+    python scripts/backfill_grade_totals.py --check  # report stale rows without writing
+"""
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import SessionLocal
+from crud import marks as marks_crud
+
+
+def main():
+    args = set(sys.argv[1:])
+    db = SessionLocal()
+    try:
+        if '--check' in args:
+            stale = marks_crud.find_stale_marks(db)
+            print(f"Stale Marks rows: {len(stale)}")
+            for mark_id in stale[:50]:
+                print(f"  - mark_id {mark_id}")
+            if len(stale) > 50:
+                print(f"  ... and {len(stale) - 50} more")
+            sys.exit(1 if stale else 0)
+
+        updated = marks_crud.backfill_grade_totals(db, only_stale='--stale' in args)
+        print(f"Updated grade totals on {updated} Marks rows")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Benchmark the admin dashboard stats query against a latency budget.
+
+Usage:
+    python scripts/bench_admin_dashboard.py [iterations] [p95_budget_ms]
+"""
+import sys
+import os
+import time
+import statistics
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func
+from database import SessionLocal
+from models import Student, Fee
+from crud import admin as admin_crud
+
+ITERATIONS = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+P95_BUDGET_MS = float(sys.argv[2]) if len(sys.argv) > 2 else 50.0
+
+
+def bench_admin_dashboard():
+    db = SessionLocal()
+    try:
+        students = db.query(func.count(Student.student_id)).scalar()
+        fees = db.query(func.count(Fee.fee_id)).scalar()
+        print(f"\n=== Admin dashboard stats: {students} students, {fees} fee rows ===\n")
+
+        # Warm up the connection pool and the server's caches
+        admin_crud.get_dashboard_stats(db)
+
+        timings = []
+        for _ in range(ITERATIONS):
+            start = time.perf_counter()
+            stats = admin_crud.get_dashboard_stats(db)
+            timings.append((time.perf_counter() - start) * 1000)
+
+        timings.sort()
+        p50 = statistics.median(timings)
+        p95 = timings[int(len(timings) * 0.95) - 1]
+        print(f"Stats: {stats}")
+        print(f"Iterations: {ITERATIONS}")
+        print(f"p50: {p50:.2f} ms  p95: {p95:.2f} ms  max: {timings[-1]:.2f} ms")
+
+        if p95 > P95_BUDGET_MS:
+            print(f"\n✗ p95 {p95:.2f} ms exceeds the {P95_BUDGET_MS:.0f} ms budget")
+            sys.exit(1)
+        print(f"\n✓ p95 within the {P95_BUDGET_MS:.0f} ms budget")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    bench_admin_dashboard()
@@ -0,0 +1,96 @@
+"""
+Benchmark fan-out of the live update bus (GET /events/).
+
+Connects N in-process subscribers to events.bus, each drained by its own task the way
+the SSE response drains it, then publishes a burst of change events from a worker thread
+(as a committed CRUD write does) and measures how long the event loop takes to deliver
+every event to every matching subscriber. Half the subscribers follow all fee events
+(admin dashboards), the other half a single student (student pages), so the user filter
+is exercised too.
+
+No database is needed.
+
+Usage:
+    python scripts/bench_events.py [--clients 500 2000 5000] [--events 200]
+"""
+import sys
+import os
+import time
+import asyncio
+import argparse
+import threading
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import events
+from events import EventBus
+
+STUDENTS = 100
+
+
+def fee_change(i: int):
+    student_id = i % STUDENTS
+    return ("fee", (f"student:{student_id}",), {
+        "op": "updated", "entity": "fee", "key": i,
+        "data": {"fee_id": i, "student_id": student_id, "amount": 45000.0, "payment_status": "Paid"},
+    })
+
+
+async def drain(bus: EventBus, entities, user, counts: list, index: int):
+    async for chunk in bus.stream(entities, user):
+        counts[index] += chunk.count(b"\nevent: fee\n")
+
+
+async def run(clients: int, burst: int):
+    bus = EventBus()
+    counts = [0] * clients
+    tasks = []
+    for i in range(clients):
+        user = None if i % 2 == 0 else f"student:{i % STUDENTS}"
+        tasks.append(asyncio.create_task(drain(bus, {"fee"}, user, counts, i)))
+    await asyncio.sleep(0.1)  # let every task subscribe
+
+    expected = sum(
+        sum(1 for n in range(burst) if i % 2 == 0 or n % STUDENTS == i % STUDENTS)
+        for i in range(clients)
+    )
+
+    def publish():
+        for n in range(burst):
+            bus.publish([fee_change(n)])
+
+    start = time.perf_counter()
+    publisher = threading.Thread(target=publish)
+    publisher.start()
+    while sum(counts) < expected:
+        await asyncio.sleep(0.001)
+    elapsed = time.perf_counter() - start
+    publisher.join()
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    deliveries = sum(counts)
+    print(f"{clients:>7} {burst:>7} {deliveries:>11} {elapsed * 1000:>9.1f} "
+          f"{elapsed / burst * 1000:>10.3f} {deliveries / elapsed:>13,.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, nargs="+", default=[500, 2000, 5000])
+    parser.add_argument("--events", type=int, default=200, help="events published per run")
+    args = parser.parse_args()
+
+    # A burst must not overflow the per-client queues, or clients get a resync instead
+    events.EVENTS_QUEUE_SIZE = max(events.EVENTS_QUEUE_SIZE, args.events + 1)
+
+    print(f"\n=== Event fan-out ({args.events} fee events per run) ===\n")
+    print(f"{'clients':>7} {'events':>7} {'deliveries':>11} {'total ms':>9} {'ms/event':>10} {'deliveries/s':>13}")
+    for clients in args.clients:
+        asyncio.run(run(clients, args.events))
+
+
+if __name__ == "__main__":
+    main()
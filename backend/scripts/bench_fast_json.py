@@ -0,0 +1,77 @@
+"""
+Benchmark the fast JSON list path against the Pydantic response_model path.
+
+Serializes pages of GET /students/ and GET /attendance/ both ways: ORM objects validated
+into the response schema (what a response_model route does) and column tuples encoded
+with orjson (fast_json).
+
+Usage:
+    python scripts/bench_fast_json.py [page_size] [repeats]
+"""
+import sys
+import os
+import time
+import statistics
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pydantic import TypeAdapter
+from database import SessionLocal
+from models import Student, Attendance
+from schemas import StudentResponse, AttendanceResponse
+from crud import student as student_crud
+from crud import attendence as attendance_crud
+from pagination import PageParams, MAX_PAGE_SIZE
+import fast_json
+
+PAGE_SIZE = int(sys.argv[1]) if len(sys.argv) > 1 else MAX_PAGE_SIZE
+REPEATS = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+ROUTES = [
+    ("GET /students/", student_crud.student_query, StudentResponse, Student.student_id),
+    ("GET /attendance/", attendance_crud.attendance_query, AttendanceResponse, Attendance.attendance_id),
+]
+
+
+def median_ms(fn):
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def bench_route(db, label, query_factory, schema, key_column):
+    adapter = TypeAdapter(list[schema])
+    page = PageParams(limit=PAGE_SIZE)
+
+    def pydantic_path():
+        items = query_factory(db).order_by(key_column).limit(page.limit).all()
+        body = adapter.dump_json(adapter.validate_python(items, from_attributes=True))
+        db.expunge_all()
+        return body
+
+    def fast_path():
+        fields, result = fast_json.fetch_page(query_factory(db), schema, page, [key_column])
+        return fast_json.dumps_rows(fields, result.items)
+
+    rows = len(fast_json.fetch_page(query_factory(db), schema, page, [key_column])[1].items)
+    slow = median_ms(pydantic_path)
+    fast = median_ms(fast_path)
+    print(f"{label:<18} {rows:>6} rows  pydantic {slow:8.2f} ms  fast {fast:8.2f} ms  ({slow / fast:.1f}x)")
+
+
+def bench_fast_json():
+    db = SessionLocal()
+    try:
+        print(f"\n=== List serialization, page size {PAGE_SIZE}, median of {REPEATS} ===\n")
+        for route in ROUTES:
+            bench_route(db, *route)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    bench_fast_json()
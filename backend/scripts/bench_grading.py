@@ -0,0 +1,103 @@
+"""Benchmark the vectorized grading engine against the original per-row algorithm"""
+import sys
+import os
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crud.grades import (
+    MARK_COLUMNS,
+    calculate_weightage_and_grade,
+    calculate_weightage_and_grade_batch,
+)
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+SCALAR_SAMPLE = 20_000
+
+
+def reference_weightage_and_grade(marks):
+    """The per-row algorithm grades.py used before the batch engine, kept as the reference"""
+    if not marks:
+        return 0.00, 'F'
+
+    quiz_weightage = sum([
+        (float(marks.quiz1 or 0) / 100) * 3.333,
+        (float(marks.quiz2 or 0) / 100) * 3.333,
+        (float(marks.quiz3 or 0) / 100) * 3.333
+    ])
+
+    assignment_weightage = sum([
+        (float(marks.assignment1 or 0) / 100) * 3.333,
+        (float(marks.assignment2 or 0) / 100) * 3.333,
+        (float(marks.assignment3 or 0) / 100) * 3.333
+    ])
+
+    midterm1_weightage = (float(marks.midterm1 or 0) / 100) * 15
+    midterm2_weightage = (float(marks.midterm2 or 0) / 100) * 15
+    final_weightage = (float(marks.final_exam or 0) / 100) * 50
+
+    total_weightage = quiz_weightage + assignment_weightage + midterm1_weightage + midterm2_weightage + final_weightage
+
+    if total_weightage >= 85:
+        grade = 'A+'
+    elif total_weightage >= 80:
+        grade = 'A'
+    elif total_weightage >= 75:
+        grade = 'B+'
+    elif total_weightage >= 70:
+        grade = 'B'
+    elif total_weightage >= 65:
+        grade = 'C+'
+    elif total_weightage >= 60:
+        grade = 'C'
+    elif total_weightage >= 55:
+        grade = 'D'
+    else:
+        grade = 'F'
+
+    return round(total_weightage, 2), grade
+
+
+def time_per_row(function, sample):
+    start = time.perf_counter()
+    results = [function(m) for m in sample]
+    return (time.perf_counter() - start) / len(sample), results
+
+
+def bench_grading():
+    rng = np.random.default_rng(42)
+    columns = [np.round(rng.uniform(0, 100, ROWS), 2) for _ in MARK_COLUMNS]
+
+    print(f"=== Grading {ROWS:,} rows ===\n")
+
+    start = time.perf_counter()
+    weightage, grades = calculate_weightage_and_grade_batch(*columns)
+    batch_elapsed = time.perf_counter() - start
+    print(f"Batch:     {batch_elapsed:.3f}s total, {batch_elapsed / ROWS * 1e9:.1f} ns/row")
+
+    # The per-row paths are too slow for the full set; time a sample and extrapolate
+    sample = [
+        SimpleNamespace(**{name: float(col[i]) for name, col in zip(MARK_COLUMNS, columns)})
+        for i in range(min(SCALAR_SAMPLE, ROWS))
+    ]
+    reference_per_row, reference = time_per_row(reference_weightage_and_grade, sample)
+    scalar_per_row, scalar = time_per_row(calculate_weightage_and_grade, sample)
+    print(f"Reference: {reference_per_row * 1e9:.1f} ns/row (~{reference_per_row * ROWS:.1f}s for {ROWS:,} rows)")
+    print(f"Scalar:    {scalar_per_row * 1e9:.1f} ns/row ({scalar_per_row / reference_per_row:.2f}x the reference)")
+    print(f"Speedup of batch over reference: {reference_per_row * ROWS / batch_elapsed:.0f}x")
+
+    batch_mismatches = sum(
+        1 for i, (w, g) in enumerate(reference)
+        if w != float(weightage[i]) or g != str(grades[i])
+    )
+    scalar_mismatches = sum(1 for expected, got in zip(reference, scalar) if expected != got)
+    print(f"\nMismatches against the reference on the sample: batch {batch_mismatches}, scalar {scalar_mismatches}")
+    return batch_mismatches + scalar_mismatches
+
+
+if __name__ == "__main__":
+    sys.exit(1 if bench_grading() else 0)
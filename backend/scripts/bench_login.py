@@ -0,0 +1,65 @@
+"""
+Load benchmark for password verification on the bcrypt worker pool.
+
+Fires concurrent verifications (as a login storm would) with 1, 2, 4, ... worker
+processes up to the number of cores and reports logins/second for each size.
+
+Usage:
+    python scripts/bench_login.py [attempts_per_worker]
+"""
+import sys
+import os
+import time
+import asyncio
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import security
+
+ATTEMPTS_PER_WORKER = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+
+
+def worker_counts():
+    cores = os.cpu_count() or 1
+    counts = []
+    n = 1
+    while n < cores:
+        counts.append(n)
+        n *= 2
+    counts.append(cores)
+    return counts
+
+
+async def storm(hashed: str, attempts: int):
+    results = await asyncio.gather(
+        *(security.verify_password_async("password123", hashed) for _ in range(attempts))
+    )
+    assert all(results), "verification failed"
+
+
+async def bench_login():
+    hashed = security.hash_password("password123")
+    # Measure bcrypt itself, not the verified-hash cache
+    security.PASSWORD_VERIFY_CACHE_SIZE = 0
+
+    print(f"\n=== Login throughput ({os.cpu_count()} cores) ===\n")
+    baseline = None
+    for workers in worker_counts():
+        attempts = workers * ATTEMPTS_PER_WORKER
+        security.configure_password_pool(workers=workers, max_queue=attempts)
+        await storm(hashed, workers)  # start the worker processes
+
+        start = time.perf_counter()
+        await storm(hashed, attempts)
+        elapsed = time.perf_counter() - start
+
+        rate = attempts / elapsed
+        baseline = baseline or rate
+        print(f"{workers:>3} workers: {rate:7.1f} logins/s  ({rate / baseline:.1f}x)")
+
+    security.shutdown_password_pool()
+
+
+if __name__ == "__main__":
+    asyncio.run(bench_login())
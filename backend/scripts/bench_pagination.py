@@ -0,0 +1,129 @@
+"""
+Benchmark keyset vs OFFSET pagination on the Attendance table.
+
+Times one page at increasing depths through the table with the cursor used by
+GET /attendance/ and with the equivalent OFFSET query. Keyset latency should stay flat
+with depth while OFFSET grows linearly.
+
+--seed N first tops the table up to N rows with synthetic records (status 'Bench'), spread
+over the existing students and courses; --cleanup deletes them again.
+
+Usage:
+    python scripts/bench_pagination.py [--seed 1000000] [--page-size 100] [--cleanup]
+"""
+import sys
+import os
+import time
+import argparse
+import statistics
+from datetime import date, timedelta
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func
+from database import SessionLocal
+from models import Attendance, Student, Course
+from crud import attendence as attendance_crud
+from schemas import AttendanceResponse
+import fast_json
+from crud import table_versions
+from pagination import PageParams, encode_cursor
+
+BENCH_STATUS = "Bench"
+SEED_CHUNK = 10000
+DEPTHS = (0, 0.01, 0.1, 0.25, 0.5, 0.75, 0.99)
+REPEATS = 5
+
+
+def seed(db, target: int):
+    existing = db.query(func.count(Attendance.attendance_id)).scalar()
+    missing = target - existing
+    if missing <= 0:
+        return
+    students = [s for (s,) in db.query(Student.student_id).all()]
+    courses = [c for (c,) in db.query(Course.course_id).all()]
+    if not students or not courses:
+        print("✗ Seeding needs at least one student and one course")
+        sys.exit(1)
+
+    # One row per (student, course, day) so the data stays realistic
+    pairs = len(students) * len(courses)
+    start_day = date(2000, 1, 1)
+    print(f"Seeding {missing} attendance rows...")
+    for offset in range(0, missing, SEED_CHUNK):
+        rows = []
+        for i in range(offset, min(offset + SEED_CHUNK, missing)):
+            rows.append({
+                "student_id": students[i % len(students)],
+                "course_id": courses[(i // len(students)) % len(courses)],
+                "date": start_day + timedelta(days=i // pairs),
+                "status": BENCH_STATUS,
+            })
+        db.bulk_insert_mappings(Attendance, rows)
+        table_versions.touch(db, "Attendance")
+        db.commit()
+
+
+def cleanup(db):
+    deleted = db.query(Attendance).filter(Attendance.status == BENCH_STATUS).delete(synchronize_session=False)
+    db.commit()
+    print(f"Deleted {deleted} benchmark rows")
+
+
+def timed(fn):
+    timings = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def bench_pagination(db, page_size: int):
+    total = db.query(func.count(Attendance.attendance_id)).scalar()
+    print(f"\n=== Attendance pagination: {total} rows, {page_size} per page ===\n")
+    print(f"{'depth':>7} {'row':>9} {'keyset ms':>10} {'offset ms':>10}")
+
+    keyset_timings = []
+    for depth in DEPTHS:
+        row = int(total * depth)
+        cursor = None
+        if row:
+            # The cursor a client would hold after reading `row` rows
+            (last_id,) = db.query(Attendance.attendance_id).order_by(Attendance.attendance_id).offset(row - 1).limit(1).one()
+            cursor = encode_cursor([last_id])
+
+        page = PageParams(limit=page_size, cursor=cursor)
+        # The page GET /attendance/ serves
+        keyset = timed(lambda: fast_json.fetch_page(attendance_crud.attendance_query(db), AttendanceResponse,
+                                                    page, attendance_crud.attendance_order()))
+        offset = timed(lambda: db.query(Attendance).order_by(Attendance.attendance_id).offset(row).limit(page_size).all())
+        keyset_timings.append(keyset)
+        print(f"{depth:>7.0%} {row:>9} {keyset:>10.2f} {offset:>10.2f}")
+
+    spread = max(keyset_timings) / min(keyset_timings)
+    print(f"\nKeyset slowest/fastest page: {spread:.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seed", type=int, help="top the Attendance table up to this many rows first")
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--cleanup", action="store_true", help="delete the seeded rows and exit")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.cleanup:
+            cleanup(db)
+            return
+        if args.seed:
+            seed(db, args.seed)
+        bench_pagination(db, args.page_size)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
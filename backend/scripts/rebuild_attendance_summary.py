@@ -0,0 +1,26 @@
+"""
+Rebuild the AttendanceSummary rollup (and its course and department rollups) from the
+Attendance, AttendanceArchive and Enrollment tables.
+Run after changing attendance rows, enrollment semesters or student departments outside the API.
+"""
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import SessionLocal
+from crud import attendance_summary
+
+
+def main():
+    db = SessionLocal()
+    try:
+        written = attendance_summary.rebuild(db)
+        print(f"✓ Rebuilt attendance summary ({written} rows)")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
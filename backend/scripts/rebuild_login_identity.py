@@ -0,0 +1,25 @@
+"""
+Rebuild the LoginIdentity index from the Student, Faculty and Admin tables.
+Run after changing user emails, usernames, contacts or names outside the API.
+"""
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import SessionLocal
+from crud import login_identity
+
+
+def main():
+    db = SessionLocal()
+    try:
+        written = login_identity.rebuild(db)
+        print(f"✓ Rebuilt login identity index ({written} identifiers)")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
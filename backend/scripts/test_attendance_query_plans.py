@@ -0,0 +1,94 @@
+"""
+Check with EXPLAIN that course/date-range attendance pages are index range scans.
+
+Builds the statements GET /attendance/?course_id=&from=&to= runs (first page and a page
+after a cursor) and asserts that MySQL reads Attendance through the expected composite
+index with a range (or ref) access and no filesort.
+
+With only a few hundred rows the optimizer may prefer a table scan whatever the indexes,
+so run it against realistic data, e.g. after scripts/bench_pagination.py --seed 1000000.
+
+Usage:
+    python scripts/test_attendance_query_plans.py
+"""
+import sys
+import os
+from datetime import timedelta
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import func
+from database import SessionLocal, engine
+from models import Attendance
+from crud import attendence as attendance_crud
+from pagination import keyset_filter
+
+PAGE_SIZE = 100
+RANGE_ACCESS = ("range", "ref")
+
+
+def explain(db, query):
+    compiled = query.statement.compile(engine)
+    return [dict(row._mapping) for row in db.connection().exec_driver_sql("EXPLAIN " + str(compiled), compiled.params)]
+
+
+def page_statement(db, student_id, course_id, from_date, to_date, after=None):
+    query = attendance_crud.attendance_query(db, student_id, course_id, from_date, to_date)
+    columns = attendance_crud.attendance_order(course_id)
+    if after is not None:
+        query = query.filter(keyset_filter(columns, after))
+    return query.order_by(*columns).limit(PAGE_SIZE + 1)
+
+
+def check(db, label, query, expected_key) -> bool:
+    plan = [row for row in explain(db, query) if row.get("table") == Attendance.__tablename__]
+    row = plan[0] if plan else {}
+    extra = row.get("Extra") or ""
+    ok = row.get("key") == expected_key and row.get("type") in RANGE_ACCESS and "filesort" not in extra
+    mark = "✓" if ok else "✗"
+    print(f"{mark} {label}: type={row.get('type')} key={row.get('key')} rows={row.get('rows')} extra={extra or '-'}")
+    return ok
+
+
+def test_attendance_query_plans():
+    db = SessionLocal()
+    try:
+        sample = db.query(Attendance.student_id, Attendance.course_id, func.max(Attendance.date).label("last_day")).group_by(
+            Attendance.student_id, Attendance.course_id
+        ).order_by(func.count().desc()).first()
+        if not sample:
+            print("✗ No attendance rows to explain against")
+            sys.exit(1)
+        total = db.query(func.count(Attendance.attendance_id)).scalar()
+        print(f"\n=== Explaining attendance pages over {total} rows ===\n")
+
+        to_date = sample.last_day
+        from_date = to_date - timedelta(days=30)
+        cursor = [from_date, 0]
+        cases = [
+            ("course, date range", page_statement(db, None, sample.course_id, from_date, to_date),
+             "idx_attendance_course_date"),
+            ("course, date range, after cursor", page_statement(db, None, sample.course_id, from_date, to_date, cursor),
+             "idx_attendance_course_date"),
+            ("course, from date only", page_statement(db, None, sample.course_id, from_date, None),
+             "idx_attendance_course_date"),
+            ("student and course, date range", page_statement(db, sample.student_id, sample.course_id, from_date, to_date),
+             "unique_student_course_date"),
+            ("student and course, after cursor",
+             page_statement(db, sample.student_id, sample.course_id, from_date, to_date, cursor),
+             "unique_student_course_date"),
+        ]
+        failures = sum(not check(db, label, query, key) for label, query, key in cases)
+
+        print("\n" + "=" * 50)
+        if failures:
+            print(f"✗ {failures} attendance queries are not index range scans")
+            sys.exit(1)
+        print("✓ All attendance pages are index range scans")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    test_attendance_query_plans()
@@ -0,0 +1,95 @@
+"""
+Check that the fast JSON list path matches the Pydantic response schemas.
+
+For every route serialized by fast_json, encode each row of the table both ways (ORM
+object validated into the response schema, and column tuple encoded with orjson) and
+compare the decoded JSON. Run after changing a response schema or model column.
+"""
+import sys
+import os
+import json
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pydantic import TypeAdapter
+from database import SessionLocal
+from models import Student, Faculty, Course, Enrollment, Attendance, Fee, Marks
+from schemas import (
+    StudentResponse, FacultyResponse, CourseResponse, EnrollmentResponse,
+    AttendanceResponse, FeeResponse, MarksResponse
+)
+from crud import student as student_crud
+from crud import faculty as faculty_crud
+from crud import course as course_crud
+from crud import enrollment as enrollment_crud
+from crud import attendence as attendance_crud
+from crud import fee as fee_crud
+from crud import marks as marks_crud
+from pagination import PageParams
+import fast_json
+
+PAGE_SIZE = 1000
+
+# (label, query factory, response schema, key column) for each fast JSON or export route
+FAST_ROUTES = [
+    ("GET /students/", student_crud.student_query, StudentResponse, Student.student_id),
+    ("GET /faculties/", faculty_crud.faculty_query, FacultyResponse, Faculty.faculty_id),
+    ("GET /courses/", course_crud.course_query, CourseResponse, Course.course_id),
+    ("GET /enrollments/", enrollment_crud.enrollment_query, EnrollmentResponse, Enrollment.enrollment_id),
+    ("GET /attendance/", attendance_crud.attendance_query, AttendanceResponse, Attendance.attendance_id),
+    ("GET /fees/?format=ndjson", fee_crud.fee_query, FeeResponse, Fee.fee_id),
+    ("GET /marks/?format=ndjson", marks_crud.marks_query, MarksResponse, Marks.mark_id),
+]
+
+
+def compare_route(db, label, query_factory, schema, key_column):
+    adapter = TypeAdapter(list[schema])
+    checked = mismatches = 0
+    cursor = None
+    while True:
+        page = PageParams(limit=PAGE_SIZE, cursor=cursor)
+        fields, fast_page = fast_json.fetch_page(query_factory(db), schema, page, [key_column])
+        fast = json.loads(fast_json.dumps_rows(fields, fast_page.items))
+        # The same page through the ORM and the response schema, as FastAPI would
+        ids = [getattr(row, key_column.key) for row in fast_page.items]
+        orm_rows = query_factory(db).filter(key_column.in_(ids)).order_by(key_column).all()
+        slow = json.loads(adapter.dump_json(adapter.validate_python(orm_rows, from_attributes=True)))
+
+        for expected, actual in zip(slow, fast):
+            checked += 1
+            if expected != actual:
+                mismatches += 1
+                if mismatches <= 5:
+                    diff = {k: (expected.get(k), actual.get(k)) for k in expected.keys() | actual.keys() if expected.get(k) != actual.get(k)}
+                    print(f"  ✗ {key_column.key}={expected.get(key_column.key)}: {diff}")
+        if len(slow) != len(fast):
+            mismatches += 1
+            print(f"  ✗ page sizes differ: {len(slow)} vs {len(fast)}")
+
+        cursor = fast_page.next_cursor
+        if not cursor:
+            break
+        db.expunge_all()
+
+    status = "✓" if not mismatches else "✗"
+    print(f"{status} {label}: {checked} rows compared, {mismatches} mismatches")
+    return mismatches
+
+
+def test_fast_json():
+    db = SessionLocal()
+    try:
+        print("\n=== Fast JSON vs response schema ===\n")
+        failures = sum(compare_route(db, *route) for route in FAST_ROUTES)
+        print("\n" + "=" * 50)
+        if failures:
+            print(f"✗ {failures} mismatches")
+            sys.exit(1)
+        print("✓ Fast JSON output matches the response schemas")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    test_fast_json()
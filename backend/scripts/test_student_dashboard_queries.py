@@ -0,0 +1,52 @@
+"""Check that the student dashboard stats cost a single database round-trip"""
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event
+from database import SessionLocal, engine
+from models import Student
+from crud import student as student_crud
+
+# Statements allowed per call to get_dashboard_stats
+QUERY_BUDGET = 1
+
+
+def test_student_dashboard_queries():
+    db = SessionLocal()
+    statements = []
+
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    try:
+        student_ids = [s.student_id for s in db.query(Student.student_id).all()]
+        print(f"\n=== Checking dashboard stats for {len(student_ids)} students ===\n")
+
+        event.listen(engine, "before_cursor_execute", count_statement)
+        failures = 0
+        for student_id in student_ids:
+            statements.clear()
+            stats = student_crud.get_dashboard_stats(db, student_id)
+            if len(statements) > QUERY_BUDGET:
+                failures += 1
+                print(f"✗ Student {student_id}: {len(statements)} queries (budget {QUERY_BUDGET})")
+            else:
+                print(f"✓ Student {student_id}: {len(statements)} query, "
+                      f"{stats['total_attendance_records']} attendance records, cgpa {stats['cgpa']}")
+
+        print("\n" + "=" * 50)
+        if failures:
+            print(f"✗ {failures} students exceeded the query budget")
+            sys.exit(1)
+        print("✓ All dashboard stats within the query budget")
+    finally:
+        if event.contains(engine, "before_cursor_execute", count_statement):
+            event.remove(engine, "before_cursor_execute", count_statement)
+        db.close()
+
+
+if __name__ == "__main__":
+    test_student_dashboard_queries()
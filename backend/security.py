@@ -1,4 +1,24 @@
 import bcrypt
+import asyncio
+import hashlib
+import hmac
+import os
+import secrets
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from fastapi import HTTPException, Header
+from fastapi.concurrency import run_in_threadpool
+from database import SessionLocal
+from crud import sessions
+
+# Worker processes for bcrypt (each hash/verify is ~250 ms of CPU)
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 1)))
+# Requests allowed to wait for a worker before new ones are rejected with 503
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "64"))
+# Successful verifications remembered so repeated logins skip bcrypt
+PASSWORD_VERIFY_CACHE_SIZE = int(os.getenv("PASSWORD_VERIFY_CACHE_SIZE", "1024"))
+PASSWORD_VERIFY_CACHE_TTL = int(os.getenv("PASSWORD_VERIFY_CACHE_TTL", "600"))
 
 def hash_password(password: str) -> str:
     """Hash a password for storing."""
@@ -18,3 +38,137 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     except Exception as e:
         print(f"Password verification error: {e}")
         return False
+
+
+# -----------------------------------------------------------
+# PROCESS POOL (keeps bcrypt off the event loop and threadpool)
+# -----------------------------------------------------------
+_pool = None
+_slots = None
+_pending = 0
+
+def configure_password_pool(workers: int | None = None, max_queue: int | None = None):
+    """(Re)create the bcrypt worker pool; used at startup and by benchmarks"""
+    global _pool, _slots, _pending, PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_QUEUE
+    shutdown_password_pool()
+    if workers is not None:
+        PASSWORD_HASH_WORKERS = workers
+    if max_queue is not None:
+        PASSWORD_HASH_MAX_QUEUE = max_queue
+    _pool = ProcessPoolExecutor(max_workers=PASSWORD_HASH_WORKERS)
+    _slots = asyncio.Semaphore(PASSWORD_HASH_WORKERS)
+    _pending = 0
+
+def shutdown_password_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+async def _run_in_pool(func, *args):
+    """Run a bcrypt call in the worker pool, rejecting with 503 once the wait queue is full"""
+    global _pending
+    if _pool is None:
+        configure_password_pool()
+    if _pending >= PASSWORD_HASH_WORKERS + PASSWORD_HASH_MAX_QUEUE:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many concurrent sign-in attempts, please retry",
+            headers={"Retry-After": "1"}
+        )
+    _pending += 1
+    try:
+        async with _slots:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(_pool, func, *args)
+    finally:
+        _pending -= 1
+
+async def hash_password_async(password: str) -> str:
+    """hash_password on the worker pool"""
+    return await _run_in_pool(hash_password, password)
+
+
+# -----------------------------------------------------------
+# VERIFIED-HASH CACHE
+# -----------------------------------------------------------
+# Entries are keyed by an HMAC (with a per-process random key) of the stored hash and the
+# submitted password, so the plain password is never kept and changing a password
+# (new stored hash) naturally misses. Only successful verifications are cached.
+_cache_key = secrets.token_bytes(32)
+_verified = OrderedDict()
+
+def _verified_key(plain_password: str, hashed_password: str) -> bytes:
+    message = hashed_password.encode('utf-8') + b'\x00' + plain_password.encode('utf-8')[:72]
+    return hmac.new(_cache_key, message, hashlib.sha256).digest()
+
+def _cache_lookup(key: bytes) -> bool:
+    expires = _verified.get(key)
+    if expires is None:
+        return False
+    if expires < time.monotonic():
+        _verified.pop(key, None)
+        return False
+    _verified.move_to_end(key)
+    return True
+
+def _cache_store(key: bytes):
+    _verified[key] = time.monotonic() + PASSWORD_VERIFY_CACHE_TTL
+    _verified.move_to_end(key)
+    while len(_verified) > PASSWORD_VERIFY_CACHE_SIZE:
+        _verified.popitem(last=False)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password on the worker pool, answering repeat successful logins from the cache"""
+    if not hashed_password:
+        return False
+    key = _verified_key(plain_password, hashed_password)
+    if _cache_lookup(key):
+        return True
+    verified = await _run_in_pool(verify_password, plain_password, hashed_password)
+    if verified and PASSWORD_VERIFY_CACHE_SIZE > 0:
+        _cache_store(key)
+    return verified
+
+
+# -----------------------------------------------------------
+# SESSION DEPENDENCIES
+# -----------------------------------------------------------
+def _load_session(session_id: str):
+    db = SessionLocal()
+    try:
+        return sessions.get_session(db, session_id)
+    finally:
+        db.close()
+
+async def get_current_session(authorization: str | None = Header(None)):
+    """Resolve the `Authorization: Bearer <token>` header to a session, or 401"""
+    scheme, _, token = (authorization or "").partition(" ")
+    return await session_from_token(token.strip() if scheme.lower() == "bearer" else None)
+
+# Marks the dependencies that guard a route, so etag.py runs them before answering 304
+get_current_session.requires_session = True
+
+async def session_from_token(token: str | None):
+    """Resolve a session token to a session, or 401 (for clients that cannot send headers)"""
+    session_id = sessions.session_id_from_token(token) if token else None
+    if not session_id:
+        raise HTTPException(status_code=401, detail="Not signed in", headers={"WWW-Authenticate": "Bearer"})
+
+    # Cache hits never leave the event loop; only a miss touches the database
+    session = sessions.get_cached_session(session_id) or await run_in_threadpool(_load_session, session_id)
+    if not session:
+        raise HTTPException(status_code=401, detail="Session expired", headers={"WWW-Authenticate": "Bearer"})
+    return session
+
+def require_role(*roles: str):
+    """Dependency factory allowing only sessions whose role is one of `roles`"""
+    async def check_role(authorization: str | None = Header(None)):
+        session = await get_current_session(authorization)
+        if session["role"] not in roles:
+            raise HTTPException(status_code=403, detail=f"{' or '.join(r.capitalize() for r in roles)} privileges required")
+        return session
+    check_role.requires_session = True
+    return check_role
+
+require_admin = require_role("admin")
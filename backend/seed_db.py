@@ -7,6 +7,7 @@ from sqlalchemy.orm import Session
 from database import SessionLocal, engine
 from models import Student, Faculty, Admin, Course, Enrollment, Fee, Notifications
 from security import hash_password
+from crud import login_identity
 from datetime import datetime, date, timedelta
 
 def seed_database():
@@ -150,6 +151,8 @@ def seed_database():
         print("✓ Created notifications")
         
         db.commit()
+        login_identity.rebuild(db)
+        print("✓ Rebuilt login identity index")
         print("\n" + "="*50)
         print("Database seeded successfully!")
         print("="*50)